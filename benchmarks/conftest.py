@@ -0,0 +1,184 @@
+import json
+import os
+from contextlib import contextmanager
+from pathlib import Path
+
+import boa
+import pytest
+from eth.vm.gas_meter import GasMeter, allow_negative_refund_strategy
+
+from boa_compat import evm_state
+
+# Reuse the pair test fixtures so the benchmarks run against exactly the same deployment as the
+# test suite, importing a fixture is what makes pytest register it here
+from tests.pair.conftest import (  # noqa: F401
+    account,
+    accounts,
+    asset,
+    cog_factory,
+    cog_pair_blueprint,
+    collateral,
+    liquidator,
+    oracle,
+)
+
+BENCHMARK_DIR = Path(__file__).parent
+BASELINE_PATH = BENCHMARK_DIR / "gas_baseline.json"
+REPORT_PATH = BENCHMARK_DIR / "gas_report.json"
+
+# Allowed slack before a measurement counts as a regression, in percent
+GAS_TOLERANCE = float(os.environ.get("COG_GAS_TOLERANCE", "1"))
+UPDATE_BASELINE = os.environ.get("COG_GAS_UPDATE_BASELINE", "") not in ("", "0")
+
+
+def measure(contract, fn_name, *args, **kwargs):
+    """
+    @dev Calls `contract.fn_name(*args, **kwargs)` as if it were its own transaction
+         and returns the execution gas it used. Warm/cold access sets and SSTORE
+         original values are reset the same way they would be at a transaction
+         boundary. Intrinsic gas (21000 + calldata) and refunds are not included.
+    """
+    with transaction_boundary():
+        getattr(contract, fn_name)(*args, **kwargs)
+    return contract._computation.get_gas_used()
+
+
+@contextmanager
+def transaction_boundary():
+    """
+    @dev Starts a new transaction without committing state. `lock_changes` would also
+         reset both, but it drops the journal checkpoints boa's test anchors revert to,
+         so the access set is cleared through the (journaled) access journal instead, and
+         each slot's original value is taken from its first read, which SSTORE does
+         before it writes.
+    """
+    state = evm_state()
+    state._account_db._journal_accessed_state.clear()
+
+    get_storage = state.get_storage
+    originals = {}
+
+    def transaction_get_storage(address, slot, from_journal=True):
+        if from_journal:
+            return get_storage(address, slot)
+        if (address, slot) not in originals:
+            originals[address, slot] = get_storage(address, slot)
+        return originals[address, slot]
+
+    state.get_storage = transaction_get_storage
+    try:
+        yield
+    finally:
+        del state.get_storage
+
+
+class BenchmarkGasMeter(GasMeter):
+    """
+    @dev Mainnet (EIP-2200) refund accounting, where a refund can be taken back within a
+         transaction. Only reachable once `measure` resets original values between calls.
+    """
+
+    def __init__(self, start_gas, refund_strategy=allow_negative_refund_strategy):
+        super().__init__(start_gas, allow_negative_refund_strategy)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def benchmark_gas_meter():
+    with boa.env.gas_meter_class(BenchmarkGasMeter):
+        yield
+
+
+class GasReport:
+    def __init__(self, baseline):
+        self.baseline = baseline
+        self.results = {}
+
+    def record(self, entry_point, path, gas):
+        """
+        @dev Records a measurement and fails if it regressed past the baseline
+        """
+        self.results.setdefault(entry_point, {})[path] = gas
+        if UPDATE_BASELINE:
+            return
+        expected = self.baseline.get(entry_point, {}).get(path)
+        if expected is None:
+            return
+        limit = expected * (100 + GAS_TOLERANCE) / 100
+        assert gas <= limit, (
+            f"{entry_point} ({path}) regressed: {gas} gas, baseline {expected}"
+        )
+
+    def to_json(self):
+        report = {}
+        for entry_point, paths in sorted(self.results.items()):
+            report[entry_point] = {}
+            for path, gas in sorted(paths.items()):
+                expected = self.baseline.get(entry_point, {}).get(path)
+                report[entry_point][path] = {
+                    "gas": gas,
+                    "baseline": expected,
+                    "delta": None if expected is None else gas - expected,
+                }
+        return report
+
+
+@pytest.fixture(scope="session")
+def gas_report():
+    baseline = {}
+    if BASELINE_PATH.exists():
+        baseline = json.loads(BASELINE_PATH.read_text())
+
+    report = GasReport(baseline)
+    yield report
+
+    REPORT_PATH.write_text(json.dumps(report.to_json(), indent=4) + "\n")
+    if UPDATE_BASELINE:
+        # Merge per entry point, so a partial run only replaces the paths it measured
+        merged = dict(baseline)
+        for entry_point, paths in report.results.items():
+            merged[entry_point] = {**baseline.get(entry_point, {}), **paths}
+        BASELINE_PATH.write_text(json.dumps(merged, indent=4, sort_keys=True) + "\n")
+
+
+@pytest.fixture()
+def lender(accounts):
+    return accounts[1]
+
+
+@pytest.fixture()
+def borrower(accounts):
+    return accounts[2]
+
+
+@pytest.fixture()
+def bench_pair(account, cog_factory, oracle, asset, collateral):
+    """
+    @dev A fresh medium risk pair per benchmark, so measurements don't depend on test order
+    """
+    with boa.env.prank(account):
+        oracle.setPrice(10**18)
+        oracle.setUpdated(True)
+        pair = boa.load_partial("src/cog_pair.vy")
+        return pair.at(cog_factory.deploy_medium_risk_pair(asset, collateral, oracle))
+
+
+@pytest.fixture()
+def seeded_pair(bench_pair, lender, borrower, asset, collateral):
+    """
+    @dev A pair with lenders, collateral and an outstanding borrow, so that accrual has work to do
+    """
+    pair = bench_pair
+    with boa.env.prank(lender):
+        asset.mint(lender, 1100 * 10**18)
+        asset.approve(pair, 2**256 - 1)
+        pair.deposit(1000 * 10**18, lender)
+
+    with boa.env.prank(borrower):
+        collateral.mint(borrower, 1000 * 10**18)
+        collateral.approve(pair, 2**256 - 1)
+        pair.add_collateral(borrower, 1000 * 10**18)
+        pair.borrow(500 * 10**18)
+        asset.approve(pair, 2**256 - 1)
+
+    pair.get_exchange_rate()
+    return pair
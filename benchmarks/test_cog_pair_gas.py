@@ -0,0 +1,111 @@
+import boa
+import pytest
+
+from benchmarks.conftest import measure
+
+# Every entry point is measured twice:
+#   cold - the first call in a new block, where `efficient_accrue` has to accrue interest
+#   warm - a repeat call in the same block, where `efficient_accrue` returns early
+BLOCK_TIME = 3600
+
+SMALL_AMOUNT = 10**18
+
+
+def bench(gas_report, entry_point, contract, fn_name, *args, **kwargs):
+    boa.env.time_travel(seconds=BLOCK_TIME)
+    gas_report.record(entry_point, "cold", measure(contract, fn_name, *args, **kwargs))
+    gas_report.record(entry_point, "warm", measure(contract, fn_name, *args, **kwargs))
+
+
+def test_deposit(gas_report, seeded_pair, lender):
+    bench(gas_report, "deposit", seeded_pair, "deposit", SMALL_AMOUNT, lender, sender=lender)
+
+
+def test_mint(gas_report, seeded_pair, lender):
+    bench(gas_report, "mint", seeded_pair, "mint", SMALL_AMOUNT, lender, sender=lender)
+
+
+def test_withdraw(gas_report, seeded_pair, lender):
+    bench(gas_report, "withdraw", seeded_pair, "withdraw", SMALL_AMOUNT, lender, lender, sender=lender)
+
+
+def test_redeem(gas_report, seeded_pair, lender):
+    bench(gas_report, "redeem", seeded_pair, "redeem", SMALL_AMOUNT, lender, lender, sender=lender)
+
+
+def test_borrow(gas_report, seeded_pair, borrower):
+    bench(gas_report, "borrow", seeded_pair, "borrow", SMALL_AMOUNT, borrower, borrower, sender=borrower)
+
+
+def test_repay(gas_report, seeded_pair, borrower):
+    bench(gas_report, "repay", seeded_pair, "repay", borrower, SMALL_AMOUNT, sender=borrower)
+
+
+def test_add_collateral(gas_report, seeded_pair, borrower, collateral):
+    collateral.mint(borrower, 2 * SMALL_AMOUNT)
+    bench(gas_report, "add_collateral", seeded_pair, "add_collateral", borrower, SMALL_AMOUNT, sender=borrower)
+
+
+def test_remove_collateral(gas_report, seeded_pair, borrower):
+    bench(gas_report, "remove_collateral", seeded_pair, "remove_collateral", borrower, SMALL_AMOUNT, sender=borrower)
+
+
+def test_cook(gas_report, seeded_pair, borrower, collateral):
+    # The add_collateral + borrow session, as one batch
+    collateral.mint(borrower, 2 * SMALL_AMOUNT)
+    actions = [(1, SMALL_AMOUNT), (3, SMALL_AMOUNT // 2)]
+    bench(gas_report, "cook", seeded_pair, "cook", actions, sender=borrower)
+
+
+def test_liquidate(gas_report, seeded_pair, borrower, liquidator, asset, oracle, account):
+    # Double the price of the collateral debt, leaving the borrower well under water
+    oracle.setPrice(2 * 10**18, sender=account)
+    seeded_pair.get_exchange_rate()
+
+    asset.mint(liquidator, 100 * SMALL_AMOUNT)
+    asset.approve(seeded_pair, 2**256 - 1, sender=liquidator)
+
+    bench(gas_report, "liquidate", seeded_pair, "liquidate", borrower, SMALL_AMOUNT, liquidator, sender=liquidator)
+
+
+def test_accrue(gas_report, seeded_pair):
+    bench(gas_report, "accrue", seeded_pair, "accrue")
+
+
+def test_accrue_off_target(gas_report, seeded_pair, borrower):
+    # The seeded pair sits inside its target band, move it out either way so the rate has to move
+    seeded_pair.borrow(200 * SMALL_AMOUNT, sender=borrower)
+    boa.env.time_travel(seconds=BLOCK_TIME)
+    gas_report.record("accrue", "over_target", measure(seeded_pair, "accrue"))
+
+    seeded_pair.repay(borrower, seeded_pair.user_borrow_part(borrower) * 9 // 10, sender=borrower)
+    boa.env.time_travel(seconds=BLOCK_TIME)
+    gas_report.record("accrue", "under_target", measure(seeded_pair, "accrue"))
+
+
+def test_roll_over_pol(gas_report, seeded_pair):
+    # Let some protocol fees build up first
+    boa.env.time_travel(seconds=86400)
+    seeded_pair.accrue()
+    bench(gas_report, "roll_over_pol", seeded_pair, "roll_over_pol")
+
+
+@pytest.mark.parametrize(
+    "fn_name",
+    [
+        "totalAssets",
+        "convertToAssets",
+        "convertToShares",
+        "maxWithdraw",
+        "maxRedeem",
+        "previewWithdraw",
+        "previewRedeem",
+    ],
+)
+def test_preview(gas_report, seeded_pair, lender, fn_name):
+    args = () if fn_name == "totalAssets" else (lender,) if fn_name.startswith("max") else (SMALL_AMOUNT,)
+    # Views never write the accrual back, so pending interest is priced in on every call
+    boa.env.time_travel(seconds=BLOCK_TIME)
+    gas_report.record(fn_name, "pending", measure(seeded_pair, fn_name, *args))
+    seeded_pair.accrue()
+    gas_report.record(fn_name, "accrued", measure(seeded_pair, fn_name, *args))
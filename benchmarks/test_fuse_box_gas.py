@@ -0,0 +1,27 @@
+import boa
+import pytest
+
+from benchmarks.conftest import measure
+
+PRICES = [10**18, 1001 * 10**15, 999 * 10**15, 1002 * 10**15]
+
+
+@pytest.fixture()
+def bench_fuse_box(account):
+    with boa.env.prank(account):
+        sources = []
+        for price in PRICES:
+            source = boa.load("src/mocks/mock_oracle.vy")
+            source.setPrice(price)
+            source.setUpdated(True)
+            sources.append(source)
+        return boa.load("src/fuse_box.vy", [(True, source.address) for source in sources])
+
+
+def test_get_average(gas_report, bench_fuse_box):
+    gas_report.record("fuse_box_get", "average", measure(bench_fuse_box, "get"))
+
+
+def test_get_median_quorum(gas_report, bench_fuse_box, account):
+    bench_fuse_box.set_quorum(2, 100, sender=account)
+    gas_report.record("fuse_box_get", "median_quorum_2", measure(bench_fuse_box, "get"))
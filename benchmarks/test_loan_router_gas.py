@@ -0,0 +1,43 @@
+import boa
+import pytest
+
+from benchmarks.conftest import measure
+
+HOPS = 2
+DEADLINE = 2**256 - 1
+
+
+@pytest.fixture()
+def bench_route(account, lender, borrower, cog_factory, oracle):
+    """
+    @dev A fresh router and a chain of pairs, each pair's asset being the next pair's collateral
+    """
+    with boa.env.prank(account):
+        oracle.setPrice(10**18)
+        oracle.setUpdated(True)
+        tokens = [boa.load("src/mocks/mock_erc20.vy", "Token", "TKN", 18) for _ in range(HOPS + 1)]
+        pair = boa.load_partial("src/cog_pair.vy")
+        pairs = [
+            pair.at(cog_factory.deploy_medium_risk_pair(tokens[i + 1], tokens[i], oracle))
+            for i in range(HOPS)
+        ]
+        router = boa.load("src/loan_router.vy", cog_factory)
+
+    for token, pair in zip(tokens[1:], pairs):
+        with boa.env.prank(lender):
+            token.mint(lender, 1000 * 10**18)
+            token.approve(pair, 2**256 - 1)
+            pair.deposit(1000 * 10**18)
+        pair.approve_borrow(router, 2**256 - 1, sender=borrower)
+
+    tokens[0].mint(borrower, 1000 * 10**18, sender=borrower)
+    tokens[0].approve(router, 2**256 - 1, sender=borrower)
+    path = [(pair.address, 100 * 10**18 // 2**i, 50 * 10**18 // 2**i) for i, pair in enumerate(pairs)]
+    return router, path
+
+
+def test_loan_tokens(gas_report, bench_route, borrower):
+    router, path = bench_route
+    with boa.env.prank(borrower):
+        gas_report.record("loan_tokens", f"{HOPS}_hops_first", measure(router, "loan_tokens", path, DEADLINE))
+        gas_report.record("loan_tokens", f"{HOPS}_hops_repeat", measure(router, "loan_tokens", path, DEADLINE))
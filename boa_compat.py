@@ -0,0 +1,20 @@
+"""
+Access to titanoboa's py-evm state across boa releases. Up to 0.1.9 the env held the VM
+itself (`boa.env.vm`), from 0.1.10 it sits behind `boa.env.evm`. CI pins the boa version
+it tests against, but the tests, benchmarks and indexer all go through here so a bump only
+touches this file.
+"""
+
+
+def evm_state(env=None):
+    """
+    @dev The py-evm state of `env` (default `boa.env`), for block number, timestamp and code reads
+    """
+    if env is None:
+        import boa
+
+        env = boa.env
+    evm = getattr(env, "evm", None)
+    if evm is not None:
+        return evm.vm.state
+    return env.vm.state
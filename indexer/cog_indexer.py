@@ -0,0 +1,437 @@
+"""
+@title Cog pair indexer
+@notice Rebuilds every pair's positions from its logs into a local SQLite database, so position
+        queries are answered without any chain calls
+@dev Logs are pulled from a source in bulk block ranges, factory logs first so pairs created in a
+     range are tracked before that range's pair logs are fetched. Each log is stored once, keyed by
+     (block, log_index), and positions are only updated for logs that were not stored before, so
+     re-syncing an overlapping range is harmless.
+
+     Amounts are uint256, which do not fit SQLite's 64 bit INTEGER, so they are stored as decimal
+     TEXT and converted back to Python ints on the way out.
+"""
+import json
+import sqlite3
+import urllib.request
+from collections import namedtuple
+
+from eth_abi import decode
+from eth_utils import keccak, to_checksum_address
+
+from boa_compat import evm_state
+
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+# Event layouts, as (field, abi type, indexed) in declaration order
+PAIR_EVENTS = {
+    "AddCollateral": [("to", "address", True), ("amount", "uint256", True), ("user_collateral_share", "uint256", True)],
+    "RemoveCollateral": [
+        ("to", "address", True),
+        ("amount", "uint256", True),
+        ("user_collateral_share", "uint256", True),
+        ("_from", "address", False),
+    ],
+    "Borrow": [("amount", "uint256", True), ("to", "address", True), ("_from", "address", True), ("user_borrow_part", "uint256", False)],
+    "Repay": [("payer", "address", True), ("to", "address", True), ("amount", "uint256", False), ("part", "uint256", False)],
+    "Liquidate": [
+        ("liquidator", "address", True),
+        ("user", "address", True),
+        ("borrow_part", "uint256", False),
+        ("borrow_amount", "uint256", False),
+        ("collateral_share", "uint256", False),
+    ],
+    "Transfer": [("sender", "address", True), ("receiver", "address", True), ("amount", "uint256", False)],
+    "Deposit": [("depositor", "address", True), ("receiver", "address", True), ("assets", "uint256", False), ("shares", "uint256", False)],
+    "Withdraw": [
+        ("withdrawer", "address", True),
+        ("receiver", "address", True),
+        ("owner", "address", True),
+        ("assets", "uint256", False),
+        ("shares", "uint256", False),
+    ],
+}
+
+_TIER_EVENT = [("asset", "address", True), ("collateral", "address", True), ("pair", "address", True)]
+FACTORY_EVENTS = {
+    "StablePairCreated": _TIER_EVENT,
+    "LowPairCreated": _TIER_EVENT,
+    "MediumPairCreated": _TIER_EVENT,
+    "HighPairCreated": _TIER_EVENT,
+    "CustomPairCreated": [("blueprint", "address", True), ("pair", "address", True), ("asset", "address", False), ("collateral", "address", False)],
+    "TierPairCreated": [("tier", "uint256", True), ("pair", "address", True), ("asset", "address", False), ("collateral", "address", False)],
+}
+# Tiers added with the factory's set_tier have no name, they are indexed by their id
+TIERS = {
+    "StablePairCreated": "stable",
+    "LowPairCreated": "low",
+    "MediumPairCreated": "medium",
+    "HighPairCreated": "high",
+    "CustomPairCreated": "custom",
+}
+
+
+def _topic(name, fields):
+    return keccak(text=f"{name}({','.join(typ for _, typ, _ in fields)})")
+
+
+PAIR_TOPICS = {_topic(name, fields): name for name, fields in PAIR_EVENTS.items()}
+FACTORY_TOPICS = {_topic(name, fields): name for name, fields in FACTORY_EVENTS.items()}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pairs (
+    pair TEXT PRIMARY KEY,
+    factory TEXT NOT NULL,
+    tier TEXT NOT NULL,
+    asset TEXT NOT NULL,
+    collateral TEXT NOT NULL,
+    block INTEGER NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS events (
+    pair TEXT NOT NULL,
+    block INTEGER NOT NULL,
+    log_index INTEGER NOT NULL,
+    event TEXT NOT NULL,
+    args TEXT NOT NULL,
+    PRIMARY KEY (pair, block, log_index)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS positions (
+    pair TEXT NOT NULL,
+    account TEXT NOT NULL,
+    collateral_share TEXT NOT NULL DEFAULT '0',
+    borrow_part TEXT NOT NULL DEFAULT '0',
+    balance TEXT NOT NULL DEFAULT '0',
+    PRIMARY KEY (pair, account)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS cursors (
+    factory TEXT PRIMARY KEY,
+    block INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+Position = namedtuple("Position", ["collateral_share", "borrow_part", "balance"])
+Pair = namedtuple("Pair", ["pair", "factory", "tier", "asset", "collateral", "block"])
+
+
+def _to_bytes(value):
+    if isinstance(value, str):
+        return bytes.fromhex(value[2:] if value.startswith("0x") else value)
+    if isinstance(value, int):
+        return value.to_bytes(32, "big")
+    return bytes(value)
+
+
+def _address(value):
+    # Accepts boa/ape contract objects as well as plain addresses
+    return to_checksum_address(getattr(value, "address", value))
+
+
+def _to_int(value):
+    return int(value, 16) if isinstance(value, str) else int(value)
+
+
+def decode_log(log, events, topics):
+    """
+    @param log A raw log, either as returned by eth_getLogs or by BoaSource
+    @param events The event layouts to decode against
+    @param topics Map of topic0 to event name
+    @return A tuple of (event name, args), or None if the log is not one of `events`
+    """
+    raw_topics = [_to_bytes(t) for t in log["topics"]]
+    if not raw_topics or raw_topics[0] not in topics:
+        return None
+    name = topics[raw_topics[0]]
+    fields = events[name]
+
+    indexed = iter(raw_topics[1:])
+    data = iter(decode([typ for _, typ, is_topic in fields if not is_topic], _to_bytes(log["data"])))
+    args = {}
+    for field, typ, is_topic in fields:
+        value = decode([typ], next(indexed))[0] if is_topic else next(data)
+        args[field] = to_checksum_address(value) if typ == "address" else value
+    return name, args
+
+
+class RpcSource:
+    """
+    @notice Reads logs from a node over JSON-RPC
+    """
+
+    def __init__(self, url, timeout=30):
+        self.url = url
+        self.timeout = timeout
+        self._id = 0
+
+    def _call(self, method, params):
+        self._id += 1
+        body = json.dumps({"jsonrpc": "2.0", "id": self._id, "method": method, "params": params})
+        request = urllib.request.Request(self.url, body.encode(), {"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            reply = json.load(response)
+        if "error" in reply:
+            raise RuntimeError(f"{method} failed: {reply['error']}")
+        return reply["result"]
+
+    def block_number(self):
+        return _to_int(self._call("eth_blockNumber", []))
+
+    def get_logs(self, addresses, from_block, to_block):
+        return self._call(
+            "eth_getLogs",
+            [{"address": list(addresses), "fromBlock": hex(from_block), "toBlock": hex(to_block)}],
+        )
+
+
+class BoaSource:
+    """
+    @notice Stands in for a node when running against a titanoboa env
+    @dev boa keeps no log history, so every call made while the source is recording has its logs
+         stored with the block number it ran in. Reverted calls have no logs.
+    """
+
+    def __init__(self, env=None):
+        if env is None:
+            import boa
+
+            env = boa.env
+        self.env = env
+        self.logs = []
+        self._execute_code = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def start(self):
+        execute_code = self._execute_code = self.env.execute_code
+
+        def recording_execute_code(*args, **kwargs):
+            computation = execute_code(*args, **kwargs)
+            self._record(computation)
+            return computation
+
+        self.env.execute_code = recording_execute_code
+
+    def stop(self):
+        if self._execute_code is not None:
+            del self.env.execute_code
+            self._execute_code = None
+
+    def _record(self, computation):
+        block = evm_state(self.env).block_number
+        log_index = sum(1 for log in self.logs if log["blockNumber"] == block)
+        for _, address, topics, data in computation.get_raw_log_entries():
+            self.logs.append(
+                {
+                    "address": to_checksum_address(address),
+                    "topics": [t.to_bytes(32, "big") for t in topics],
+                    "data": data,
+                    "blockNumber": block,
+                    "logIndex": log_index,
+                }
+            )
+            log_index += 1
+
+    def block_number(self):
+        return evm_state(self.env).block_number
+
+    def get_logs(self, addresses, from_block, to_block):
+        addresses = set(addresses)
+        return [
+            log
+            for log in self.logs
+            if log["address"] in addresses and from_block <= log["blockNumber"] <= to_block
+        ]
+
+
+class CogIndexer:
+    def __init__(self, path=":memory:"):
+        """
+        @param path The SQLite database to index into, reopening an existing one resumes from its cursors
+        """
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    # ///////////////////////////////////////////////////// #
+    #                      Ingestion                        #
+    # ///////////////////////////////////////////////////// #
+
+    def track_factory(self, factory, start_block=0):
+        """
+        @param factory The factory whose pairs should be indexed
+        @param start_block The block the factory was deployed in, syncing starts there
+        """
+        self.db.execute(
+            "INSERT OR IGNORE INTO cursors VALUES (?, ?)", (_address(factory), start_block - 1)
+        )
+        self.db.commit()
+
+    def sync(self, source, to_block=None, batch_size=2000):
+        """
+        @param source Where logs are read from, a RpcSource or BoaSource
+        @param to_block The last block to index, defaults to the source's latest block
+        @param batch_size Blocks fetched per eth_getLogs request
+        @return The number of new logs indexed
+        """
+        to_block = source.block_number() if to_block is None else to_block
+        indexed = 0
+        for factory, cursor in self.db.execute("SELECT factory, block FROM cursors").fetchall():
+            for start in range(cursor + 1, to_block + 1, batch_size):
+                end = min(start + batch_size - 1, to_block)
+                indexed += self.ingest_factory_logs(factory, source.get_logs([factory], start, end))
+                pairs = [pair for (pair,) in self.db.execute("SELECT pair FROM pairs WHERE factory = ?", (factory,))]
+                if pairs:
+                    indexed += self.ingest_pair_logs(source.get_logs(pairs, start, end))
+                self.db.execute("UPDATE cursors SET block = ? WHERE factory = ?", (end, factory))
+                self.db.commit()
+        return indexed
+
+    def ingest_factory_logs(self, factory, logs):
+        """
+        @return The number of pairs registered
+        """
+        registered = 0
+        for log in logs:
+            decoded = decode_log(log, FACTORY_EVENTS, FACTORY_TOPICS)
+            if decoded is None:
+                continue
+            name, args = decoded
+            cursor = self.db.execute(
+                "INSERT OR IGNORE INTO pairs VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    args["pair"],
+                    factory,
+                    TIERS.get(name, str(args.get("tier"))),
+                    args["asset"],
+                    args["collateral"],
+                    _to_int(log["blockNumber"]),
+                ),
+            )
+            registered += cursor.rowcount
+        return registered
+
+    def ingest_pair_logs(self, logs):
+        """
+        @return The number of logs indexed, logs that were already indexed are skipped
+        """
+        indexed = 0
+        for log in sorted(logs, key=lambda log: (_to_int(log["blockNumber"]), _to_int(log["logIndex"]))):
+            decoded = decode_log(log, PAIR_EVENTS, PAIR_TOPICS)
+            if decoded is None:
+                continue
+            name, args = decoded
+            pair = to_checksum_address(log["address"])
+            cursor = self.db.execute(
+                "INSERT OR IGNORE INTO events VALUES (?, ?, ?, ?, ?)",
+                (
+                    pair,
+                    _to_int(log["blockNumber"]),
+                    _to_int(log["logIndex"]),
+                    name,
+                    json.dumps({k: str(v) for k, v in args.items()}),
+                ),
+            )
+            if cursor.rowcount:
+                self._apply(pair, name, args)
+                indexed += 1
+        return indexed
+
+    def _apply(self, pair, name, args):
+        # Collateral and borrow events carry the user's new position, repayments and liquidations
+        # carry what they took off it, and share balances move with the ERC20/ERC4626 events
+        if name == "AddCollateral":
+            self._set(pair, args["to"], "collateral_share", args["user_collateral_share"])
+        elif name == "RemoveCollateral":
+            self._set(pair, args["_from"], "collateral_share", args["user_collateral_share"])
+        elif name == "Borrow":
+            self._set(pair, args["_from"], "borrow_part", args["user_borrow_part"])
+        elif name == "Repay":
+            self._add(pair, args["to"], "borrow_part", -args["part"])
+        elif name == "Liquidate":
+            self._add(pair, args["user"], "borrow_part", -args["borrow_part"])
+            self._add(pair, args["user"], "collateral_share", -args["collateral_share"])
+        elif name == "Deposit":
+            self._add(pair, args["receiver"], "balance", args["shares"])
+        elif name == "Withdraw":
+            self._add(pair, args["owner"], "balance", -args["shares"])
+        elif name == "Transfer":
+            if args["sender"] != ZERO_ADDRESS:
+                self._add(pair, args["sender"], "balance", -args["amount"])
+            if args["receiver"] != ZERO_ADDRESS:
+                self._add(pair, args["receiver"], "balance", args["amount"])
+
+    def _set(self, pair, account, column, value):
+        self.db.execute("INSERT OR IGNORE INTO positions (pair, account) VALUES (?, ?)", (pair, account))
+        self.db.execute(
+            f"UPDATE positions SET {column} = ? WHERE pair = ? AND account = ?", (str(value), pair, account)
+        )
+
+    def _add(self, pair, account, column, delta):
+        self._set(pair, account, column, getattr(self.position(pair, account), column) + delta)
+
+    # ///////////////////////////////////////////////////// #
+    #                       Queries                         #
+    # ///////////////////////////////////////////////////// #
+
+    def pairs(self, asset=None, collateral=None):
+        """
+        @return Every indexed pair, optionally filtered by asset and collateral
+        """
+        rows = self.db.execute("SELECT * FROM pairs ORDER BY block, pair").fetchall()
+        return [
+            Pair(*row)
+            for row in rows
+            if (asset is None or row[3] == _address(asset))
+            and (collateral is None or row[4] == _address(collateral))
+        ]
+
+    def position(self, pair, account):
+        """
+        @return The account's collateral share, borrow part and share balance in the pair
+        """
+        row = self.db.execute(
+            "SELECT collateral_share, borrow_part, balance FROM positions WHERE pair = ? AND account = ?",
+            (_address(pair), _address(account)),
+        ).fetchone()
+        return Position(*(int(v) for v in row)) if row else Position(0, 0, 0)
+
+    def positions(self, pair):
+        """
+        @return Map of account to position, for every account with anything left in the pair
+        """
+        rows = self.db.execute(
+            "SELECT account, collateral_share, borrow_part, balance FROM positions WHERE pair = ?",
+            (_address(pair),),
+        )
+        positions = {account: Position(*(int(v) for v in values)) for account, *values in rows}
+        return {account: p for account, p in positions.items() if any(p)}
+
+    def borrowers(self, pair):
+        """
+        @return The accounts with an open borrow in the pair, e.g. to feed liquidate_many
+        """
+        return [account for account, p in self.positions(pair).items() if p.borrow_part]
+
+    def events(self, pair, from_block=0, to_block=None):
+        """
+        @return The pair's decoded events in the range, as (block, log_index, event, args)
+        """
+        rows = self.db.execute(
+            "SELECT block, log_index, event, args FROM events WHERE pair = ? AND block >= ? AND block <= ? "
+            "ORDER BY block, log_index",
+            (_address(pair), from_block, 2**63 - 1 if to_block is None else to_block),
+        )
+        return [(block, log_index, event, self._load_args(event, args)) for block, log_index, event, args in rows]
+
+    @staticmethod
+    def _load_args(event, args):
+        args = json.loads(args)
+        return {field: int(args[field]) if typ == "uint256" else args[field] for field, typ, _ in PAIR_EVENTS[event]}
@@ -89,7 +89,7 @@ def deploy_core_contracts(network):
 
     factory = account.deploy(project.cog_factory, blueprint_address, account, type=0, network=network)
     
-    loan_router = account.deploy(project.loan_router, type=0, network=network)
+    loan_router = account.deploy(project.loan_router, factory, type=0, network=network)
 
     print("==========================")
     print("Account Used:             ", account)
@@ -0,0 +1,155 @@
+"""
+@title Rate curve calibration
+@notice Replays the pair's interest rate controller over utilization paths, for thousands of
+        parameter sets at once, to calibrate new tiers
+@dev Each parameter set is one pool of a CogPairModel, so the rate updates and the surge breaker
+     are the model's vectorized `_accrue`, which tests/pair/test_model.py checks against the
+     contract. Before every step the pools are reset to the path's utilization, then the step is
+     accrued in one go, the same as a pair nobody touched for `step` seconds.
+
+     python -m sim.calibrate --tier medium --elasticity 1e40 3e40 5e40 --utilization 0.9 --days 30
+"""
+import argparse
+from collections import namedtuple
+
+import numpy as np
+
+from sim.cog_pair_model import (
+    CogPairModel,
+    PROTOCOL_FEE_PRECISION,
+    SURGE_DURATION,
+    TIERS,
+    UTILIZATION_PRECISION,
+)
+
+# Total assets each pool is reset to, large enough that rounding never moves the utilization
+TOTAL_ASSETS = 10**30
+
+Calibration = namedtuple(
+    "Calibration",
+    "timestamps interest_per_second time_to_max time_to_min first_surge surges",
+)
+
+
+def _path(model, utilization, steps):
+    # (steps, pools) utilization, given as fractions or in UTILIZATION_PRECISION
+    path = np.asarray(utilization, dtype=np.float64)
+    if path.max(initial=0) > 1:
+        path = path / UTILIZATION_PRECISION
+    path = np.broadcast_to(path.reshape(path.shape + (1,) * (2 - path.ndim)), (steps, model.pools))
+    borrowed = path * TOTAL_ASSETS
+    if model.exact:
+        borrowed = np.vectorize(int, otypes=[object])(borrowed)
+    return borrowed
+
+
+def calibrate(utilization, step, steps=None, fresh=False, exact=False, **params):
+    """
+    @param utilization Utilization at every step, either one path of length `steps` shared by
+         every parameter set, or a (steps, sets) array. Fractions or UTILIZATION_PRECISION units
+    @param step Seconds between accruals
+    @param fresh Replay a freshly deployed pair, whose breaker compares the first rate against
+         zero and so trips on any starting rate above the surge threshold. By default the breaker
+         starts from the starting rate, as for a pair that has been live for a while
+    @param params Rate parameters of cog_pair's constructor, each a scalar or an array with one
+         entry per parameter set
+    @return Calibration with the interest per second after every step, and per parameter set the
+         seconds until the rate first reaches its maximum and minimum, when the surge breaker first
+         trips, and how many times it trips. Bounds or surges never reached are -1
+    """
+    sets = max(np.size(v) for v in params.values())
+    if steps is None:
+        steps = np.shape(utilization)[0]
+    # Start past the surge window, so the breaker is live from the first step as on a real chain
+    model = CogPairModel(sets, 1, **params, timestamp=SURGE_DURATION + 1, exact=exact)
+    borrowed = _path(model, utilization, steps)
+    # With nothing borrowed the first accrual only sets the starting rate, like a fresh pair
+    model.accrue()
+    if not fresh:
+        model.state["last_interest_per_second"] = model._array(model.starting_interest_per_second)
+
+    history = []
+    time_to_max = np.full(sets, -1)
+    time_to_min = np.full(sets, -1)
+    first_surge = np.full(sets, -1)
+    surges = np.zeros(sets, dtype=int)
+
+    for i in range(steps):
+        borrow = borrowed[i]
+        model.state["borrow_elastic"] = model._array(borrow)
+        model.state["borrow_base"] = model._array(borrow)
+        model.state["asset_elastic"] = model._array(TOTAL_ASSETS - borrow)
+        model.state["asset_base"] = model._array(TOTAL_ASSETS - borrow)
+        model.advance(step)
+        model.accrue()
+
+        elapsed = (i + 1) * step
+        ips = model.interest_per_second
+        history.append(ips)
+
+        tripped = (model.last_elapsed_time == model.timestamp) & (
+            model.protocol_fee == PROTOCOL_FEE_PRECISION
+        )
+        surges += tripped
+        first_surge = np.where(tripped & (first_surge < 0), elapsed, first_surge)
+        time_to_max = np.where((ips >= model.max_interest) & (time_to_max < 0), elapsed, time_to_max)
+        time_to_min = np.where((ips <= model.min_interest) & (time_to_min < 0), elapsed, time_to_min)
+
+    return Calibration(
+        timestamps=np.arange(1, steps + 1) * step,
+        interest_per_second=np.array(history),
+        time_to_max=time_to_max,
+        time_to_min=time_to_min,
+        first_surge=first_surge,
+        surges=surges,
+    )
+
+
+def _days(seconds):
+    return "never" if seconds < 0 else f"{seconds / 86400:.2f}d"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("@dev")[0])
+    parser.add_argument("--tier", choices=sorted(TIERS), default="medium")
+    parser.add_argument("--elasticity", type=float, nargs="+")
+    parser.add_argument("--min-target", type=float, nargs="+", help="fraction, e.g. 0.5")
+    parser.add_argument("--max-target", type=float, nargs="+", help="fraction, e.g. 0.6")
+    parser.add_argument("--utilization", type=float, default=0.9, help="constant utilization")
+    parser.add_argument("--path", help="file with one recorded utilization per line, used instead")
+    parser.add_argument("--days", type=float, default=30)
+    parser.add_argument("--step", type=int, default=3600, help="seconds between accruals")
+    args = parser.parse_args(argv)
+
+    # Every combination of the swept values, on top of the tier's own parameters
+    params = dict(TIERS[args.tier])
+    sweep = {
+        "elasticity": args.elasticity,
+        "min_target_utilization": args.min_target and [v * UTILIZATION_PRECISION for v in args.min_target],
+        "max_target_utilization": args.max_target and [v * UTILIZATION_PRECISION for v in args.max_target],
+    }
+    sweep = {k: v for k, v in sweep.items() if v}
+    if sweep:
+        grid = np.meshgrid(*sweep.values(), indexing="ij")
+        params.update({k: g.ravel() for k, g in zip(sweep, grid)})
+
+    if args.path:
+        utilization = np.loadtxt(args.path, ndmin=1)
+    else:
+        utilization = np.full(int(args.days * 86400 // args.step), args.utilization)
+
+    result = calibrate(utilization, args.step, **params)
+    sets = len(result.time_to_max)
+    columns = list(sweep) or ["tier"]
+    print(" ".join(f"{c:>24}" for c in columns), f"{'to max':>9} {'to min':>9} {'surge':>9} {'surges':>6}")
+    for i in range(sets):
+        values = [f"{np.broadcast_to(params[c], sets)[i]:>24.4g}" for c in sweep] or [f"{args.tier:>24}"]
+        print(
+            " ".join(values),
+            f"{_days(result.time_to_max[i]):>9} {_days(result.time_to_min[i]):>9}",
+            f"{_days(result.first_surge[i]):>9} {result.surges[i]:>6}",
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,582 @@
+"""
+@title CogPair reference model
+@notice Vectorized Python model of src/cog_pair.vy, advancing many independent pools at once
+@dev Every field of the pair is a NumPy array with one row per pool, and user balances are
+     (pools, users) matrices. Entry points take per pool arguments and return a mask of the pools
+     where the call went through; pools where the contract would revert are left untouched, the
+     same way a reverted transaction would leave the pair.
+
+     With `exact=True` (the default) arrays hold Python integers, so every floor division and
+     rounding step matches the contract bit for bit, which is what the differential tests rely on.
+     With `exact=False` arrays are float64, which is orders of magnitude faster and plenty for
+     parameter sweeps, but no longer reproduces the contract's rounding.
+"""
+import math
+
+import numpy as np
+
+ONE_PERCENT = 317097920
+
+EXCHANGE_RATE_PRECISION = 10**18
+COLLATERIZATION_RATE_PRECISION = 10**5
+COLLATERIZATION_RATE = 75000
+BORROW_OPENING_FEE_PRECISION = 10**5
+PROTOCOL_FEE_PRECISION = 10**6
+PROTOCOL_SURGE_THRESHOLD = 1635979200
+SURGE_DURATION = 86400 * 3
+UTILIZATION_PRECISION = 10**18
+FACTOR_PRECISION = 10**18
+LIQUIDATION_MULTIPLIER = 112000
+LIQUIDATION_MULTIPLIER_PRECISION = 10**5
+INTEREST_PER_SECOND_PRECISION = 10**18
+COMPOUNDING_PRECISION = 10**27
+MINIMUM_BASE = 1000
+MASK_128 = 2**128 - 1
+
+# Parameters of the factory's fixed tiers, in cog_pair constructor order
+TIERS = {
+    "stable": dict(
+        min_target_utilization=150000000000000000,
+        max_target_utilization=350000000000000000,
+        starting_interest_per_second=ONE_PERCENT * 5,
+        min_interest=ONE_PERCENT * 2,
+        max_interest=ONE_PERCENT * 25,
+        elasticity=28800000000000000000000000000000000000000,
+    ),
+    "low": dict(
+        min_target_utilization=200000000000000000,
+        max_target_utilization=400000000000000000,
+        starting_interest_per_second=ONE_PERCENT * 5,
+        min_interest=ONE_PERCENT * 2,
+        max_interest=ONE_PERCENT * 35,
+        elasticity=28800000000000000000000000000000000000000,
+    ),
+    "medium": dict(
+        min_target_utilization=500000000000000000,
+        max_target_utilization=600000000000000000,
+        starting_interest_per_second=ONE_PERCENT * 7,
+        min_interest=ONE_PERCENT * 4,
+        max_interest=ONE_PERCENT * 150,
+        elasticity=28800000000000000000000000000000000000000,
+    ),
+    "high": dict(
+        min_target_utilization=300000000000000000,
+        max_target_utilization=500000000000000000,
+        starting_interest_per_second=ONE_PERCENT * 12,
+        min_interest=ONE_PERCENT * 5,
+        max_interest=ONE_PERCENT * 1000,
+        elasticity=20000000000000000000000000000000000000000,
+    ),
+}
+
+POOL_FIELDS = (
+    "asset_elastic",
+    "asset_base",
+    "borrow_elastic",
+    "borrow_base",
+    "interest_per_second",
+    "last_accrued",
+    "fees_earned_fraction",
+    "last_interest_per_second",
+    "last_elapsed_time",
+    "protocol_fee",
+    "default_protocol_fee",
+    "borrow_opening_fee",
+    "total_collateral_share",
+)
+USER_FIELDS = ("balance", "borrow_part", "collateral_share")
+
+
+class CogPairModel:
+    def __init__(
+        self,
+        pools,
+        users,
+        min_target_utilization,
+        max_target_utilization,
+        starting_interest_per_second,
+        min_interest,
+        max_interest,
+        elasticity,
+        compounding=False,
+        timestamp=1,
+        exact=True,
+    ):
+        """
+        @param pools Number of pools simulated side by side
+        @param users Number of accounts per pool
+        @param timestamp Current block timestamp, shared by every pool. Like any block timestamp it
+             must be non zero, or the first accrual never happens
+        @dev Rate parameters are scalars or arrays of length `pools`, so a sweep over elasticity or
+             utilization bands is a single model
+        """
+        self.pools = pools
+        self.users = users
+        self.exact = exact
+        self.timestamp = timestamp
+
+        self.min_target_utilization = self._array(min_target_utilization)
+        self.max_target_utilization = self._array(max_target_utilization)
+        self.starting_interest_per_second = self._array(starting_interest_per_second)
+        self.min_interest = self._array(min_interest)
+        self.max_interest = self._array(max_interest)
+        self.elasticity = self._array(elasticity)
+        self.compounding = np.broadcast_to(np.asarray(compounding, dtype=bool), (pools,))
+
+        self.state = {field: self._array(0) for field in POOL_FIELDS}
+        self.state.update(
+            {field: self._array(0, (pools, users)) for field in USER_FIELDS}
+        )
+        self.state["protocol_fee"] = self._array(100000)
+        self.state["default_protocol_fee"] = self._array(100000)
+        self.state["borrow_opening_fee"] = self._array(50)
+        self.paused = np.zeros(pools, dtype=bool)
+
+    @classmethod
+    def from_tier(cls, tier, pools, users, **kwargs):
+        return cls(pools, users, **TIERS[tier], **kwargs)
+
+    def __getattr__(self, name):
+        # Expose state fields as attributes, e.g. model.borrow_elastic
+        state = self.__dict__.get("state")
+        if state is not None and name in state:
+            return state[name]
+        raise AttributeError(name)
+
+    # ///////////////////////////////////////////////////// #
+    #                       Helpers                         #
+    # ///////////////////////////////////////////////////// #
+
+    def _array(self, value, shape=None):
+        shape = (self.pools,) if shape is None else shape
+        if self.exact:
+            # Going through np.asarray would promote mixed int64 / uint64 values to float64
+            if isinstance(value, np.ndarray):
+                value = value.astype(object)
+            else:
+                value = np.array(value, dtype=object)
+            return np.array(np.broadcast_to(value, shape), dtype=object)
+        return np.array(np.broadcast_to(np.asarray(value, dtype=np.float64), shape))
+
+    def _div(self, x, y):
+        # Division by zero only happens in lanes the contract never reaches
+        safe = np.where(y == 0, 1, y)
+        return x // safe
+
+    def _isqrt(self, x):
+        if self.exact:
+            return np.array([math.isqrt(int(v)) for v in x], dtype=object)
+        return np.floor(np.sqrt(x))
+
+    def _commit(self, new, mask):
+        for field, value in new.items():
+            old = self.state[field]
+            lane = mask if old.ndim == 1 else mask[:, None]
+            self.state[field] = np.where(lane, value, old)
+
+    def advance(self, seconds):
+        self.timestamp += seconds
+
+    def _rpow(self, x, n):
+        """
+        @dev Vectorized cog_pair._rpow, x ** n in COMPOUNDING_PRECISION fixed point
+        """
+        result = self._array(COMPOUNDING_PRECISION)
+        base = np.array(x)
+        exponent = np.array(n)
+        done = np.zeros(self.pools, dtype=bool)
+        saturated = np.zeros(self.pools, dtype=bool)
+        for _ in range(64):
+            odd = ~done & (exponent % 2 == 1)
+            result = np.where(odd, result * base // COMPOUNDING_PRECISION, result)
+            overflow = odd & (result > MASK_128)
+            saturated |= overflow
+            done |= overflow
+            exponent = exponent // 2
+            done |= exponent == 0
+            base = np.where(done, base, base * base // COMPOUNDING_PRECISION)
+            overflow = ~done & (base > MASK_128)
+            saturated |= overflow
+            done |= overflow
+            if done.all():
+                break
+        return np.where(saturated, MASK_128, result)
+
+    def _compound_rate(self, borrow_elastic, asset_elastic, rate, elapsed):
+        """
+        @dev Vectorized cog_pair._compound_rate, the rate's path from the utilization at the start
+             of the period
+        @return The rate at the end of the period and its sum over every second of it, both scaled
+             by COMPOUNDING_PRECISION
+        """
+        utilization = self._div(
+            borrow_elastic * UTILIZATION_PRECISION, asset_elastic + borrow_elastic
+        )
+        elasticity = self.elasticity
+        under = utilization < self.min_target_utilization
+        over = ~under & (utilization > self.max_target_utilization)
+        under_factor = self._div(
+            (self.min_target_utilization - utilization) * FACTOR_PRECISION,
+            self.min_target_utilization,
+        )
+        over_factor = self._div(
+            (utilization - self.max_target_utilization) * FACTOR_PRECISION,
+            self.max_target_utilization,
+        )
+        step = np.where(
+            under,
+            COMPOUNDING_PRECISION
+            - elasticity * COMPOUNDING_PRECISION // (elasticity + under_factor * under_factor),
+            np.where(over, over_factor * over_factor * COMPOUNDING_PRECISION // elasticity, 0),
+        )
+        scale = COMPOUNDING_PRECISION // INTEREST_PER_SECOND_PRECISION
+        bound = np.where(under, self.min_interest * scale, self.max_interest * scale)
+        moving = step != 0
+
+        # Walk the period one set bit of elapsed at a time, lanes leave as soon as they overshoot
+        end = rate
+        total = self._array(0)
+        distance = step
+        bits = self._array(0)
+        overshoot = np.zeros(self.pools, dtype=bool)
+        live = moving.copy()
+        for i in range(64):
+            live = live & (elapsed // 2**i != 0)
+            if not live.any():
+                break
+            bits = np.where(live, i + 1, bits)
+            bit = live & (elapsed // 2**i % 2 == 1)
+            series = self._div(distance * COMPOUNDING_PRECISION, step)
+            total = np.where(bit, total + end * series // COMPOUNDING_PRECISION, total)
+            grown = end * (COMPOUNDING_PRECISION + distance) // COMPOUNDING_PRECISION
+            decayed = end * (COMPOUNDING_PRECISION - distance) // COMPOUNDING_PRECISION
+            end = np.where(bit, np.where(over, grown, decayed), end)
+            out = bit & np.where(over, end > bound, end < bound)
+            more = live & ~out & (elapsed // 2 ** (i + 1) != 0)
+            saturated = more & over & (distance > MASK_128)
+            overshoot |= out | saturated
+            live = more & ~saturated
+            squared = distance * distance // COMPOUNDING_PRECISION
+            distance = np.where(
+                live, np.where(over, 2 * distance + squared, 2 * distance - squared), distance
+            )
+
+        # Lanes that reach their bound part way search for how long they stay within it
+        if overshoot.any():
+            start = rate
+            below = self._array(0)
+            seconds = self._array(0)
+            for j in range(64):
+                lane = overshoot & (j < bits)
+                if not lane.any():
+                    break
+                i = np.where(lane, bits - 1 - j, 0)
+                if j != 0:
+                    root = np.where(
+                        over,
+                        self._isqrt((COMPOUNDING_PRECISION + distance) * COMPOUNDING_PRECISION)
+                        - COMPOUNDING_PRECISION,
+                        COMPOUNDING_PRECISION
+                        - self._isqrt(
+                            np.maximum(COMPOUNDING_PRECISION - distance, 0) * COMPOUNDING_PRECISION
+                        ),
+                    )
+                    distance = np.where(lane, root, distance)
+                distance = np.where(lane & (i == 0), step, distance)
+                chunk = 2**i
+                grown = start * (COMPOUNDING_PRECISION + distance) // COMPOUNDING_PRECISION
+                decayed = start * (COMPOUNDING_PRECISION - distance) // COMPOUNDING_PRECISION
+                next_rate = np.where(over, grown, decayed)
+                within = np.where(over, next_rate <= bound, next_rate >= bound)
+                take = lane & (seconds + chunk <= elapsed) & within
+                series = self._div(distance * COMPOUNDING_PRECISION, step)
+                below = np.where(take, below + start * series // COMPOUNDING_PRECISION, below)
+                start = np.where(take, next_rate, start)
+                seconds = np.where(take, seconds + chunk, seconds)
+            total = np.where(overshoot, below + bound * (elapsed - seconds), total)
+            end = np.where(overshoot, bound, end)
+
+        return np.where(moving, end, rate), np.where(moving, total, rate * elapsed)
+
+    @staticmethod
+    def to_base_round_up(elastic, base, amount):
+        """
+        @dev Vectorized Rebase.to_base_round_up, for totals `elastic` / `base`
+        """
+        safe_elastic = np.where(elastic == 0, 1, elastic)
+        safe_base = np.where(base == 0, 1, base)
+        part = amount * base // safe_elastic
+        part = np.where(part * elastic // safe_base < amount, part + 1, part)
+        return np.where(elastic == 0, amount, part)
+
+    @staticmethod
+    def to_elastic(elastic, base, part, round_up):
+        """
+        @dev Vectorized Rebase.to_elastic, for totals `elastic` / `base`
+        """
+        safe_elastic = np.where(elastic == 0, 1, elastic)
+        safe_base = np.where(base == 0, 1, base)
+        amount = part * elastic // safe_base
+        if round_up:
+            amount = np.where(amount * base // safe_elastic < part, amount + 1, amount)
+        return np.where(base == 0, part, amount)
+
+    # ///////////////////////////////////////////////////// #
+    #                       Accrual                         #
+    # ///////////////////////////////////////////////////// #
+
+    def _accrue(self, state, elapsed, mask):
+        """
+        @dev Vectorized cog_pair._accrue, applied to the pools in `mask`
+        @return A new state, the caller decides which pools it is committed for
+        """
+        s = dict(state)
+        now = self.timestamp
+        s["last_accrued"] = np.where(mask, now, s["last_accrued"])
+
+        no_borrows = mask & (s["borrow_base"] == 0)
+        s["interest_per_second"] = np.where(
+            no_borrows, self.starting_interest_per_second, s["interest_per_second"]
+        )
+        mask = mask & ~no_borrows
+        ips = s["interest_per_second"]
+
+        interest = s["borrow_elastic"] * ips * elapsed // INTEREST_PER_SECOND_PRECISION
+        if self.compounding.any():
+            compounded_ips, rate_seconds = self._compound_rate(
+                s["borrow_elastic"],
+                s["asset_elastic"],
+                ips * (COMPOUNDING_PRECISION // INTEREST_PER_SECOND_PRECISION),
+                elapsed,
+            )
+            growth = self._rpow(COMPOUNDING_PRECISION + self._div(rate_seconds, elapsed), elapsed)
+            compounded = s["borrow_elastic"] * growth // COMPOUNDING_PRECISION - s["borrow_elastic"]
+            compounded = np.minimum(compounded, MASK_128 - s["borrow_elastic"])
+            interest = np.where(self.compounding, compounded, interest)
+        interest = np.where(mask, interest, 0)
+
+        s["borrow_elastic"] = s["borrow_elastic"] + interest
+        full_asset_amount = s["asset_elastic"] + s["borrow_elastic"]
+
+        fee_amount = interest * s["protocol_fee"] // PROTOCOL_FEE_PRECISION
+        fee_fraction = self._div(fee_amount * s["asset_base"], full_asset_amount)
+        fee_fraction = np.where(mask, fee_fraction, 0)
+        s["fees_earned_fraction"] = s["fees_earned_fraction"] + fee_fraction
+        s["asset_base"] = s["asset_base"] + fee_fraction
+
+        utilization = self._div(
+            s["borrow_elastic"] * UTILIZATION_PRECISION, full_asset_amount
+        )
+        elasticity = self.elasticity
+
+        under = mask & (utilization < self.min_target_utilization)
+        under_factor = self._div(
+            (self.min_target_utilization - utilization) * FACTOR_PRECISION,
+            self.min_target_utilization,
+        )
+        decayed = ips * elasticity // (elasticity + under_factor * under_factor * elapsed)
+        decayed = np.maximum(decayed, self.min_interest)
+
+        over = mask & (utilization > self.max_target_utilization)
+        over_factor = self._div(
+            (utilization - self.max_target_utilization) * FACTOR_PRECISION,
+            self.max_target_utilization,
+        )
+        grown = ips * (elasticity + over_factor * over_factor * elapsed) // elasticity
+        grown = np.minimum(grown, self.max_interest)
+
+        ips = np.where(under, decayed, np.where(over, grown, ips))
+        if self.compounding.any():
+            compounded_ips = compounded_ips // (COMPOUNDING_PRECISION // INTEREST_PER_SECOND_PRECISION)
+            ips = np.where(mask & self.compounding, compounded_ips, ips)
+        s["interest_per_second"] = ips
+
+        # Surge breaker
+        dt = now - s["last_elapsed_time"]
+        check = mask & (dt > SURGE_DURATION)
+        rising = check & (ips > s["last_interest_per_second"])
+        surge = rising & (ips - s["last_interest_per_second"] > PROTOCOL_SURGE_THRESHOLD)
+        s["last_elapsed_time"] = np.where(surge, now, s["last_elapsed_time"])
+        s["last_interest_per_second"] = np.where(
+            surge, ips, s["last_interest_per_second"]
+        )
+        s["protocol_fee"] = np.where(
+            surge,
+            PROTOCOL_FEE_PRECISION,
+            np.where(check & ~rising, s["default_protocol_fee"], s["protocol_fee"]),
+        )
+        return s
+
+    def _accrued_state(self):
+        elapsed = self.timestamp - self.state["last_accrued"]
+        return self._accrue(self.state, elapsed, elapsed != 0)
+
+    def accrue(self):
+        self.state = self._accrued_state()
+
+    # ///////////////////////////////////////////////////// #
+    #                     Entry Points                      #
+    # ///////////////////////////////////////////////////// #
+
+    def deposit(self, user, amount):
+        """
+        @return Mask of pools where shares were minted, the contract returns 0 and keeps the assets
+            otherwise
+        """
+        amount = self._array(amount)
+        s = dict(self.state)
+        all_share = s["asset_elastic"] + s["borrow_elastic"]
+        fraction = np.where(
+            all_share == 0, amount, self._div(amount * s["asset_base"], all_share)
+        )
+        ok = ~self.paused & (s["asset_base"] + fraction >= MINIMUM_BASE)
+        s["asset_elastic"] = s["asset_elastic"] + amount
+        s["asset_base"] = s["asset_base"] + fraction
+        s["balance"] = s["balance"].copy()
+        s["balance"][:, user] = s["balance"][:, user] + fraction
+        self._commit(s, ok)
+        return ok
+
+    def redeem(self, user, shares):
+        shares = self._array(shares)
+        s = self._accrued_state()
+        all_share = s["asset_elastic"] + s["borrow_elastic"]
+        amount = self._div(shares * all_share, s["asset_base"])
+        ok = (
+            (shares <= s["asset_base"])
+            & (amount <= s["asset_elastic"])
+            & (s["asset_base"] - shares >= MINIMUM_BASE)
+            & (shares <= s["balance"][:, user])
+        )
+        s["asset_elastic"] = s["asset_elastic"] - amount
+        s["asset_base"] = s["asset_base"] - shares
+        s["balance"] = s["balance"].copy()
+        s["balance"][:, user] = s["balance"][:, user] - shares
+        self._commit(s, ok)
+        return ok, np.where(ok, amount, 0)
+
+    def add_collateral(self, user, amount):
+        amount = self._array(amount)
+        self.accrue()
+        s = dict(self.state)
+        s["collateral_share"] = s["collateral_share"].copy()
+        s["collateral_share"][:, user] = s["collateral_share"][:, user] + amount
+        s["total_collateral_share"] = s["total_collateral_share"] + amount
+        self._commit(s, np.ones(self.pools, dtype=bool))
+
+    def remove_collateral(self, user, amount, exchange_rate):
+        amount = self._array(amount)
+        s = self._accrued_state()
+        ok = amount <= s["collateral_share"][:, user]
+        s["collateral_share"] = s["collateral_share"].copy()
+        s["collateral_share"][:, user] = s["collateral_share"][:, user] - amount
+        s["total_collateral_share"] = s["total_collateral_share"] - amount
+        ok &= self._is_solvent(s, user, self._array(exchange_rate))
+        self._commit(s, ok)
+        return ok
+
+    def borrow(self, user, amount, exchange_rate):
+        """
+        @return Mask of pools where the borrow went through
+        """
+        amount = self._array(amount)
+        s = self._accrued_state()
+        ok = ~self.paused & (s["asset_base"] >= MINIMUM_BASE) & (amount <= s["asset_elastic"])
+
+        fee_amount = amount * s["borrow_opening_fee"] // BORROW_OPENING_FEE_PRECISION
+        part = self.to_base_round_up(
+            s["borrow_elastic"], s["borrow_base"], amount + fee_amount
+        )
+        s["borrow_elastic"] = s["borrow_elastic"] + amount + fee_amount
+        s["borrow_base"] = s["borrow_base"] + part
+        s["borrow_part"] = s["borrow_part"].copy()
+        s["borrow_part"][:, user] = s["borrow_part"][:, user] + part
+        s["asset_elastic"] = s["asset_elastic"] - np.where(ok, amount, 0)
+
+        ok &= self._is_solvent(s, user, self._array(exchange_rate))
+        # Utilization moved, so the contract runs the rate update again to catch a surge
+        s = self._accrue(s, self._array(0), ok)
+        self._commit(s, ok)
+        return ok
+
+    def repay(self, user, part):
+        """
+        @return Mask of pools where the repayment went through, and the asset amount owed
+        """
+        part = self._array(part)
+        s = self._accrued_state()
+        ok = part <= s["borrow_part"][:, user]
+        amount = self.to_elastic(s["borrow_elastic"], s["borrow_base"], part, True)
+        ok &= amount <= s["borrow_elastic"]
+        s["borrow_elastic"] = s["borrow_elastic"] - amount
+        s["borrow_base"] = s["borrow_base"] - part
+        s["borrow_part"] = s["borrow_part"].copy()
+        s["borrow_part"][:, user] = s["borrow_part"][:, user] - part
+        s["asset_elastic"] = s["asset_elastic"] + amount
+        self._commit(s, ok)
+        return ok, np.where(ok, amount, 0)
+
+    def liquidate(self, user, max_borrow_parts, exchange_rate):
+        """
+        @return Mask of pools where the user was liquidated, the asset amount owed by the
+            liquidator, and the collateral share released to them
+        """
+        max_borrow_parts = self._array(max_borrow_parts)
+        exchange_rate = self._array(exchange_rate)
+        s = self._accrued_state()
+        ok = ~self._is_solvent(s, user, exchange_rate)
+
+        available = s["borrow_part"][:, user]
+        part = np.minimum(max_borrow_parts, available)
+        borrow_amount = self.to_elastic(s["borrow_elastic"], s["borrow_base"], part, False)
+        collateral = (
+            borrow_amount
+            * LIQUIDATION_MULTIPLIER
+            * exchange_rate
+            // (LIQUIDATION_MULTIPLIER_PRECISION * EXCHANGE_RATE_PRECISION)
+        )
+        user_collateral = s["collateral_share"][:, user]
+        # Bad debt, the full position is closed for whatever collateral is left
+        collateral = np.where(
+            (collateral > user_collateral) & (part == available), user_collateral, collateral
+        )
+        ok &= (borrow_amount != 0) & (collateral <= user_collateral)
+
+        s["borrow_part"] = s["borrow_part"].copy()
+        s["borrow_part"][:, user] = available - part
+        s["collateral_share"] = s["collateral_share"].copy()
+        s["collateral_share"][:, user] = user_collateral - collateral
+        s["total_collateral_share"] = s["total_collateral_share"] - collateral
+        s["borrow_elastic"] = s["borrow_elastic"] - borrow_amount
+        s["borrow_base"] = s["borrow_base"] - part
+        # Matches the contract, which credits lenders with the parts rather than the amount
+        s["asset_elastic"] = s["asset_elastic"] + part
+        self._commit(s, ok)
+        return ok, np.where(ok, borrow_amount, 0), np.where(ok, collateral, 0)
+
+    # ///////////////////////////////////////////////////// #
+    #                        Views                          #
+    # ///////////////////////////////////////////////////// #
+
+    def _is_solvent(self, state, user, exchange_rate):
+        part = state["borrow_part"][:, user]
+        collateral = state["collateral_share"][:, user]
+        collateral_amount = (
+            collateral
+            * (EXCHANGE_RATE_PRECISION // COLLATERIZATION_RATE_PRECISION)
+            * COLLATERIZATION_RATE
+        )
+        borrow_value = self._div(
+            part * state["borrow_elastic"] * exchange_rate, state["borrow_base"]
+        )
+        return (part == 0) | ((collateral != 0) & (collateral_amount >= borrow_value))
+
+    def is_solvent(self, user, exchange_rate):
+        """
+        @dev Same projection as cog_pair.is_solvent, interest accrued to the current timestamp
+        """
+        return self._is_solvent(self._accrued_state(), user, self._array(exchange_rate))
+
+    def utilization(self):
+        full_asset_amount = self.asset_elastic + self.borrow_elastic
+        return self._div(self.borrow_elastic * UTILIZATION_PRECISION, full_asset_amount)
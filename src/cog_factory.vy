@@ -102,11 +102,37 @@ def _transfer_ownership(new_owner: address):
     log OwnershipTransferred(old_owner, new_owner)
 
 
+struct Rebase:
+        elastic: uint128
+        base: uint128
+
+
+struct AccrueInfo:
+        interest_per_second: uint64
+        last_accrued: uint64
+        fees_earned_fraction: uint128
+
+
+struct SurgeInfo:
+        last_interest_per_second: uint64
+        last_elapsed_time: uint64
+
+
 interface ICogPair:
     def update_borrow_fee(newFee: uint256): nonpayable
     def update_default_protocol_fee(newFee: uint256): nonpayable
     def pause(): nonpayable
     def unpause(): nonpayable
+    def total_asset() -> Rebase: view
+    def total_borrow() -> Rebase: view
+    def accrue_info() -> AccrueInfo: view
+    def exchange_rate() -> uint256: view
+    def roll_over_pol_to(_fee_to: address) -> uint256: nonpayable
+    def surge_info() -> SurgeInfo: view
+    def accrue(): nonpayable
+    def protocol_fee() -> uint256: view
+    def asset() -> address: view
+    def collateral() -> address: view
 
 
 # ///////////////////////////////////////////////////// #
@@ -137,6 +163,23 @@ event HighPairCreated:
     pair: indexed(address)
 
 
+event TierPairCreated:
+    tier: indexed(uint256)
+    pair: indexed(address)
+    asset: address
+    collateral: address
+
+
+event TierUpdated:
+    tier: indexed(uint256)
+    min_target_utilization: uint256
+    max_target_utilization: uint256
+    starting_interest_per_second: uint64
+    min_interest_per_second: uint64
+    max_interest_per_second: uint64
+    elasticity: uint256
+
+
 event CustomPairCreated:
     blueprint: indexed(address)
     pair: indexed(address)
@@ -151,6 +194,99 @@ priv_users: public(HashMap[address, bool])
 fee_to: public(address)
 
 
+# ///////////////////////////////////////////////////// #
+#                     Pair Registry                     #
+# ///////////////////////////////////////////////////// #
+
+# Tier of each deployment function, 0 is left for addresses that aren't pairs of this factory.
+# Tiers above TIER_CUSTOM are added by the owner with set_tier
+TIER_STABLE: constant(uint256) = 1
+TIER_LOW: constant(uint256) = 2
+TIER_MEDIUM: constant(uint256) = 3
+TIER_HIGH: constant(uint256) = 4
+TIER_CUSTOM: constant(uint256) = 5
+
+MAX_PAGE: constant(uint256) = 64
+
+# Every pair deployed from this factory's blueprint, in deployment order
+all_pairs: public(HashMap[uint256, address])
+pair_count: public(uint256)
+
+# asset => collateral => tier => the canonical pair for it. Anyone can deploy a pair for a market,
+# with any oracle, so only the owner's deployments and set_pair write it
+get_pair: public(HashMap[address, HashMap[address, HashMap[uint256, address]]])
+
+pair_tier: public(HashMap[address, uint256])
+
+
+UTILIZATION_PRECISION: constant(uint256) = 1000000000000000000  # 1e18
+
+# Rate curve each tier deploys with, set in __init__ for the standard tiers and by the owner with
+# set_tier, a zero max_interest_per_second marks a tier that isn't configured
+struct TierParams:
+    min_target_utilization: uint256
+    max_target_utilization: uint256
+    starting_interest_per_second: uint64
+    min_interest_per_second: uint64
+    max_interest_per_second: uint64
+    elasticity: uint256
+
+
+tiers: public(HashMap[uint256, TierParams])
+
+
+struct PairSummary:
+        pair: address
+        tier: uint256
+        total_asset: Rebase
+        total_borrow: Rebase
+        accrue_info: AccrueInfo
+        exchange_rate: uint256
+
+
+@internal
+def _register(pair: address, asset: address, collateral: address, tier: uint256):
+    index: uint256 = self.pair_count
+    self.all_pairs[index] = pair
+    self.pair_count = index + 1
+    if msg.sender == self.owner:
+        self.get_pair[asset][collateral][tier] = pair
+    self.pair_tier[pair] = tier
+
+
+@view
+@external
+def get_pairs(start: uint256, count: uint256) -> DynArray[PairSummary, MAX_PAGE]:
+    """
+    @dev Loads a page of pairs with their stored state, so every pool can be listed in a few calls
+
+    @param start The index in all_pairs of the first pair to return
+    @param count The number of pairs to return, at most MAX_PAGE
+
+    @return summaries The pairs with their tier, total_asset, total_borrow, accrue_info and exchange_rate,
+        shorter than count once the end of the registry is reached
+    """
+    summaries: DynArray[PairSummary, MAX_PAGE] = []
+    end: uint256 = min(start + min(count, MAX_PAGE), self.pair_count)
+    for i in range(MAX_PAGE):
+        if start + i >= end:
+            break
+        pair: address = self.all_pairs[start + i]
+        summaries.append(
+            PairSummary(
+                {
+                    pair: pair,
+                    tier: self.pair_tier[pair],
+                    total_asset: ICogPair(pair).total_asset(),
+                    total_borrow: ICogPair(pair).total_borrow(),
+                    accrue_info: ICogPair(pair).accrue_info(),
+                    exchange_rate: ICogPair(pair).exchange_rate(),
+                }
+            )
+        )
+    return summaries
+
+
 # ///////////////////////////////////////////////////// #
 #                     Ownership Functions               #
 # ///////////////////////////////////////////////////// #
@@ -198,6 +334,105 @@ def change_fee_to(new_recipient: address):
     self.fee_to = new_recipient
 
 
+@external
+def set_pair(asset: address, collateral: address, tier: uint256, pair: address):
+    """
+    @dev Sets the canonical pair of a market and tier, any pair of this factory deployed for it
+
+    @param asset The address of the asset token
+    @param collateral The address of the collateral token
+    @param tier The tier of the pair
+    @param pair The address of the pair, or the zero address to clear the entry
+    """
+    self._check_owner()
+    if pair != empty(address):
+        assert self.pair_tier[pair] == tier, "CogFactory: Unknown pair"
+        assert (
+            ICogPair(pair).asset() == asset and ICogPair(pair).collateral() == collateral
+        ), "CogFactory: Wrong market"
+    self.get_pair[asset][collateral][tier] = pair
+
+
+@pure
+@internal
+def _check_rate_curve(
+    min_target_utilization: uint256,
+    max_target_utilization: uint256,
+    min_interest_per_second: uint64,
+    max_interest_per_second: uint64,
+    elasticity: uint256,
+):
+    """
+    @dev Rejects a rate curve a pair can't accrue on, every registered pair has to pass it so
+        none of them can make a batch over the registry revert. A starting rate outside the
+        bounds is left alone, the pair clamps it on the first rate update
+    """
+    assert (
+        min_target_utilization <= max_target_utilization
+        and max_target_utilization != 0
+        and max_target_utilization <= UTILIZATION_PRECISION
+    ), "CogFactory: Invalid tier"
+    assert (
+        min_interest_per_second <= max_interest_per_second
+        and max_interest_per_second != 0
+        and elasticity != 0
+    ), "CogFactory: Invalid tier"
+
+
+@external
+def set_tier(
+    tier: uint256,
+    min_target_utilization: uint256,
+    max_target_utilization: uint256,
+    starting_interest_per_second: uint64,
+    min_interest_per_second: uint64,
+    max_interest_per_second: uint64,
+    elasticity: uint256,
+):
+    """
+    @dev Sets the rate curve a tier deploys with, replacing a standard tier's or adding a new one.
+        Pairs already deployed keep the curve they were deployed with
+
+    @param tier The tier id, any but 0 and TIER_CUSTOM
+    @param min_target_utilization The minimum target utilization
+    @param max_target_utilization The maximum target utilization
+    @param starting_interest_per_second The starting interest per second
+    @param min_interest_per_second The minimum interest per second
+    @param max_interest_per_second The maximum interest per second
+    @param elasticity The interest rate elasticity factor
+    """
+    self._check_owner()
+    assert tier != 0 and tier != TIER_CUSTOM, "CogFactory: Unknown tier"
+    self._check_rate_curve(
+        min_target_utilization,
+        max_target_utilization,
+        min_interest_per_second,
+        max_interest_per_second,
+        elasticity,
+    )
+    assert (
+        min_interest_per_second <= starting_interest_per_second
+        and starting_interest_per_second <= max_interest_per_second
+    ), "CogFactory: Invalid tier"
+    self.tiers[tier] = TierParams({
+        min_target_utilization: min_target_utilization,
+        max_target_utilization: max_target_utilization,
+        starting_interest_per_second: starting_interest_per_second,
+        min_interest_per_second: min_interest_per_second,
+        max_interest_per_second: max_interest_per_second,
+        elasticity: elasticity,
+    })
+    log TierUpdated(
+        tier,
+        min_target_utilization,
+        max_target_utilization,
+        starting_interest_per_second,
+        min_interest_per_second,
+        max_interest_per_second,
+        elasticity,
+    )
+
+
 @external
 def pause(pair: address):
     """
@@ -220,6 +455,258 @@ def unpause(pair: address):
     ICogPair(pair).unpause()
 
 
+# ///////////////////////////////////////////////////// #
+#                 Batched Admin Functions               #
+# ///////////////////////////////////////////////////// #
+
+MAX_BATCH: constant(uint256) = 64
+
+
+@view
+@internal
+def _pairs_in_tier(tier: uint256, start: uint256, count: uint256) -> DynArray[address, MAX_BATCH]:
+    """
+    @param tier The tier to select
+    @param start The index in all_pairs to start scanning from
+    @param count The number of registry entries to scan, at most MAX_BATCH
+
+    @return pairs The scanned pairs that belong to the tier
+    """
+    assert count <= MAX_BATCH, "CogFactory: Batch too large"
+    pairs: DynArray[address, MAX_BATCH] = []
+    end: uint256 = min(start + count, self.pair_count)
+    for i in range(MAX_BATCH):
+        if start + i >= end:
+            break
+        pair: address = self.all_pairs[start + i]
+        if self.pair_tier[pair] == tier:
+            pairs.append(pair)
+    return pairs
+
+
+@view
+@internal
+def _registry_window(start: uint256, count: uint256) -> DynArray[address, MAX_BATCH]:
+    assert count <= MAX_BATCH, "CogFactory: Batch too large"
+    pairs: DynArray[address, MAX_BATCH] = []
+    end: uint256 = min(start + count, self.pair_count)
+    for i in range(MAX_BATCH):
+        if start + i >= end:
+            break
+        pairs.append(self.all_pairs[start + i])
+    return pairs
+
+
+@internal
+def _update_borrow_fees(pairs: DynArray[address, MAX_BATCH], newFee: uint256):
+    for pair in pairs:
+        ICogPair(pair).update_borrow_fee(newFee)
+
+
+@internal
+def _update_default_protocol_fees(pairs: DynArray[address, MAX_BATCH], newFee: uint256):
+    for pair in pairs:
+        ICogPair(pair).update_default_protocol_fee(newFee)
+
+
+@external
+def pause_many(pairs: DynArray[address, MAX_BATCH]):
+    """
+    @dev Pauses every given pair in one transaction
+
+    @param pairs The addresses of the pairs to pause
+    """
+    assert (self.priv_users[msg.sender] == True)
+    for pair in pairs:
+        ICogPair(pair).pause()
+
+
+@external
+def unpause_many(pairs: DynArray[address, MAX_BATCH]):
+    """
+    @dev Unpauses every given pair in one transaction
+
+    @param pairs The addresses of the pairs to unpause
+    """
+    assert (self.priv_users[msg.sender] == True)
+    for pair in pairs:
+        ICogPair(pair).unpause()
+
+
+@external
+def update_borrow_fee_many(pairs: DynArray[address, MAX_BATCH], newFee: uint256):
+    """
+    @param pairs The addresses of the pairs to change the fee of
+    @param newFee The fee to change the borrow fee to
+    """
+    self._check_owner()
+    self._update_borrow_fees(pairs, newFee)
+
+
+@external
+def update_default_protocol_fee_many(pairs: DynArray[address, MAX_BATCH], newFee: uint256):
+    """
+    @param pairs The addresses of the pairs to change the fee of
+    @param newFee The fee to change the default protocol fee to
+    """
+    self._check_owner()
+    self._update_default_protocol_fees(pairs, newFee)
+
+
+@external
+def update_borrow_fee_by_tier(
+    tier: uint256, newFee: uint256, start: uint256 = 0, count: uint256 = MAX_BATCH
+) -> uint256:
+    """
+    @dev Sets the borrow fee on the pairs of a tier, scanning the registry from `start`,
+        registries longer than MAX_BATCH are covered over several calls
+
+    @param tier The tier of the pairs to update, as in get_pair
+    @param newFee The fee to change the borrow fee to
+    @param start The index in all_pairs to start scanning from
+    @param count The number of registry entries to scan, at most MAX_BATCH
+
+    @return updated The number of pairs updated
+    """
+    self._check_owner()
+    pairs: DynArray[address, MAX_BATCH] = self._pairs_in_tier(tier, start, count)
+    self._update_borrow_fees(pairs, newFee)
+    return len(pairs)
+
+
+@external
+def update_default_protocol_fee_by_tier(
+    tier: uint256, newFee: uint256, start: uint256 = 0, count: uint256 = MAX_BATCH
+) -> uint256:
+    """
+    @dev Sets the default protocol fee on the pairs of a tier, scanning the registry from `start`,
+        registries longer than MAX_BATCH are covered over several calls
+
+    @param tier The tier of the pairs to update, as in get_pair
+    @param newFee The fee to change the default protocol fee to
+    @param start The index in all_pairs to start scanning from
+    @param count The number of registry entries to scan, at most MAX_BATCH
+
+    @return updated The number of pairs updated
+    """
+    self._check_owner()
+    pairs: DynArray[address, MAX_BATCH] = self._pairs_in_tier(tier, start, count)
+    self._update_default_protocol_fees(pairs, newFee)
+    return len(pairs)
+
+
+# ///////////////////////////////////////////////////// #
+#                 Protocol Owned Liquidity              #
+# ///////////////////////////////////////////////////// #
+
+@internal
+def _harvest(pairs: DynArray[address, MAX_BATCH]) -> uint256:
+    _fee_to: address = self.fee_to
+    total: uint256 = 0
+    for pair in pairs:
+        # A pair that fails to roll over is skipped, so it can't hold up the rest of the batch
+        success: bool = False
+        response: Bytes[32] = b""
+        success, response = raw_call(
+            pair,
+            _abi_encode(_fee_to, method_id=method_id("roll_over_pol_to(address)")),
+            max_outsize=32,
+            revert_on_failure=False,
+        )
+        if success:
+            total += convert(response, uint256)
+    return total
+
+
+@external
+def harvest_pol(pairs: DynArray[address, MAX_BATCH]) -> uint256:
+    """
+    @dev Rolls over the protocol fees of every given pair to fee_to, like roll_over_pol
+        but reading fee_to once for the whole batch
+
+    @param pairs The addresses of the pairs to harvest, all deployed by this factory
+
+    @return total The sum of the fee fractions rolled over, in each pair's shares, pairs that
+        fail to roll over are skipped
+    """
+    for pair in pairs:
+        assert self.pair_tier[pair] != 0, "CogFactory: Unknown pair"
+    return self._harvest(pairs)
+
+
+@external
+def harvest_all_pol(start: uint256 = 0, count: uint256 = MAX_BATCH) -> uint256:
+    """
+    @dev Rolls over the protocol fees of every registered pair in a window of the registry,
+        registries longer than MAX_BATCH are covered over several calls
+
+    @param start The index in all_pairs of the first pair to harvest
+    @param count The number of pairs to harvest, at most MAX_BATCH
+
+    @return total The sum of the fee fractions rolled over, in each pair's shares
+    """
+    return self._harvest(self._registry_window(start, count))
+
+
+# ///////////////////////////////////////////////////// #
+#                   Keeper Functions                    #
+# ///////////////////////////////////////////////////// #
+
+@internal
+def _accrue_stale(pairs: DynArray[address, MAX_BATCH], max_age: uint256) -> DynArray[address, MAX_BATCH]:
+    changed: DynArray[address, MAX_BATCH] = []
+    for pair in pairs:
+        last_accrued: uint256 = convert(ICogPair(pair).accrue_info().last_accrued, uint256)
+        if last_accrued + max_age > block.timestamp or last_accrued == block.timestamp:
+            continue
+        protocol_fee: uint256 = ICogPair(pair).protocol_fee()
+        # A pair that fails to accrue is skipped, so it can't hold up the rest of the batch
+        if not raw_call(pair, method_id("accrue()"), revert_on_failure=False):
+            continue
+        # The pair only resets its fee once its rate stops rising, so the fee itself tells when
+        # a surge ends. A surge that trips again, or under a 100% default, leaves the fee as it
+        # was, and is told by the breaker starting at this accrual
+        surge_start: uint256 = convert(ICogPair(pair).surge_info().last_elapsed_time, uint256)
+        if surge_start == block.timestamp or ICogPair(pair).protocol_fee() != protocol_fee:
+            changed.append(pair)
+    return changed
+
+
+@external
+def accrue_many(
+    pairs: DynArray[address, MAX_BATCH], max_age: uint256
+) -> DynArray[address, MAX_BATCH]:
+    """
+    @dev Accrues every given pair that hasn't been accrued for max_age seconds, so idle pairs
+        keep their rate and surge breaker current without a keeper transaction each
+
+    @param pairs The addresses of the pairs to accrue, all deployed by this factory
+    @param max_age Pairs accrued less than this many seconds ago are skipped, as are pairs
+        that fail to accrue
+
+    @return changed The pairs whose protocol fee changed or whose surge breaker tripped on this accrual
+    """
+    for pair in pairs:
+        assert self.pair_tier[pair] != 0, "CogFactory: Unknown pair"
+    return self._accrue_stale(pairs, max_age)
+
+
+@external
+def accrue_all(
+    max_age: uint256, start: uint256 = 0, count: uint256 = MAX_BATCH
+) -> DynArray[address, MAX_BATCH]:
+    """
+    @dev Accrues the stale pairs in a window of the registry, like accrue_many
+
+    @param max_age Pairs accrued less than this many seconds ago are skipped
+    @param start The index in all_pairs of the first pair to accrue
+    @param count The number of pairs to look at, at most MAX_BATCH
+
+    @return changed The pairs whose protocol fee changed or whose surge breaker tripped on this accrual
+    """
+    return self._accrue_stale(self._registry_window(start, count), max_age)
+
+
 @external
 def __init__(_blueprint: address, _fee_to: address):
     """
@@ -232,6 +719,43 @@ def __init__(_blueprint: address, _fee_to: address):
     self.fee_to = _fee_to
     self._transfer_ownership(msg.sender)
 
+    # 15% to 35% target utilization, 2% minimum APR, 5% starting APR, 25% maximum APR
+    self.tiers[TIER_STABLE] = TierParams({
+        min_target_utilization: 150000000000000000,
+        max_target_utilization: 350000000000000000,
+        starting_interest_per_second: ONE_PERCENT * 5,
+        min_interest_per_second: ONE_PERCENT * 2,
+        max_interest_per_second: ONE_PERCENT * 25,
+        elasticity: 28800000000000000000000000000000000000000,
+    })
+    # 20% to 40% target utilization, 2% minimum APR, 5% starting APR, 35% maximum APR
+    self.tiers[TIER_LOW] = TierParams({
+        min_target_utilization: 200000000000000000,
+        max_target_utilization: 400000000000000000,
+        starting_interest_per_second: ONE_PERCENT * 5,
+        min_interest_per_second: ONE_PERCENT * 2,
+        max_interest_per_second: ONE_PERCENT * 35,
+        elasticity: 28800000000000000000000000000000000000000,
+    })
+    # 50% to 60% target utilization, 4% minimum APR, 7% starting APR, 150% maximum APR
+    self.tiers[TIER_MEDIUM] = TierParams({
+        min_target_utilization: 500000000000000000,
+        max_target_utilization: 600000000000000000,
+        starting_interest_per_second: ONE_PERCENT * 7,
+        min_interest_per_second: ONE_PERCENT * 4,
+        max_interest_per_second: ONE_PERCENT * 150,
+        elasticity: 28800000000000000000000000000000000000000,
+    })
+    # 30% to 50% target utilization, 5% minimum APR, 12% starting APR, 1000% maximum APR
+    self.tiers[TIER_HIGH] = TierParams({
+        min_target_utilization: 300000000000000000,
+        max_target_utilization: 500000000000000000,
+        starting_interest_per_second: ONE_PERCENT * 12,
+        min_interest_per_second: ONE_PERCENT * 5,
+        max_interest_per_second: ONE_PERCENT * 1000,
+        elasticity: 20000000000000000000000000000000000000000,
+    })
+
 
 # ///////////////////////////////////////////////////// #
 #               Pair Deployment Functions               #
@@ -240,46 +764,73 @@ def __init__(_blueprint: address, _fee_to: address):
 # Approx. 1% APR for interest_per_second
 ONE_PERCENT: constant(uint64) = 317097920
 
+
+@internal
+def _deploy_tier(
+    asset: address, collateral: address, oracle: address, tier: uint256
+) -> address:
+    params: TierParams = self.tiers[tier]
+    assert params.max_interest_per_second != 0, "CogFactory: Unknown tier"
+    pair: address = create_from_blueprint(
+        blueprint,
+        asset,
+        collateral,
+        oracle,
+        params.min_target_utilization,
+        params.max_target_utilization,
+        params.starting_interest_per_second,
+        params.min_interest_per_second,
+        params.max_interest_per_second,
+        params.elasticity,
+        False,
+        code_offset=3,
+    )
+    self._register(pair, asset, collateral, tier)
+
+    if tier == TIER_STABLE:
+        log StablePairCreated(asset, collateral, pair)
+    elif tier == TIER_LOW:
+        log LowPairCreated(asset, collateral, pair)
+    elif tier == TIER_MEDIUM:
+        log MediumPairCreated(asset, collateral, pair)
+    elif tier == TIER_HIGH:
+        log HighPairCreated(asset, collateral, pair)
+    else:
+        log TierPairCreated(tier, pair, asset, collateral)
+    return pair
+
+
 @external
-def deploy_stable_risk_pair(
-    asset: address, collateral: address, oracle: address
+def deploy_pair(
+    asset: address, collateral: address, oracle: address, tier: uint256
 ) -> address:
     """
-    @dev Deploy a stable risk pair
+    @dev Deploy a pair with the parameters of one of the configured tiers
 
     @param asset The address of the asset token
     @param collateral The address of the collateral token
     @param oracle The address of the oracle to use for the pair
+    @param tier The tier id, TIER_STABLE to TIER_HIGH or one added with set_tier
 
     @return pair The address of the deployed pair
     """
+    return self._deploy_tier(asset, collateral, oracle, tier)
 
-    # 15% minimum utilization, 35% maximum utilization
-    MINIMUM_TARGET_UTILIZATION: uint256 = 150000000000000000
-    MAXIMUM_TARGET_UTILIZATION: uint256 = 350000000000000000
 
-    # 2% minimum APR, 5% starting APR, 25% maximum APR
-    STARTING_INTEREST_PER_SECOND: uint64 = (ONE_PERCENT * 5)
-    MINIMUM_INTEREST_PER_SECOND: uint64 = (ONE_PERCENT * 2)
-    MAXIMUM_INTEREST_PER_SECOND: uint64 = (ONE_PERCENT * 25)
+@external
+def deploy_stable_risk_pair(
+    asset: address, collateral: address, oracle: address
+) -> address:
+    """
+    @dev Deploy a stable risk pair
 
-    INTEREST_ELASTICITY: uint256 = 28800000000000000000000000000000000000000
+    @param asset The address of the asset token
+    @param collateral The address of the collateral token
+    @param oracle The address of the oracle to use for the pair
 
-    pair: address = create_from_blueprint(
-        blueprint,
-        asset,
-        collateral,
-        oracle,
-        MINIMUM_TARGET_UTILIZATION,
-        MAXIMUM_TARGET_UTILIZATION,
-        STARTING_INTEREST_PER_SECOND,
-        MINIMUM_INTEREST_PER_SECOND,
-        MAXIMUM_INTEREST_PER_SECOND,
-        INTEREST_ELASTICITY,
-        code_offset=3,
-    )
-    log StablePairCreated(asset, collateral, pair)
-    return pair
+    @return pair The address of the deployed pair
+    """
+    return self._deploy_tier(asset, collateral, oracle, TIER_STABLE)
 
 
 @external
@@ -295,34 +846,7 @@ def deploy_low_risk_pair(
 
     @return pair The address of the deployed pair
     """
-
-    # 20% minimum utilization, 40% maximum utilization
-    MINIMUM_TARGET_UTILIZATION: uint256 = 200000000000000000
-    MAXIMUM_TARGET_UTILIZATION: uint256 = 400000000000000000
-
-    # 2% minimum interest per second, 5% starting interest per second, 35% maximum interest per second
-    STARTING_INTEREST_PER_SECOND: uint64 = (ONE_PERCENT * 5)
-    MINIMUM_INTEREST_PER_SECOND: uint64 = (ONE_PERCENT * 2)
-    MAXIMUM_INTEREST_PER_SECOND: uint64 = (ONE_PERCENT * 35)
-
-    INTEREST_ELASTICITY: uint256 = 28800000000000000000000000000000000000000
-
-    pair: address = create_from_blueprint(
-        blueprint,
-        asset,
-        collateral,
-        oracle,
-        MINIMUM_TARGET_UTILIZATION,
-        MAXIMUM_TARGET_UTILIZATION,
-        STARTING_INTEREST_PER_SECOND,
-        MINIMUM_INTEREST_PER_SECOND,
-        MAXIMUM_INTEREST_PER_SECOND,
-        INTEREST_ELASTICITY,
-        code_offset=3,
-    )
-
-    log LowPairCreated(asset, collateral, pair)
-    return pair
+    return self._deploy_tier(asset, collateral, oracle, TIER_LOW)
 
 
 @external
@@ -338,33 +862,7 @@ def deploy_medium_risk_pair(
 
     @return pair The address of the deployed pair
     """
-
-    # 60% minimum utilization, 60% maximum utilization
-    MINIMUM_TARGET_UTILIZATION: uint256 = 500000000000000000
-    MAXIMUM_TARGET_UTILIZATION: uint256 = 600000000000000000
-
-    # 4% minimum APR, 1% starting APR, 150% maximum APR
-    STARTING_INTEREST_PER_SECOND: uint64 = (ONE_PERCENT * 7)
-    MINIMUM_INTEREST_PER_SECOND: uint64 = (ONE_PERCENT * 4)
-    MAXIMUM_INTEREST_PER_SECOND: uint64 = (ONE_PERCENT * 150)
-
-    INTEREST_ELASTICITY: uint256 = 28800000000000000000000000000000000000000
-
-    pair: address = create_from_blueprint(
-        blueprint,
-        asset,
-        collateral,
-        oracle,
-        MINIMUM_TARGET_UTILIZATION,
-        MAXIMUM_TARGET_UTILIZATION,
-        STARTING_INTEREST_PER_SECOND,
-        MINIMUM_INTEREST_PER_SECOND,
-        MAXIMUM_INTEREST_PER_SECOND,
-        INTEREST_ELASTICITY,
-        code_offset=3,
-    )
-    log MediumPairCreated(asset, collateral, pair)
-    return pair
+    return self._deploy_tier(asset, collateral, oracle, TIER_MEDIUM)
 
 
 @external
@@ -380,33 +878,7 @@ def deploy_high_risk_pair(
 
     @return pair The address of the deployed pair
     """
-
-    # 30% minimum utilization, 50% maximum utilization
-    MINIMUM_TARGET_UTILIZATION: uint256 = 300000000000000000
-    MAXIMUM_TARGET_UTILIZATION: uint256 = 500000000000000000
-
-    # 5% minimum interest per second, 12% starting interest per second, 1000% maximum interest per second
-    STARTING_INTEREST_PER_SECOND: uint64 = (ONE_PERCENT * 12) 
-    MINIMUM_INTEREST_PER_SECOND: uint64 = (ONE_PERCENT * 5)
-    MAXIMUM_INTEREST_PER_SECOND: uint64 = (ONE_PERCENT * 1000)
-
-    INTEREST_ELASTICITY: uint256 = 20000000000000000000000000000000000000000
-
-    pair: address = create_from_blueprint(
-        blueprint,
-        asset,
-        collateral,
-        oracle,
-        MINIMUM_TARGET_UTILIZATION,
-        MAXIMUM_TARGET_UTILIZATION,
-        STARTING_INTEREST_PER_SECOND,
-        MINIMUM_INTEREST_PER_SECOND,
-        MAXIMUM_INTEREST_PER_SECOND,
-        INTEREST_ELASTICITY,
-        code_offset=3,
-    )
-    log HighPairCreated(asset, collateral, pair)
-    return pair
+    return self._deploy_tier(asset, collateral, oracle, TIER_HIGH)
 
 
 @external
@@ -422,9 +894,12 @@ def deploy_custom_risk_pair(
     minimum_interest_per_second: uint64,
     maximum_interest_per_second: uint64,
     elasticity: uint256,
+    compounding: bool = False,
 ) -> address:
     """
-    @dev Deploy a custom pair with a different set of parameters
+    @dev Deploy a custom pair with a different set of parameters. Only pairs from this factory's
+        blueprint are registered, the batched functions would call into anything else, and
+        those are held to the same rate curve checks as set_tier
 
     @param asset The address of the asset token
     @param collateral The address of the collateral token
@@ -437,6 +912,7 @@ def deploy_custom_risk_pair(
     @param minimum_interest_per_second The minimum interest per second for the pair
     @param maximum_interest_per_second The maximum interest per second for the pair
     @param elasticity The interest rate elasticity factor
+    @param compounding Whether the pair compounds interest and rate changes per second
 
     @return pair The address of the deployed pair
     """
@@ -451,7 +927,17 @@ def deploy_custom_risk_pair(
         minimum_interest_per_second,
         maximum_interest_per_second,
         elasticity,
+        compounding,
         code_offset=code_offset,
     )
+    if _blueprint == blueprint and code_offset == 3:
+        self._check_rate_curve(
+            minimum_target_utilization,
+            maximum_target_utilization,
+            minimum_interest_per_second,
+            maximum_interest_per_second,
+            elasticity,
+        )
+        self._register(pair, asset, collateral, TIER_CUSTOM)
     log CustomPairCreated(_blueprint, pair, asset, collateral)
     return pair
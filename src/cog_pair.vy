@@ -270,15 +270,35 @@ event AddCollateral:
     user_collateral_share: indexed(uint256)
 
 
+# RemoveCollateral and Borrow gained their trailing field for the indexer, which changed their
+# topic0, see the README's event ABI change
 event RemoveCollateral:
     to: indexed(address)
     amount: indexed(uint256)
     user_collateral_share: indexed(uint256)
+    _from: address
+
 
 event Borrow:
     amount: indexed(uint256)
     to: indexed(address)
     _from: indexed(address)
+    user_borrow_part: uint256
+
+
+event Repay:
+    payer: indexed(address)
+    to: indexed(address)
+    amount: uint256
+    part: uint256
+
+
+event Liquidate:
+    liquidator: indexed(address)
+    user: indexed(address)
+    borrow_part: uint256
+    borrow_amount: uint256
+    collateral_share: uint256
 
 
 event Paused:
@@ -331,12 +351,6 @@ collateral: public(immutable(address))  # Address of the collateral
 total_collateral_share: public(
     uint256
 )  # Total collateral share of all borrowers
-total_asset: public(
-    Rebase
-)  # Numerator is amount asset total, denominator keeps track of total shares of the asset
-total_borrow: public(
-    Rebase
-)  # Numerator is the amount owed total, denominator keeps track of initial borrow shares owed
 
 user_collateral_share: public(
     HashMap[address, uint256]
@@ -346,7 +360,8 @@ user_borrow_part: public(
     HashMap[address, uint256]
 )  # Borrow ""share"" of each user
 
-exchange_rate: public(uint256)  # Exchange rate between asset and collateral
+# Exchange rate between asset and collateral [0, 192), block number it was last read in [192, 256)
+packed_exchange_rate: uint256
 
 
 struct AccrueInfo:
@@ -360,12 +375,34 @@ struct SurgeInfo:
         last_elapsed_time: uint64
 
 
-accrue_info: public(AccrueInfo)
-
-surge_info: public(SurgeInfo)
+struct FeeInfo:
+        last_interest_per_second: uint64
+        last_elapsed_time: uint64
+        protocol_fee: uint32
+        default_protocol_fee: uint32
+        borrow_opening_fee: uint32
+        paused: bool
+
+
+# In memory copy of every field touched while accruing, loaded and stored once per call
+struct PairState:
+        total_asset: Rebase
+        total_borrow: Rebase
+        accrue_info: AccrueInfo
+        fee_info: FeeInfo
+
+
+# Hot fields are bit packed into a single slot each, see the pack/unpack helpers below
+# Rebase: elastic [0, 128), base [128, 256)
+packed_total_asset: uint256  # Numerator is amount asset total, denominator keeps track of total shares of the asset
+packed_total_borrow: uint256  # Numerator is the amount owed total, denominator keeps track of initial borrow shares owed
+# AccrueInfo: interest_per_second [0, 64), last_accrued [64, 128), fees_earned_fraction [128, 256)
+packed_accrue_info: uint256
+# FeeInfo: surge info [0, 128), protocol_fee [128, 160), default_protocol_fee [160, 192),
+# borrow_opening_fee [192, 224), paused [224, 232)
+packed_fee_info: uint256
 
 factory: public(immutable(address))  # Address of the factory
-paused: public(bool)  # Status of if the pool is paused
 
 # ///////////////////////////////////////////////////// #
 #                  Configuration Constants              #
@@ -377,13 +414,9 @@ EXCHANGE_RATE_PRECISION: constant(uint256) = 1000000000000000000  # 1e18
 COLLATERIZATION_RATE_PRECISION: constant(uint256) = 100000  # 1e5
 COLLATERIZATION_RATE: constant(uint256) = 75000  # 75%
 
-BORROW_OPENING_FEE: public(uint256)
 BORROW_OPENING_FEE_PRECISION: constant(uint256) = 100000
 
-# Starts at 10%, raised when PoL only mode is activated to PROTOCOL_FEE_PRECISION or 100%
-protocol_fee: public(uint256)
-
-DEFAULT_PROTOCOL_FEE: public(uint256)
+# Protocol fee starts at 10%, raised when PoL only mode is activated to PROTOCOL_FEE_PRECISION or 100%
 PROTOCOL_FEE_PRECISION: constant(uint256) = 1000000
 
 # If IR surges ~10% in 1 day then Protocol begins accruing PoL
@@ -394,16 +427,215 @@ UTILIZATION_PRECISION: constant(uint256) = 1000000000000000000  # 1e18
 MINIMUM_TARGET_UTILIZATION: immutable(uint256)
 MAXIMUM_TARGET_UTILIZATION: immutable(uint256)
 FACTOR_PRECISION: constant(uint256) = 1000000000000000000  # 1e18
+# FACTOR_PRECISION / target utilization, scaled by 2 ** RECIPROCAL_SHIFT and rounded up, so the rate
+# controller's factors are a multiply and a shift. Both the distance to a target and the target are
+# at most UTILIZATION_PRECISION < 2 ** 60, so rounding up never moves the floored factor, and the
+# multiply stays under 2 ** 60 * 2 ** 60 * 2 ** 128
+RECIPROCAL_SHIFT: constant(uint256) = 128
+MINIMUM_TARGET_RECIPROCAL: immutable(uint256)
+MAXIMUM_TARGET_RECIPROCAL: immutable(uint256)
 
 STARTING_INTEREST_PER_SECOND: immutable(uint64)
 MINIMUM_INTEREST_PER_SECOND: immutable(uint64)
 MAXIMUM_INTEREST_PER_SECOND: immutable(uint64)
 INTEREST_ELASTICITY: immutable(uint256)
+# Compounding pairs accrue interest and move the interest rate per second, see _compound_rate
+compounding: public(immutable(bool))
 
 LIQUIDATION_MULTIPLIER: constant(uint256) = 112000  # 12
 LIQUIDATION_MULTIPLIER_PRECISION: constant(uint256) = 100000  # 1e5
 
 INTEREST_PER_SECOND_PRECISION: constant(uint256) = 1000000000000000000 # 1e18
+COMPOUNDING_PRECISION: constant(uint256) = 1000000000000000000000000000  # 1e27
+
+HEALTH_FACTOR_PRECISION: constant(uint256) = 1000000000000000000  # 1e18
+MAX_HEALTH_FACTORS: constant(uint256) = 256
+
+MASK_32: constant(uint256) = 4294967295  # 2**32 - 1
+MASK_64: constant(uint256) = 18446744073709551615  # 2**64 - 1
+MASK_128: constant(uint256) = 340282366920938463463374607431768211455  # 2**128 - 1
+MASK_192: constant(uint256) = 6277101735386680763835789423207666416102355444464034512895  # 2**192 - 1
+
+# ///////////////////////////////////////////////////// #
+#                 Storage Packing Helpers               #
+# ///////////////////////////////////////////////////// #
+
+@pure
+@internal
+def _pack_rebase(total: Rebase) -> uint256:
+    return convert(total.elastic, uint256) | (convert(total.base, uint256) << 128)
+
+
+@pure
+@internal
+def _unpack_rebase(packed: uint256) -> Rebase:
+    return Rebase(
+        {
+            elastic: convert(packed & MASK_128, uint128),
+            base: convert(packed >> 128, uint128),
+        }
+    )
+
+
+@pure
+@internal
+def _pack_accrue_info(info: AccrueInfo) -> uint256:
+    return (
+        convert(info.interest_per_second, uint256)
+        | (convert(info.last_accrued, uint256) << 64)
+        | (convert(info.fees_earned_fraction, uint256) << 128)
+    )
+
+
+@pure
+@internal
+def _unpack_accrue_info(packed: uint256) -> AccrueInfo:
+    return AccrueInfo(
+        {
+            interest_per_second: convert(packed & MASK_64, uint64),
+            last_accrued: convert((packed >> 64) & MASK_64, uint64),
+            fees_earned_fraction: convert(packed >> 128, uint128),
+        }
+    )
+
+
+@pure
+@internal
+def _pack_fee_info(info: FeeInfo) -> uint256:
+    return (
+        convert(info.last_interest_per_second, uint256)
+        | (convert(info.last_elapsed_time, uint256) << 64)
+        | (convert(info.protocol_fee, uint256) << 128)
+        | (convert(info.default_protocol_fee, uint256) << 160)
+        | (convert(info.borrow_opening_fee, uint256) << 192)
+        | (convert(info.paused, uint256) << 224)
+    )
+
+
+@pure
+@internal
+def _unpack_fee_info(packed: uint256) -> FeeInfo:
+    return FeeInfo(
+        {
+            last_interest_per_second: convert(packed & MASK_64, uint64),
+            last_elapsed_time: convert((packed >> 64) & MASK_64, uint64),
+            protocol_fee: convert((packed >> 128) & MASK_32, uint32),
+            default_protocol_fee: convert((packed >> 160) & MASK_32, uint32),
+            borrow_opening_fee: convert((packed >> 192) & MASK_32, uint32),
+            paused: convert(packed >> 224, bool),
+        }
+    )
+
+
+@view
+@internal
+def _load_state() -> PairState:
+    return PairState(
+        {
+            total_asset: self._unpack_rebase(self.packed_total_asset),
+            total_borrow: self._unpack_rebase(self.packed_total_borrow),
+            accrue_info: self._unpack_accrue_info(self.packed_accrue_info),
+            fee_info: self._unpack_fee_info(self.packed_fee_info),
+        }
+    )
+
+
+@internal
+def _store_state(state: PairState):
+    self.packed_total_asset = self._pack_rebase(state.total_asset)
+    self.packed_total_borrow = self._pack_rebase(state.total_borrow)
+    self.packed_accrue_info = self._pack_accrue_info(state.accrue_info)
+    self.packed_fee_info = self._pack_fee_info(state.fee_info)
+
+
+# ///////////////////////////////////////////////////// #
+#                   Packed State Getters                #
+# ///////////////////////////////////////////////////// #
+
+@view
+@external
+def total_asset() -> Rebase:
+    """
+    @return - Numerator is amount asset total, denominator keeps track of total shares of the asset
+    """
+    return self._unpack_rebase(self.packed_total_asset)
+
+
+@view
+@external
+def total_borrow() -> Rebase:
+    """
+    @return - Numerator is the amount owed total, denominator keeps track of initial borrow shares owed
+    """
+    return self._unpack_rebase(self.packed_total_borrow)
+
+
+@view
+@external
+def accrue_info() -> AccrueInfo:
+    return self._unpack_accrue_info(self.packed_accrue_info)
+
+
+@view
+@external
+def surge_info() -> SurgeInfo:
+    fee_info: FeeInfo = self._unpack_fee_info(self.packed_fee_info)
+    return SurgeInfo(
+        {
+            last_interest_per_second: fee_info.last_interest_per_second,
+            last_elapsed_time: fee_info.last_elapsed_time,
+        }
+    )
+
+
+@view
+@external
+def protocol_fee() -> uint256:
+    """
+    @return - Starts at 10%, raised when PoL only mode is activated to PROTOCOL_FEE_PRECISION or 100%
+    """
+    return convert(self._unpack_fee_info(self.packed_fee_info).protocol_fee, uint256)
+
+
+@view
+@external
+def DEFAULT_PROTOCOL_FEE() -> uint256:
+    return convert(
+        self._unpack_fee_info(self.packed_fee_info).default_protocol_fee, uint256
+    )
+
+
+@view
+@external
+def BORROW_OPENING_FEE() -> uint256:
+    return convert(
+        self._unpack_fee_info(self.packed_fee_info).borrow_opening_fee, uint256
+    )
+
+
+@view
+@external
+def paused() -> bool:
+    """
+    @return - Status of if the pool is paused
+    """
+    return self._unpack_fee_info(self.packed_fee_info).paused
+
+
+@view
+@external
+def exchange_rate() -> uint256:
+    """
+    @return - Exchange rate between asset and collateral
+    """
+    return self._stored_exchange_rate()
+
+
+@view
+@internal
+def _stored_exchange_rate() -> uint256:
+    return self.packed_exchange_rate & MASK_192
+
 
 # //////////////////////////////////////////////////////////////// #
 #                              ERC20                               #
@@ -417,7 +649,7 @@ def totalSupply() -> uint256:
     """
     @return - Returns the total supply of the Asset Token, which is also the total number of shares
     """
-    return convert(self.total_asset.base, uint256)
+    return convert(self._unpack_rebase(self.packed_total_asset).base, uint256)
 
 
 allowance: public(HashMap[address, HashMap[address, uint256]])
@@ -489,18 +721,22 @@ def transferFrom(sender: address, receiver: address, amount: uint256) -> bool:
 #		            ERC4626 Compatibility	        	#
 # ///////////////////////////////////////////////////// #
 
+
 @view
 @external
 def totalAssets() -> uint256:
     """
-    @return - Returns the total amount of assets owned by the vault
+    @return - Returns the total amount of assets owned by the vault, including interest pending since the last accrual
     """
-    total_assets_elastic: uint256 = convert(self.total_asset.elastic, uint256)
+    _total_asset: Rebase = empty(Rebase)
+    _total_borrow: Rebase = empty(Rebase)
+    _total_asset, _total_borrow = self._accrued_totals()
     # Borrowed assets are subtracted from the above total, so combined elastic values of both
     # total borrow and total assets should be the same
-    total_borrow_elastic: uint256 = convert(self.total_borrow.elastic, uint256)
     # Interest is the difference between elastic and base, since they start at 1:1
-    return total_borrow_elastic + total_assets_elastic
+    return convert(_total_borrow.elastic, uint256) + convert(
+        _total_asset.elastic, uint256
+    )
 
 
 @view
@@ -508,20 +744,35 @@ def totalAssets() -> uint256:
 def convertToAssets(shareAmount: uint256) -> uint256:
     """
     @param shareAmount - The amount of shares to convert to assets
-    @return - Returns the amount of assets returned given the amount of shares
+    @return - Returns the amount of assets returned given the amount of shares, at the share price accrued up to this block
     """
-    return self._convertToAssets(shareAmount)
+    _total_asset: Rebase = empty(Rebase)
+    _total_borrow: Rebase = empty(Rebase)
+    _total_asset, _total_borrow = self._accrued_totals()
+    return self._to_assets(shareAmount, _total_asset, _total_borrow)
 
 
 @view
 @internal
 def _convertToAssets(shareAmount: uint256) -> uint256:
-    _total_asset: Rebase = self.total_asset
+    # Stored share price, which is what deposit and mint use since they don't accrue
+    return self._to_assets(
+        shareAmount,
+        self._unpack_rebase(self.packed_total_asset),
+        self._unpack_rebase(self.packed_total_borrow),
+    )
+
+
+@pure
+@internal
+def _to_assets(
+    shareAmount: uint256, _total_asset: Rebase, _total_borrow: Rebase
+) -> uint256:
     if _total_asset.base == 0:
         # Shares mint 1:1 at the start until interest accrues
         return shareAmount
     all_share: uint256 = convert(
-        _total_asset.elastic + self.total_borrow.elastic, uint256
+        _total_asset.elastic + _total_borrow.elastic, uint256
     )
     return shareAmount * all_share / convert(_total_asset.base, uint256)
 
@@ -531,17 +782,33 @@ def _convertToAssets(shareAmount: uint256) -> uint256:
 def convertToShares(assetAmount: uint256) -> uint256:
     """
     @param assetAmount - The amount of assets to convert to shares
-    @return - Returns the amount of shares returned given the amount of assets
+    @return - Returns the amount of shares returned given the amount of assets, at the share price accrued up to this block
     """
-    return self._convertToShares(assetAmount)
+    _total_asset: Rebase = empty(Rebase)
+    _total_borrow: Rebase = empty(Rebase)
+    _total_asset, _total_borrow = self._accrued_totals()
+    return self._to_shares(assetAmount, _total_asset, _total_borrow)
 
 
 @view
 @internal
 def _convertToShares(assetAmount: uint256) -> uint256:
-    total_asset_base: uint256 = convert(self.total_asset.base, uint256)
+    # Stored share price, which is what deposit and mint use since they don't accrue
+    return self._to_shares(
+        assetAmount,
+        self._unpack_rebase(self.packed_total_asset),
+        self._unpack_rebase(self.packed_total_borrow),
+    )
+
+
+@pure
+@internal
+def _to_shares(
+    assetAmount: uint256, _total_asset: Rebase, _total_borrow: Rebase
+) -> uint256:
+    total_asset_base: uint256 = convert(_total_asset.base, uint256)
     all_share: uint256 = convert(
-        self.total_asset.elastic + self.total_borrow.elastic, uint256
+        _total_asset.elastic + _total_borrow.elastic, uint256
     )
     if all_share == 0:
         # Shares mint 1:1 at the start until interest accrues
@@ -628,9 +895,13 @@ def maxWithdraw(owner: address) -> uint256:
     @param owner - The address of the owner
     @return - Returns the maximum amount of assets that can be withdrawn from the vault
     """
+    _total_asset: Rebase = empty(Rebase)
+    _total_borrow: Rebase = empty(Rebase)
+    _total_asset, _total_borrow = self._accrued_totals()
+    # Idle assets are tracked by total_asset.elastic, so there's no need to query the asset
     return min(
-        self._convertToAssets(self.balanceOf[owner]),
-        ERC20(asset).balanceOf(self),
+        self._to_assets(self.balanceOf[owner], _total_asset, _total_borrow),
+        convert(_total_asset.elastic, uint256),
     )
 
 
@@ -639,10 +910,16 @@ def maxWithdraw(owner: address) -> uint256:
 def previewWithdraw(assets: uint256) -> uint256:
     """
     @param assets - The amount of assets to withdraw
-    @return - The amount of shares worth withdrawn
-    @notice - Will revert if you try to preview withdrawing more assets than available currently in the vault's balance
-    """
-    return min(self._convertToShares(assets), self._convertToShares(ERC20(asset).balanceOf(self)))
+    @return - The amount of shares burned to withdraw the assets, capped at the vault's idle assets
+    """
+    _total_asset: Rebase = empty(Rebase)
+    _total_borrow: Rebase = empty(Rebase)
+    _total_asset, _total_borrow = self._accrued_totals()
+    return self._to_shares(
+        min(assets, convert(_total_asset.elastic, uint256)),
+        _total_asset,
+        _total_borrow,
+    )
 
 
 @external
@@ -656,9 +933,16 @@ def withdraw(
 
     @return - The amount of shares burned
     """
-    self.efficient_accrue()
-    shares: uint256 = self._convertToShares(assets)
-    assets_withdraw: uint256 = self._remove_asset(receiver, owner, shares)
+    state: PairState = self._accrued_state()
+    shares: uint256 = self._to_shares(
+        assets, state.total_asset, state.total_borrow
+    )
+    assets_withdraw: uint256 = 0
+    state, assets_withdraw = self._remove_asset(state, owner, shares)
+    self._store_state(state)
+    assert ERC20(asset).transfer(
+        receiver, assets_withdraw, default_return_value=True
+    )  # dev: Transfer Failed
     log Withdraw(msg.sender, receiver, owner, assets, shares)
 
     return shares
@@ -671,9 +955,16 @@ def maxRedeem(owner: address) -> uint256:
     @param owner - The address of the owner
     @return - Returns the maximum amount of shares that can be redeemed from the vault by the owner
     """
+    _total_asset: Rebase = empty(Rebase)
+    _total_borrow: Rebase = empty(Rebase)
+    _total_asset, _total_borrow = self._accrued_totals()
     return min(
         self.balanceOf[owner],
-        self._convertToShares(ERC20(asset).balanceOf(self)),
+        self._to_shares(
+            convert(_total_asset.elastic, uint256),
+            _total_asset,
+            _total_borrow,
+        ),
     )
 
 
@@ -684,9 +975,12 @@ def previewRedeem(shares: uint256) -> uint256:
     @param shares - The amount of shares to redeem
     @return - Returns the amount of assets that would be returned if the shares were redeemed
     """
+    _total_asset: Rebase = empty(Rebase)
+    _total_borrow: Rebase = empty(Rebase)
+    _total_asset, _total_borrow = self._accrued_totals()
     return min(
-        self._convertToAssets(shares),
-        self._convertToShares(ERC20(asset).balanceOf(self)),
+        self._to_assets(shares, _total_asset, _total_borrow),
+        convert(_total_asset.elastic, uint256),
     )
 
 
@@ -701,9 +995,14 @@ def redeem(
 
     @return - The amount of assets returned
     """
-    self.efficient_accrue()
-    assets_out: uint256 = self._remove_asset(receiver, owner, shares)
-    
+    state: PairState = self._accrued_state()
+    assets_out: uint256 = 0
+    state, assets_out = self._remove_asset(state, owner, shares)
+    self._store_state(state)
+    assert ERC20(asset).transfer(
+        receiver, assets_out, default_return_value=True
+    )  # dev: Transfer Failed
+
     log Withdraw(msg.sender, receiver, owner, assets_out, shares)
 
     return assets_out
@@ -714,151 +1013,446 @@ def redeem(
 # ///////////////////////////////////////////////////// #
 @internal
 def _is_not_paused():
-    assert (not self.paused), "Pair Paused"
+    assert (not self._unpack_fee_info(self.packed_fee_info).paused), "Pair Paused"
 
 
 @internal
 def efficient_accrue():
-    _accrue_info: AccrueInfo = self.accrue_info
+    # Only the accrue slot is needed to find out there is nothing to do
     elapsed_time: uint256 = block.timestamp - convert(
-        _accrue_info.last_accrued, uint256
+        self._unpack_accrue_info(self.packed_accrue_info).last_accrued, uint256
     )
     if elapsed_time == 0:
         # Prevents re-executing this logic if multiple actions are taken in the same block
         return
 
-    self._accrue(_accrue_info, elapsed_time)
+    self._store_state(self._accrue(self._load_state(), elapsed_time))
+
+
+@view
+@internal
+def _accrued_state() -> PairState:
+    """
+    @return The pair state with interest accrued up to the current block, not yet written to storage
+    """
+    state: PairState = self._load_state()
+    elapsed_time: uint256 = block.timestamp - convert(
+        state.accrue_info.last_accrued, uint256
+    )
+    if elapsed_time == 0:
+        # Prevents re-executing this logic if multiple actions are taken in the same block
+        return state
+
+    return self._accrue(state, elapsed_time)
+
+
+@view
+@internal
+def _accrued_totals() -> (Rebase, Rebase):
+    """
+    @return Total asset and total borrow with interest accrued up to the current block
+    @dev Only reads the rest of the state when there is interest to accrue
+    """
+    last_accrued: uint256 = convert(
+        self._unpack_accrue_info(self.packed_accrue_info).last_accrued, uint256
+    )
+    if block.timestamp == last_accrued:
+        return (
+            self._unpack_rebase(self.packed_total_asset),
+            self._unpack_rebase(self.packed_total_borrow),
+        )
+
+    state: PairState = self._accrued_state()
+    return (state.total_asset, state.total_borrow)
 
 
+@pure
 @internal
-def _accrue(accrue_info: AccrueInfo, elapsed_time: uint256):
-    _accrue_info: AccrueInfo = accrue_info
-    _accrue_info.last_accrued = convert(block.timestamp, uint64)
+def _rpow(x: uint256, n: uint256) -> uint256:
+    """
+    @dev x ** n in COMPOUNDING_PRECISION fixed point, by repeated squaring. Since
+        x ** a * x ** b == x ** (a + b), the result does not depend on how the exponent is
+        split between calls, up to rounding
+    @param x Base, scaled by COMPOUNDING_PRECISION
+    @param n Exponent, seconds elapsed
+    @return x ** n scaled by COMPOUNDING_PRECISION, saturating at MASK_128 for growth
+    """
+    result: uint256 = COMPOUNDING_PRECISION
+    base: uint256 = x
+    exponent: uint256 = n
+    for i in range(64):
+        if (exponent & 1) == 1:
+            result = result * base / COMPOUNDING_PRECISION
+            if result > MASK_128:
+                return MASK_128
+        exponent = exponent >> 1
+        if exponent == 0:
+            break
+        base = base * base / COMPOUNDING_PRECISION
+        if base > MASK_128:
+            # A remaining bit of the exponent is still set, so the result can only overflow
+            return MASK_128
+    return result
+
 
-    _total_borrow: Rebase = self.total_borrow
-    if _total_borrow.base == 0:
+@view
+@internal
+def _compound_rate(
+    borrow_elastic: uint256,
+    asset_elastic: uint256,
+    interest_per_second: uint256,
+    elapsed_time: uint256,
+) -> (uint256, uint256):
+    """
+    @dev Off target the rate moves by the same factor every second, so over elapsed_time it
+        follows rate * multiplier ** s until it reaches its bound and stays there. The sum of the
+        rate over the period is the path's geometric series, so for a given utilization it is the
+        same however the period is split
+    @param borrow_elastic Total borrowed at the start of the period
+    @param asset_elastic Total idle assets at the start of the period
+    @param interest_per_second The rate at the start of the period, scaled by COMPOUNDING_PRECISION
+    @param elapsed_time Seconds elapsed, at most a uint64
+    @return The rate at the end of the period, and the sum of the rate over every second of it,
+        both scaled by COMPOUNDING_PRECISION
+    """
+    utilization: uint256 = (
+        borrow_elastic * UTILIZATION_PRECISION / (asset_elastic + borrow_elastic)
+    )
+
+    # The rate moves by COMPOUNDING_PRECISION +- step every second, towards bound
+    step: uint256 = 0
+    bound: uint256 = 0
+    growing: bool = False
+    if utilization < MINIMUM_TARGET_UTILIZATION:
+        under_factor: uint256 = unsafe_mul(
+            MINIMUM_TARGET_UTILIZATION - utilization, MINIMUM_TARGET_RECIPROCAL
+        ) >> RECIPROCAL_SHIFT
+        # Decays by elasticity / (elasticity + under_factor ** 2) every second
+        step = COMPOUNDING_PRECISION - INTEREST_ELASTICITY * COMPOUNDING_PRECISION / (
+            INTEREST_ELASTICITY + unsafe_mul(under_factor, under_factor)
+        )
+        bound = convert(MINIMUM_INTEREST_PER_SECOND, uint256) * (
+            COMPOUNDING_PRECISION / INTEREST_PER_SECOND_PRECISION
+        )
+    elif utilization > MAXIMUM_TARGET_UTILIZATION:
+        over_factor: uint256 = unsafe_mul(
+            utilization - MAXIMUM_TARGET_UTILIZATION, MAXIMUM_TARGET_RECIPROCAL
+        ) >> RECIPROCAL_SHIFT
+        # Grows by (elasticity + over_factor ** 2) / elasticity every second
+        step = over_factor * over_factor * COMPOUNDING_PRECISION / INTEREST_ELASTICITY
+        bound = convert(MAXIMUM_INTEREST_PER_SECOND, uint256) * (
+            COMPOUNDING_PRECISION / INTEREST_PER_SECOND_PRECISION
+        )
+        growing = True
+
+    if step == 0:
+        # Within the target band, or too close to it for the rate to move
+        return (interest_per_second, interest_per_second * elapsed_time)
+
+    # Walk the period in power of two steps of seconds, one per set bit of elapsed_time. distance
+    # is how far multiplier ** (2 ** i) is from COMPOUNDING_PRECISION, squaring the distance
+    # rather than the multiplier keeps its precision however small it is
+    rate: uint256 = interest_per_second
+    total: uint256 = 0
+    distance: uint256 = step
+    bits: uint256 = 0
+    overshoot: bool = False
+    for i in range(64):
+        if elapsed_time >> i == 0:
+            break
+        bits = i + 1
+        if (elapsed_time >> i) & 1 == 1:
+            # rate * (1 + multiplier + ... + multiplier ** (2 ** i - 1)), the series being
+            # (multiplier ** (2 ** i) - 1) / (multiplier - 1)
+            total += rate * (distance * COMPOUNDING_PRECISION / step) / COMPOUNDING_PRECISION
+            if growing:
+                rate = rate * (COMPOUNDING_PRECISION + distance) / COMPOUNDING_PRECISION
+                overshoot = rate > bound
+            else:
+                rate = rate * (COMPOUNDING_PRECISION - distance) / COMPOUNDING_PRECISION
+                overshoot = rate < bound
+            if overshoot:
+                break
+        if elapsed_time >> (i + 1) == 0:
+            break
+        if growing:
+            if distance > MASK_128:
+                # Growing over 1e11 times in one step is treated as overshooting the bound
+                overshoot = True
+                break
+            distance = 2 * distance + distance * distance / COMPOUNDING_PRECISION
+        else:
+            distance = 2 * distance - distance * distance / COMPOUNDING_PRECISION
+
+    if not overshoot:
+        return (rate, total)
+
+    # The rate reaches its bound part way through. Find the longest stretch of seconds it stays
+    # within it one bit at a time, from the last step walked down, taking the square root of the
+    # distance on the way down
+    rate = interest_per_second
+    total = 0
+    seconds: uint256 = 0
+    for j in range(64):
+        if j == bits:
+            break
+        i: uint256 = bits - 1 - j
+        if i == 0:
+            distance = step
+        elif j != 0:
+            if growing:
+                distance = (
+                    isqrt((COMPOUNDING_PRECISION + distance) * COMPOUNDING_PRECISION)
+                    - COMPOUNDING_PRECISION
+                )
+            else:
+                distance = COMPOUNDING_PRECISION - isqrt(
+                    (COMPOUNDING_PRECISION - distance) * COMPOUNDING_PRECISION
+                )
+        if seconds + (1 << i) > elapsed_time:
+            continue
+        next_rate: uint256 = 0
+        if growing:
+            next_rate = rate * (COMPOUNDING_PRECISION + distance) / COMPOUNDING_PRECISION
+            if next_rate > bound:
+                continue
+        else:
+            next_rate = rate * (COMPOUNDING_PRECISION - distance) / COMPOUNDING_PRECISION
+            if next_rate < bound:
+                continue
+        total += rate * (distance * COMPOUNDING_PRECISION / step) / COMPOUNDING_PRECISION
+        rate = next_rate
+        seconds += 1 << i
+
+    # Clamped for the rest of the period
+    total += bound * (elapsed_time - seconds)
+    return (bound, total)
+
+
+@view
+@internal
+def _surge_breaker(state: PairState) -> PairState:
+    """
+    @dev Raises the protocol fee to 100% when the rate jumps, and resets it once the surge is over
+    @param state The pair state, with the rate just updated
+    @return The updated pair state, which the caller is responsible for storing
+    """
+    _state: PairState = state
+    dt: uint64 = (
+        convert(block.timestamp, uint64) - _state.fee_info.last_elapsed_time
+    )
+    if dt > SURGE_DURATION:
+        # if interest rate is increasing
+        if (
+            _state.accrue_info.interest_per_second
+            > _state.fee_info.last_interest_per_second
+        ):
+            # If daily change in interest rate is greater than Surge threshold, trigger surge breaker
+            dr: uint64 = (
+                _state.accrue_info.interest_per_second
+                - _state.fee_info.last_interest_per_second
+            )
+            if dr > PROTOCOL_SURGE_THRESHOLD:
+                _state.fee_info.last_elapsed_time = convert(
+                    block.timestamp, uint64
+                )
+                _state.fee_info.last_interest_per_second = (
+                    _state.accrue_info.interest_per_second
+                )
+                # PoL Should accrue here, instead of to lenders, to discourage pid attacks as described in https://gauntlet.network/reports/pid
+                _state.fee_info.protocol_fee = convert(PROTOCOL_FEE_PRECISION, uint32)  # 100% Protocol Fee
+        else:
+            # Reset protocol fee elsewise
+            _state.fee_info.protocol_fee = _state.fee_info.default_protocol_fee  # 10% Protocol Fee
+    return _state
+
+
+@view
+@internal
+def _accrue(state: PairState, elapsed_time: uint256) -> PairState:
+    """
+    @param state The pair state to accrue interest on
+    @param elapsed_time Seconds since the last accrual
+    @return The updated pair state, which the caller is responsible for storing
+    """
+    _state: PairState = state
+    _state.accrue_info.last_accrued = convert(block.timestamp, uint64)
+
+    if _state.total_borrow.base == 0:
         # If there are no outstanding borrows, there is no need to accrue interest, and interest
         # rate should be moved to minimum to encourage borrowing
-        if _accrue_info.interest_per_second != STARTING_INTEREST_PER_SECOND:
-            _accrue_info.interest_per_second = STARTING_INTEREST_PER_SECOND
-        self.accrue_info = _accrue_info
-        return
+        if _state.accrue_info.interest_per_second != STARTING_INTEREST_PER_SECOND:
+            _state.accrue_info.interest_per_second = STARTING_INTEREST_PER_SECOND
+        return _state
 
     interest_accrued: uint256 = 0
     fee_fraction: uint256 = 0
-    _total_asset: Rebase = self.total_asset
 
     # Accrue interest
-    interest_accrued = (
-        convert(_total_borrow.elastic, uint256)
-        * convert(_accrue_info.interest_per_second, uint256)
-        * elapsed_time
-        / INTEREST_PER_SECOND_PRECISION
-    )  
-
-    _total_borrow.elastic = _total_borrow.elastic + convert(
+    compounded_interest_per_second: uint256 = 0
+    if compounding:
+        # The rate's whole path over the period follows from the utilization it starts at, and
+        # debt compounds at the path's average rate, elastic * (1 + average) ** t. Splitting the
+        # period between accruals only changes the result through the interest's own push on
+        # utilization, which each accrual picks up from where the last one left it
+        borrow_elastic: uint256 = convert(_state.total_borrow.elastic, uint256)
+        rate_seconds: uint256 = 0
+        compounded_interest_per_second, rate_seconds = self._compound_rate(
+            borrow_elastic,
+            convert(_state.total_asset.elastic, uint256),
+            convert(_state.accrue_info.interest_per_second, uint256)
+            * (COMPOUNDING_PRECISION / INTEREST_PER_SECOND_PRECISION),
+            elapsed_time,
+        )
+        # Saturated growth on a debt that has already grown can overflow the uint128 total, so
+        # the debt stops at the most it can hold, as the rate stops at its maximum, and the
+        # pair can still accrue
+        interest_accrued = min(
+            borrow_elastic
+            * self._rpow(
+                COMPOUNDING_PRECISION + rate_seconds / elapsed_time, elapsed_time
+            )
+            / COMPOUNDING_PRECISION
+            - borrow_elastic,
+            MASK_128 - borrow_elastic,
+        )
+    else:
+        interest_accrued = (
+            convert(_state.total_borrow.elastic, uint256)
+            * convert(_state.accrue_info.interest_per_second, uint256)
+            * elapsed_time
+            / INTEREST_PER_SECOND_PRECISION
+        )
+
+    _state.total_borrow.elastic = _state.total_borrow.elastic + convert(
         interest_accrued, uint128
     )
 
     full_asset_amount: uint256 = convert(
-        _total_asset.elastic, uint256
-    ) + convert(_total_borrow.elastic, uint256)
+        _state.total_asset.elastic, uint256
+    ) + convert(_state.total_borrow.elastic, uint256)
 
     # Calculate fees
     fee_amount: uint256 = (
-        interest_accrued * self.protocol_fee / PROTOCOL_FEE_PRECISION
+        interest_accrued
+        * convert(_state.fee_info.protocol_fee, uint256)
+        / PROTOCOL_FEE_PRECISION
     )  # % of interest paid goes to fee
 
     fee_fraction = (
-        fee_amount * convert(_total_asset.base, uint256) / full_asset_amount
+        fee_amount * convert(_state.total_asset.base, uint256) / full_asset_amount
     )  # Update total fees earned
-    _accrue_info.fees_earned_fraction = (
-        _accrue_info.fees_earned_fraction + convert(fee_fraction, uint128)
+    _state.accrue_info.fees_earned_fraction = (
+        _state.accrue_info.fees_earned_fraction + convert(fee_fraction, uint128)
     )
 
     # Fees should be considered in total assets
-    self.total_asset.base = _total_asset.base + convert(fee_fraction, uint128)
-
-    # Write new total borrow state to storage
-    self.total_borrow = _total_borrow
+    _state.total_asset.base = _state.total_asset.base + convert(
+        fee_fraction, uint128
+    )
 
     # Update interest rate
     utilization: uint256 = (
-        convert(_total_borrow.elastic, uint256)
+        convert(_state.total_borrow.elastic, uint256)
         * UTILIZATION_PRECISION
         / full_asset_amount
     )
 
-    if utilization < MINIMUM_TARGET_UTILIZATION:
-        under_factor: uint256 = (
-            (MINIMUM_TARGET_UTILIZATION - utilization)
-            * FACTOR_PRECISION
-            / MINIMUM_TARGET_UTILIZATION
+    if compounding:
+        # Already moved along its path and clamped by _compound_rate
+        _state.accrue_info.interest_per_second = convert(
+            compounded_interest_per_second
+            / (COMPOUNDING_PRECISION / INTEREST_PER_SECOND_PRECISION),
+            uint64,
         )
-        scale: uint256 = INTEREST_ELASTICITY + (
-            under_factor * under_factor * elapsed_time
+    elif utilization < MINIMUM_TARGET_UTILIZATION:
+        # (MINIMUM_TARGET_UTILIZATION - utilization) * FACTOR_PRECISION / MINIMUM_TARGET_UTILIZATION
+        under_factor: uint256 = unsafe_mul(
+            MINIMUM_TARGET_UTILIZATION - utilization, MINIMUM_TARGET_RECIPROCAL
+        ) >> RECIPROCAL_SHIFT
+        # under_factor is at most FACTOR_PRECISION, and elapsed_time fits in a uint64
+        scale: uint256 = INTEREST_ELASTICITY + unsafe_mul(
+            unsafe_mul(under_factor, under_factor), elapsed_time
         )
         new_interest_per_second: uint64 = convert(
-            convert(_accrue_info.interest_per_second, uint256)
+            convert(_state.accrue_info.interest_per_second, uint256)
             * INTEREST_ELASTICITY
             / scale,
             uint64,
         )
-        _accrue_info.interest_per_second = new_interest_per_second
+        _state.accrue_info.interest_per_second = new_interest_per_second
 
-        if _accrue_info.interest_per_second < MINIMUM_INTEREST_PER_SECOND:
-            _accrue_info.interest_per_second = (MINIMUM_INTEREST_PER_SECOND)
+        if _state.accrue_info.interest_per_second < MINIMUM_INTEREST_PER_SECOND:
+            _state.accrue_info.interest_per_second = (MINIMUM_INTEREST_PER_SECOND)
     elif utilization > MAXIMUM_TARGET_UTILIZATION:
-        over_factor: uint256 = (
-            (utilization - MAXIMUM_TARGET_UTILIZATION)
-            * FACTOR_PRECISION
-            / MAXIMUM_TARGET_UTILIZATION
-        )
-        scale: uint256 = INTEREST_ELASTICITY + (
-            over_factor * over_factor * elapsed_time
-        )
+        # (utilization - MAXIMUM_TARGET_UTILIZATION) * FACTOR_PRECISION / MAXIMUM_TARGET_UTILIZATION
+        over_factor: uint256 = unsafe_mul(
+            utilization - MAXIMUM_TARGET_UTILIZATION, MAXIMUM_TARGET_RECIPROCAL
+        ) >> RECIPROCAL_SHIFT
+        # Unlike under_factor, over_factor grows without bound as MAXIMUM_TARGET_UTILIZATION
+        # shrinks, about 1e36 for a target of 1, so its square stays on checked math
+        scale: uint256 = INTEREST_ELASTICITY + over_factor * over_factor * elapsed_time
         new_interest_per_second: uint64 = convert(
-            convert(_accrue_info.interest_per_second, uint256)
+            convert(_state.accrue_info.interest_per_second, uint256)
             * scale
             / INTEREST_ELASTICITY,
             uint64,
         )
-        _accrue_info.interest_per_second = new_interest_per_second
+        _state.accrue_info.interest_per_second = new_interest_per_second
 
         if new_interest_per_second > MAXIMUM_INTEREST_PER_SECOND:
-            _accrue_info.interest_per_second = (MAXIMUM_INTEREST_PER_SECOND)
-    dt: uint64 = (
-        convert(block.timestamp, uint64) - self.surge_info.last_elapsed_time
-    )
-    if dt > SURGE_DURATION:
-        # if interest rate is increasing
+            _state.accrue_info.interest_per_second = (MAXIMUM_INTEREST_PER_SECOND)
+    return self._surge_breaker(_state)
+
+
+@view
+@internal
+def _update_rate(state: PairState) -> PairState:
+    """
+    @dev _accrue with no elapsed time, for when utilization moved after this block's accrual. No
+        interest accrues and the rate curve doesn't move in zero time, so all that is left is to
+        clamp a rate outside its bounds and to check the surge breaker
+    @param state The pair state, already accrued up to the current block
+    @return The updated pair state, which the caller is responsible for storing
+    """
+    _state: PairState = state
+    if _state.total_borrow.base == 0:
+        _state.accrue_info.interest_per_second = STARTING_INTEREST_PER_SECOND
+        return _state
+
+    interest_per_second: uint64 = _state.accrue_info.interest_per_second
+    if (
+        interest_per_second < MINIMUM_INTEREST_PER_SECOND
+        or interest_per_second > MAXIMUM_INTEREST_PER_SECOND
+    ):
+        # Only a starting rate outside the bounds gets here, utilization decides which clamp applies
+        utilization: uint256 = (
+            convert(_state.total_borrow.elastic, uint256)
+            * UTILIZATION_PRECISION
+            / (
+                convert(_state.total_asset.elastic, uint256)
+                + convert(_state.total_borrow.elastic, uint256)
+            )
+        )
         if (
-            _accrue_info.interest_per_second
-            > self.surge_info.last_interest_per_second
+            utilization < MINIMUM_TARGET_UTILIZATION
+            and interest_per_second < MINIMUM_INTEREST_PER_SECOND
         ):
-            # If daily change in interest rate is greater than Surge threshold, trigger surge breaker
-            dr: uint64 = (
-                _accrue_info.interest_per_second
-                - self.surge_info.last_interest_per_second
-            )
-            if dr > PROTOCOL_SURGE_THRESHOLD:
-                self.surge_info.last_elapsed_time = convert(
-                    block.timestamp, uint64
-                )
-                self.surge_info.last_interest_per_second = (
-                    _accrue_info.interest_per_second
-                )
-                # PoL Should accrue here, instead of to lenders, to discourage pid attacks as described in https://gauntlet.network/reports/pid
-                self.protocol_fee = PROTOCOL_FEE_PRECISION  # 100% Protocol Fee
-        else:
-            # Reset protocol fee elsewise
-            self.protocol_fee = self.DEFAULT_PROTOCOL_FEE  # 10% Protocol Fee
-    self.accrue_info = _accrue_info
+            interest_per_second = MINIMUM_INTEREST_PER_SECOND
+        elif (
+            utilization > MAXIMUM_TARGET_UTILIZATION
+            and interest_per_second > MAXIMUM_INTEREST_PER_SECOND
+        ):
+            interest_per_second = MAXIMUM_INTEREST_PER_SECOND
+        _state.accrue_info.interest_per_second = interest_per_second
+
+    return self._surge_breaker(_state)
 
 
 @internal
-def _add_collateral(to: address, amount: uint256):
+def _credit_collateral(to: address, amount: uint256):
     """
+    @dev Books the collateral without pulling it, the caller settles the transfer
     @param to The address to add collateral for
     @param amount The amount of collateral to add, in tokens
     """
@@ -866,28 +1460,47 @@ def _add_collateral(to: address, amount: uint256):
     self.user_collateral_share[to] = new_collateral_share
     old_total_collateral_share: uint256 = self.total_collateral_share
     self.total_collateral_share = old_total_collateral_share + amount
-    assert ERC20(collateral).transferFrom(
-        msg.sender, self, amount, default_return_value=True
-    )  # dev: Transfer Failed
 
     log AddCollateral(to, amount, new_collateral_share)
 
 
 @internal
-def _remove_collateral(to: address, amount: uint256):
+def _debit_collateral(to: address, amount: uint256):
     """
-    @param to The address to remove collateral for
+    @dev Takes the collateral off msg.sender's share without sending it, the caller settles the transfer
+    @param to The address the collateral is for
     @param amount The amount of collateral to remove, in tokens
     """
     new_collateral_share: uint256 = self.user_collateral_share[msg.sender] - amount
     self.user_collateral_share[msg.sender] = new_collateral_share
     self.total_collateral_share = self.total_collateral_share - amount
+
+    log RemoveCollateral(to, amount, new_collateral_share, msg.sender)
+
+
+@internal
+def _add_collateral(to: address, amount: uint256):
+    """
+    @param to The address to add collateral for
+    @param amount The amount of collateral to add, in tokens
+    """
+    self._credit_collateral(to, amount)
+    assert ERC20(collateral).transferFrom(
+        msg.sender, self, amount, default_return_value=True
+    )  # dev: Transfer Failed
+
+
+@internal
+def _remove_collateral(to: address, amount: uint256):
+    """
+    @param to The address to remove collateral for
+    @param amount The amount of collateral to remove, in tokens
+    """
+    self._debit_collateral(to, amount)
     assert ERC20(collateral).transfer(
         to, amount, default_return_value=True
     )  # dev: Transfer Failed
 
-    log RemoveCollateral(to, amount, new_collateral_share)
-
 
 @internal
 def _add_asset(to: address, amount: uint256) -> uint256:
@@ -896,9 +1509,9 @@ def _add_asset(to: address, amount: uint256) -> uint256:
     @param amount The amount of asset to add, in tokens
     @return The amount of shares minted
     """
-    _total_asset: Rebase = self.total_asset
-    all_share: uint256 = convert(
-        _total_asset.elastic + self.total_borrow.elastic, uint256
+    _total_asset: Rebase = self._unpack_rebase(self.packed_total_asset)
+    all_share: uint256 = convert(_total_asset.elastic, uint256) + convert(
+        self._unpack_rebase(self.packed_total_borrow).elastic, uint256
     )
     fraction: uint256 = 0
     if all_share == 0:
@@ -908,12 +1521,9 @@ def _add_asset(to: address, amount: uint256) -> uint256:
     if _total_asset.base + convert(fraction, uint128) < 1000:
         return 0
 
-    self.total_asset = Rebase(
-        {
-            elastic: self.total_asset.elastic + convert(amount, uint128),
-            base: self.total_asset.base + convert(fraction, uint128),
-        }
-    )
+    _total_asset.elastic += convert(amount, uint128)
+    _total_asset.base += convert(fraction, uint128)
+    self.packed_total_asset = self._pack_rebase(_total_asset)
 
     new_balance: uint256 = self.balanceOf[to] + fraction
     self.balanceOf[to] = new_balance
@@ -926,11 +1536,14 @@ def _add_asset(to: address, amount: uint256) -> uint256:
 
 
 @internal
-def _remove_asset(to: address, owner: address, share: uint256) -> uint256:
+def _remove_asset(
+    state: PairState, owner: address, share: uint256
+) -> (PairState, uint256):
     """
-    @param to The address to remove asset for
+    @param state The current pair state
+    @param owner The address to remove asset for
     @param share The amount of asset to remove, in shares
-    @return The amount of assets removed
+    @return The updated pair state, and the amount of assets removed, to be sent by the caller
     """
     if owner != msg.sender:
         assert (
@@ -938,29 +1551,42 @@ def _remove_asset(to: address, owner: address, share: uint256) -> uint256:
         ), "Insufficient Allowance"
         self.allowance[owner][msg.sender] -= share
 
-    _total_asset: Rebase = self.total_asset
+    _state: PairState = state
     all_share: uint256 = convert(
-        _total_asset.elastic + self.total_borrow.elastic, uint256
+        _state.total_asset.elastic + _state.total_borrow.elastic, uint256
+    )
+    amount: uint256 = (share * all_share) / convert(
+        _state.total_asset.base, uint256
     )
-    amount: uint256 = (share * all_share) / convert(_total_asset.base, uint256)
 
-    _total_asset.elastic -= convert(amount, uint128)
-    _total_asset.base -= convert(share, uint128)
-    assert _total_asset.base >= 1000, "Below Minimum"
-    self.total_asset = _total_asset
+    _state.total_asset.elastic -= convert(amount, uint128)
+    _state.total_asset.base -= convert(share, uint128)
+    assert _state.total_asset.base >= 1000, "Below Minimum"
 
     new_balance: uint256 = self.balanceOf[owner] - share
     self.balanceOf[owner] = new_balance
-    assert ERC20(asset).transfer(
-        to, amount, default_return_value=True
-    )  # dev: Transfer Failed
 
-    return amount
+    return (_state, amount)
 
 
 @internal
 def _update_exchange_rate() -> (bool, uint256):
     """
+    @dev The oracle is read at most once per block, later calls in the same block reuse that read
+    @return A tuple of (updated, rate)
+        updated: Whether the exchange rate was updated
+        rate: The exchange rate
+    """
+    packed: uint256 = self.packed_exchange_rate
+    if packed >> 192 == block.number:
+        return (False, packed & MASK_192)
+    return self._refresh_exchange_rate(packed)
+
+
+@internal
+def _refresh_exchange_rate(packed: uint256) -> (bool, uint256):
+    """
+    @param packed The currently stored packed exchange rate
     @return A tuple of (updated, rate)
         updated: Whether the exchange rate was updated
         rate: The exchange rate
@@ -971,24 +1597,25 @@ def _update_exchange_rate() -> (bool, uint256):
     updated, rate = IOracle(oracle).get()
 
     if updated:
-        self.exchange_rate = rate
+        assert rate <= MASK_192, "CogPair: Rate overflow"
     else:
-        rate = self.exchange_rate
+        rate = packed & MASK_192
 
+    self.packed_exchange_rate = rate | (block.number << 192)
     return (updated, rate)
 
 
 @internal
-def _borrow(amount: uint256, _from: address, to: address) -> uint256:
+def _borrow(state: PairState, amount: uint256, _from: address) -> PairState:
     """
+    @param state: The current pair state
     @param amount: The amount of asset to borrow, in tokens
     @param _from: The account whom the loan should be taken out against
-    @param to: The address to send the borrowed tokens to
-    @return: The amount of tokens borrowed
+    @return: The updated pair state, the borrowed tokens are sent by the caller
     """
-    self._update_exchange_rate()
+    _state: PairState = state
     fee_amount: uint256 = (
-        amount * self.BORROW_OPENING_FEE
+        amount * convert(_state.fee_info.borrow_opening_fee, uint256)
     ) / BORROW_OPENING_FEE_PRECISION
 
     temp_total_borrow: Rebase = Rebase(
@@ -1000,33 +1627,28 @@ def _borrow(amount: uint256, _from: address, to: address) -> uint256:
     part: uint256 = 0
 
     temp_total_borrow, part = self.add_round_up(
-        self.total_borrow, (amount + fee_amount)
+        _state.total_borrow, (amount + fee_amount)
     )
-    self.total_borrow = temp_total_borrow
+    _state.total_borrow = temp_total_borrow
     self.user_borrow_part[_from] = self.user_borrow_part[_from] + part
 
-    _total_asset: Rebase = self.total_asset
-    assert _total_asset.base >= 1000, "Below Minimum"
-    _total_asset.elastic = convert(
-        convert(_total_asset.elastic, uint256) - amount, uint128
+    assert _state.total_asset.base >= 1000, "Below Minimum"
+    _state.total_asset.elastic = convert(
+        convert(_state.total_asset.elastic, uint256) - amount, uint128
     )
-    self.total_asset = _total_asset
-    assert ERC20(asset).transfer(
-        to, amount, default_return_value=True
-    )  # dev: Transfer Failed
 
-    log Borrow(amount, to, _from)
-
-    return amount
+    return _state
 
 
 @internal
-def _repay(to: address, payment: uint256) -> uint256:
+def _repay(state: PairState, to: address, payment: uint256) -> (PairState, uint256):
     """
+    @param state: The current pair state
     @param to: The address to repay the tokens for
     @param payment: The amount of asset to repay, in shares of the borrow position
-    @return: The amount of tokens repaid in shares
+    @return: The updated pair state, and the amount of tokens owed, to be pulled by the caller
     """
+    _state: PairState = state
     temp_total_borrow: Rebase = Rebase(
         {
             elastic: 0,
@@ -1035,34 +1657,34 @@ def _repay(to: address, payment: uint256) -> uint256:
     )
     amount: uint256 = 0
 
-    temp_total_borrow, amount = self.sub(self.total_borrow, payment, True)
-    self.total_borrow = temp_total_borrow
+    temp_total_borrow, amount = self.sub(_state.total_borrow, payment, True)
+    _state.total_borrow = temp_total_borrow
 
     self.user_borrow_part[to] = self.user_borrow_part[to] - payment
-    total_share: uint128 = self.total_asset.elastic
-    assert ERC20(asset).transferFrom(
-        msg.sender, self, amount, default_return_value=True
-    )  # dev: Transfer Failed
-
-    self.total_asset.elastic = total_share + convert(amount, uint128)
-    return amount
+    _state.total_asset.elastic = _state.total_asset.elastic + convert(
+        amount, uint128
+    )
+    return (_state, amount)
 
 
+@view
 @internal
-def _is_solvent(user: address, exchange_rate: uint256) -> bool:
+def _health_factor(
+    user: address, exchange_rate: uint256, _total_borrow: Rebase
+) -> uint256:
     """
     @param user: The user to check
     @param exchange_rate: The exchange rate to use
-    @return: Whether the user is solvent
+    @param _total_borrow: The current total borrow
+    @return: Collateral value over borrow value scaled by 1e18, the user is solvent while this is >= 1e18
     """
     borrow_part: uint256 = self.user_borrow_part[user]
     if borrow_part == 0:
-        return True
+        return max_value(uint256)
     collateral_share: uint256 = self.user_collateral_share[user]
     if collateral_share == 0:
-        return False
+        return 0
 
-    _total_borrow: Rebase = self.total_borrow
     collateral_amt: uint256 = (
         (
             collateral_share
@@ -1071,13 +1693,32 @@ def _is_solvent(user: address, exchange_rate: uint256) -> bool:
         * COLLATERIZATION_RATE
     )
 
-    borrow_part = self.mul_div(
+    borrow_value: uint256 = self.mul_div(
         (borrow_part * convert(_total_borrow.elastic, uint256)),
         exchange_rate,
         convert(_total_borrow.base, uint256),
         False,
     )
-    return collateral_amt >= borrow_part
+    if borrow_value == 0:
+        return max_value(uint256)
+    return self.mul_div(collateral_amt, HEALTH_FACTOR_PRECISION, borrow_value, False)
+
+
+@view
+@internal
+def _is_solvent(
+    user: address, exchange_rate: uint256, _total_borrow: Rebase
+) -> bool:
+    """
+    @param user: The user to check
+    @param exchange_rate: The exchange rate to use
+    @param _total_borrow: The current total borrow
+    @return: Whether the user is solvent
+    """
+    return (
+        self._health_factor(user, exchange_rate, _total_borrow)
+        >= HEALTH_FACTOR_PRECISION
+    )
 
 
 # ///////////////////////////////////////////////////// #
@@ -1094,6 +1735,7 @@ def __init__(
     min_interest: uint64,
     max_interest: uint64,
     elasticity: uint256,
+    _compounding: bool,
 ):
     assert (
         _collateral != 0x0000000000000000000000000000000000000000
@@ -1101,15 +1743,40 @@ def __init__(
     collateral = _collateral
     asset = _asset
     oracle = _oracle
-    self.DEFAULT_PROTOCOL_FEE = 100000
-    self.protocol_fee = 100000  # 10%
+    self.packed_fee_info = self._pack_fee_info(
+        FeeInfo(
+            {
+                last_interest_per_second: 0,
+                last_elapsed_time: 0,
+                protocol_fee: 100000,  # 10%
+                default_protocol_fee: 100000,
+                borrow_opening_fee: 50,
+                paused: False,
+            }
+        )
+    )
+    assert (
+        min_target_utilization <= UTILIZATION_PRECISION
+        and max_target_utilization != 0
+        and max_target_utilization <= UTILIZATION_PRECISION
+    ), "Invalid Target Utilization"
     MINIMUM_TARGET_UTILIZATION = min_target_utilization
     MAXIMUM_TARGET_UTILIZATION = max_target_utilization
+    # A zero minimum is never reached, so its factor is never needed
+    min_target_reciprocal: uint256 = 0
+    if min_target_utilization != 0:
+        min_target_reciprocal = (
+            (FACTOR_PRECISION << RECIPROCAL_SHIFT) + min_target_utilization - 1
+        ) / min_target_utilization
+    MINIMUM_TARGET_RECIPROCAL = min_target_reciprocal
+    MAXIMUM_TARGET_RECIPROCAL = (
+        (FACTOR_PRECISION << RECIPROCAL_SHIFT) + max_target_utilization - 1
+    ) / max_target_utilization
     STARTING_INTEREST_PER_SECOND = starting_interest_per_second
     MINIMUM_INTEREST_PER_SECOND = min_interest
     MAXIMUM_INTEREST_PER_SECOND = max_interest
     INTEREST_ELASTICITY = elasticity
-    self.BORROW_OPENING_FEE = 50
+    compounding = _compounding
     factory = msg.sender
 
 
@@ -1140,7 +1807,9 @@ def remove_collateral(to: address, amount: uint256):
     self.efficient_accrue()
     self._remove_collateral(to, amount)
     assert self._is_solvent(
-        msg.sender, self.exchange_rate
+        msg.sender,
+        self._stored_exchange_rate(),
+        self._unpack_rebase(self.packed_total_borrow),
     ), "Insufficient Collateral"
 
 
@@ -1164,17 +1833,29 @@ def borrow(
     @param to The address to send the borrowed tokens to
     @return The amount of tokens borrowed
     """
-    self._is_not_paused()
-    self.efficient_accrue()
+    exchange_rate: uint256 = 0
+    updated: bool = False  # Never used
+    updated, exchange_rate = self._update_exchange_rate()
+
+    state: PairState = self._accrued_state()
+    assert (not state.fee_info.paused), "Pair Paused"
     if _from != msg.sender:
         self.borrow_approvals[_from][msg.sender] -= amount
-    borrowed: uint256 = self._borrow(amount, _from, to)
+    state = self._borrow(state, amount, _from)
     assert self._is_solvent(
-        _from, self.exchange_rate
+        _from, exchange_rate, state.total_borrow
     ), "Insufficient Collateral"
-    # Now that utilization has changed, interest must be accrued to trigger any surge which now may be occuring
-    self._accrue(self.accrue_info, 0)
-    return borrowed
+    # Now that utilization has changed, the rate must be updated to trigger any surge which now may be occuring
+    state = self._update_rate(state)
+    self._store_state(state)
+
+    assert ERC20(asset).transfer(
+        to, amount, default_return_value=True
+    )  # dev: Transfer Failed
+
+    log Borrow(amount, to, _from, self.user_borrow_part[_from])
+
+    return amount
 
 
 @external
@@ -1184,71 +1865,140 @@ def repay(to: address, payment: uint256) -> uint256:
     @param payment The amount of asset to repay, in debt position shares
     @return The amount of tokens repaid in shares
     """
-    self.efficient_accrue()
-    return self._repay(to, payment)
+    state: PairState = self._accrued_state()
+    amount: uint256 = 0
+    state, amount = self._repay(state, to, payment)
+    self._store_state(state)
+
+    assert ERC20(asset).transferFrom(
+        msg.sender, self, amount, default_return_value=True
+    )  # dev: Transfer Failed
+
+    log Repay(msg.sender, to, amount, payment)
+    return amount
+
+
+@view
+@external
+def is_solvent(user: address) -> bool:
+    """
+    @notice Interest is projected to the current block, against the last stored exchange rate
+    @param user The user to check
+    @return Whether the user is solvent
+    """
+    return self._is_solvent(
+        user, self._stored_exchange_rate(), self._accrued_state().total_borrow
+    )
+
+
+@view
+@external
+def health_factors(
+    users: DynArray[address, MAX_HEALTH_FACTORS]
+) -> DynArray[uint256, MAX_HEALTH_FACTORS]:
+    """
+    @notice Interest is projected to the current block, against the last stored exchange rate
+    @param users The users to check
+    @return The health factor of each user, scaled by 1e18, where anything below 1e18 can be liquidated
+        and max_value(uint256) means the user has no debt
+    """
+    _total_borrow: Rebase = self._accrued_state().total_borrow
+    _exchange_rate: uint256 = self._stored_exchange_rate()
+    factors: DynArray[uint256, MAX_HEALTH_FACTORS] = []
+    for user in users:
+        factors.append(self._health_factor(user, _exchange_rate, _total_borrow))
+    return factors
+
+
+@view
+@external
+def borrow_amount_of(user: address) -> uint256:
+    """
+    @notice Interest is projected to the current block
+    @param user The user to check
+    @return The amount of asset owed by the user, rounded up the same way repay is
+    """
+    return self.to_elastic(
+        self._accrued_state().total_borrow, self.user_borrow_part[user], True
+    )
 
 
 @external
 def get_exchange_rate() -> (bool, uint256):
     """
+    @notice Always reads the oracle, even if it was already read this block, so a price update can
+        be picked up by liquidations later in the same block
     @return A tuple of (updated, rate)
         updated Whether the exchange rate was updated
         rate The exchange rate
     """
-    return self._update_exchange_rate()
+    return self._refresh_exchange_rate(self.packed_exchange_rate)
 
 
-@external
-def liquidate(user: address, max_borrow_parts: uint256, to: address):
+@internal
+def _liquidate(
+    state: PairState, user: address, max_borrow_parts: uint256, exchange_rate: uint256
+) -> (PairState, uint256, uint256):
     """
+    @param state The current pair state
     @param user The user to liquidate
     @param max_borrow_parts The parts to liquidate
-    @param to The address to send the liquidated tokens to
+    @param exchange_rate The exchange rate to use
+    @return The updated pair state, the amount of asset owed by the liquidator, and the
+        collateral share released to the liquidator, both 0 if the user is solvent, no parts are
+        liquidated, or a partial liquidation is not covered by the user's collateral
     """
-    exchange_rate: uint256 = 0
-    updated: bool = False  # Never used
-    updated, exchange_rate = self._update_exchange_rate()
-    self.efficient_accrue()
-
-    collateral_share: uint256 = 0
-    borrow_amount: uint256 = 0
-    borrow_part: uint256 = 0
-    _total_borrow: Rebase = self.total_borrow
-
-    if not self._is_solvent(user, exchange_rate):
-        available_borrow_part: uint256 = self.user_borrow_part[user]
-        borrow_part = min(max_borrow_parts, available_borrow_part)
-        self.user_borrow_part[user] = available_borrow_part - borrow_part
-
-        borrow_amount = self.to_elastic(
-            _total_borrow, borrow_part, False
-        )
+    _state: PairState = state
+    if self._is_solvent(user, exchange_rate, _state.total_borrow):
+        return (_state, 0, 0)
 
-        collateral_share = (
-            (borrow_amount * LIQUIDATION_MULTIPLIER * exchange_rate)
-            / (LIQUIDATION_MULTIPLIER_PRECISION * EXCHANGE_RATE_PRECISION)
-        )
+    available_borrow_part: uint256 = self.user_borrow_part[user]
+    borrow_part: uint256 = min(max_borrow_parts, available_borrow_part)
 
-        # NOTE: If this check is ever true, bad debt has accrued, and so the
-        # liquidator will instead receive collateral worth less than the assets 
-        # they are paying, but the bad debt position will be resolved assuming the entire bad debt
-        # position is liquidated. Allows for bad debt positions to be liquidated
-        if collateral_share > self.user_collateral_share[user] and borrow_part == available_borrow_part:
-            collateral_share = self.user_collateral_share[user]
-       
-        self.user_collateral_share[user] = (
-            self.user_collateral_share[user] - collateral_share
-        )
+    borrow_amount: uint256 = self.to_elastic(
+        _state.total_borrow, borrow_part, False
+    )
 
-    assert borrow_amount != 0, "CogPair: User is solvent"
+    collateral_share: uint256 = (
+        (borrow_amount * LIQUIDATION_MULTIPLIER * exchange_rate)
+        / (LIQUIDATION_MULTIPLIER_PRECISION * EXCHANGE_RATE_PRECISION)
+    )
 
-    self.total_borrow.elastic = self.total_borrow.elastic - convert(
+    # NOTE: If this check is ever true, bad debt has accrued, and so the
+    # liquidator will instead receive collateral worth less than the assets
+    # they are paying, but the bad debt position will be resolved assuming the entire bad debt
+    # position is liquidated. Allows for bad debt positions to be liquidated
+    user_collateral: uint256 = self.user_collateral_share[user]
+    if collateral_share > user_collateral:
+        if borrow_part != available_borrow_part:
+            # Only the whole bad debt position can be liquidated
+            return (_state, 0, 0)
+        collateral_share = user_collateral
+    if borrow_amount == 0:
+        return (_state, 0, 0)
+
+    self.user_borrow_part[user] = available_borrow_part - borrow_part
+    self.user_collateral_share[user] = user_collateral - collateral_share
+
+    _state.total_borrow.elastic = _state.total_borrow.elastic - convert(
         borrow_amount, uint128
     )
-    self.total_borrow.base = self.total_borrow.base - convert(
+    _state.total_borrow.base = _state.total_borrow.base - convert(
         borrow_part, uint128
     )
+    _state.total_asset.elastic = _state.total_asset.elastic + convert(
+        borrow_part, uint128
+    )
+
+    log Liquidate(msg.sender, user, borrow_part, borrow_amount, collateral_share)
+    return (_state, borrow_amount, collateral_share)
 
+
+@internal
+def _settle_liquidation(to: address, collateral_share: uint256, borrow_amount: uint256):
+    """
+    @dev Sends the released collateral to `to` and takes the liquidated assets from msg.sender
+    """
     self.total_collateral_share = (
         self.total_collateral_share - collateral_share
     )
@@ -1261,10 +2011,162 @@ def liquidate(user: address, max_borrow_parts: uint256, to: address):
         msg.sender, self, borrow_amount, default_return_value=True
     )  # dev: Transfer failed
 
-    self.total_asset.elastic = self.total_asset.elastic + convert(
-        borrow_part, uint128
+
+@external
+def liquidate(user: address, max_borrow_parts: uint256, to: address):
+    """
+    @param user The user to liquidate
+    @param max_borrow_parts The parts to liquidate
+    @param to The address to send the liquidated tokens to
+    """
+    exchange_rate: uint256 = 0
+    updated: bool = False  # Never used
+    updated, exchange_rate = self._update_exchange_rate()
+    state: PairState = self._accrued_state()
+
+    collateral_share: uint256 = 0
+    borrow_amount: uint256 = 0
+    state, borrow_amount, collateral_share = self._liquidate(
+        state, user, max_borrow_parts, exchange_rate
     )
 
+    if borrow_amount == 0:
+        assert not self._is_solvent(
+            user, exchange_rate, state.total_borrow
+        ), "CogPair: User is solvent"
+        raise "CogPair: Nothing to liquidate"
+    self._store_state(state)
+    self._settle_liquidation(to, collateral_share, borrow_amount)
+
+
+MAX_LIQUIDATIONS: constant(uint256) = 64
+
+
+@external
+def liquidate_many(
+    users: DynArray[address, MAX_LIQUIDATIONS],
+    max_parts: DynArray[uint256, MAX_LIQUIDATIONS],
+    to: address,
+) -> uint256:
+    """
+    @dev Updates the exchange rate and accrues once for the whole batch, users that liquidate
+        would revert on (solvent, nothing to liquidate, or a partial liquidation of bad debt) are
+        skipped, and collateral and assets are settled in a single transfer each
+    @param users The users to liquidate
+    @param max_parts The parts to liquidate for each user
+    @param to The address to send the liquidated tokens to
+    @return The total amount of asset paid by the liquidator
+    """
+    assert len(users) == len(max_parts), "CogPair: Length mismatch"
+
+    exchange_rate: uint256 = 0
+    updated: bool = False  # Never used
+    updated, exchange_rate = self._update_exchange_rate()
+    state: PairState = self._accrued_state()
+
+    total_collateral_share: uint256 = 0
+    total_borrow_amount: uint256 = 0
+    for i in range(MAX_LIQUIDATIONS):
+        if i >= len(users):
+            break
+        collateral_share: uint256 = 0
+        borrow_amount: uint256 = 0
+        state, borrow_amount, collateral_share = self._liquidate(
+            state, users[i], max_parts[i], exchange_rate
+        )
+        total_collateral_share += collateral_share
+        total_borrow_amount += borrow_amount
+
+    self._store_state(state)
+    if total_borrow_amount == 0:
+        # Every user was solvent, nothing to settle
+        return 0
+
+    self._settle_liquidation(to, total_collateral_share, total_borrow_amount)
+    return total_borrow_amount
+
+
+# Action codes for cook
+ACTION_ADD_COLLATERAL: constant(uint8) = 1
+ACTION_REMOVE_COLLATERAL: constant(uint8) = 2
+ACTION_BORROW: constant(uint8) = 3
+ACTION_REPAY: constant(uint8) = 4
+
+MAX_ACTIONS: constant(uint256) = 16
+
+
+struct Action:
+        action: uint8
+        amount: uint256
+
+
+@internal
+def _settle(token: address, amount_in: uint256, amount_out: uint256):
+    """
+    @dev Moves only the difference between what msg.sender owes the pair and what the pair owes them
+    """
+    if amount_in > amount_out:
+        assert ERC20(token).transferFrom(
+            msg.sender, self, amount_in - amount_out, default_return_value=True
+        )  # dev: Transfer Failed
+    elif amount_out > amount_in:
+        assert ERC20(token).transfer(
+            msg.sender, amount_out - amount_in, default_return_value=True
+        )  # dev: Transfer Failed
+
+
+@external
+def cook(actions: DynArray[Action, MAX_ACTIONS]):
+    """
+    @notice Runs a batch of actions on the caller's own position, accruing once, checking solvency
+        once at the end, and settling a single netted transfer per token with the caller
+    @param actions The actions to run in order, each an action code and an amount, in tokens
+        except for ACTION_REPAY which takes borrow parts like repay does
+    """
+    state: PairState = self._accrued_state()
+    collateral_in: uint256 = 0
+    collateral_out: uint256 = 0
+    asset_in: uint256 = 0
+    asset_out: uint256 = 0
+
+    for action in actions:
+        if action.action == ACTION_ADD_COLLATERAL:
+            self._credit_collateral(msg.sender, action.amount)
+            collateral_in += action.amount
+        elif action.action == ACTION_REMOVE_COLLATERAL:
+            self._debit_collateral(msg.sender, action.amount)
+            collateral_out += action.amount
+        elif action.action == ACTION_BORROW:
+            assert (not state.fee_info.paused), "Pair Paused"
+            state = self._borrow(state, action.amount, msg.sender)
+            asset_out += action.amount
+            log Borrow(action.amount, msg.sender, msg.sender, self.user_borrow_part[msg.sender])
+        elif action.action == ACTION_REPAY:
+            amount: uint256 = 0
+            state, amount = self._repay(state, msg.sender, action.amount)
+            asset_in += amount
+            log Repay(msg.sender, msg.sender, amount, action.amount)
+        else:
+            raise "CogPair: Unknown action"
+
+    # Adding collateral and repaying can't make a position worse, so only check when needed
+    if asset_out != 0 or collateral_out != 0:
+        exchange_rate: uint256 = 0
+        if asset_out != 0:
+            updated: bool = False  # Never used
+            updated, exchange_rate = self._update_exchange_rate()
+            # Now that utilization has changed, the rate must be updated to trigger any surge, as in borrow
+            state = self._update_rate(state)
+        else:
+            exchange_rate = self._stored_exchange_rate()
+        assert self._is_solvent(
+            msg.sender, exchange_rate, state.total_borrow
+        ), "Insufficient Collateral"
+    self._store_state(state)
+
+    self._settle(collateral, collateral_in, collateral_out)
+    self._settle(asset, asset_in, asset_out)
+
 
 # ///////////////////////////////////////////////////// #
 # 				Tinkermaster Control Panel				#
@@ -1276,43 +2178,70 @@ def update_borrow_fee(newFee: uint256):
     assert (
         newFee <= BORROW_OPENING_FEE_PRECISION / 2
     )  # Prevent rugging via borrow fee
-    self.BORROW_OPENING_FEE = newFee
+    fee_info: FeeInfo = self._unpack_fee_info(self.packed_fee_info)
+    fee_info.borrow_opening_fee = convert(newFee, uint32)
+    self.packed_fee_info = self._pack_fee_info(fee_info)
 
 
 @external
 def update_default_protocol_fee(newFee: uint256):
     assert (msg.sender == factory)
     assert (newFee <= PROTOCOL_FEE_PRECISION)
-    self.DEFAULT_PROTOCOL_FEE = newFee
+    fee_info: FeeInfo = self._unpack_fee_info(self.packed_fee_info)
+    fee_info.default_protocol_fee = convert(newFee, uint32)
+    self.packed_fee_info = self._pack_fee_info(fee_info)
 
 
 @external
 def pause():
     assert (msg.sender == factory)
-    self.paused = True
+    fee_info: FeeInfo = self._unpack_fee_info(self.packed_fee_info)
+    fee_info.paused = True
+    self.packed_fee_info = self._pack_fee_info(fee_info)
     log Paused(block.timestamp)
 
 
 @external
 def unpause():
     assert (msg.sender == factory)
-    self.paused = False
+    fee_info: FeeInfo = self._unpack_fee_info(self.packed_fee_info)
+    fee_info.paused = False
+    self.packed_fee_info = self._pack_fee_info(fee_info)
     log UnPaused(block.timestamp)
 
 
 @external
-def roll_over_pol():
+def roll_over_pol() -> uint256:
     """
     @dev Withdraws protocol fees and deposits them into the pool on behalf of the tinkermaster address
+    @return The fee fraction rolled over, in shares
     """
-    _fee_to: address = ICogFactory(factory).fee_to()
-    _accrue_info: AccrueInfo = self.accrue_info
+    return self._roll_over_pol(ICogFactory(factory).fee_to())
+
+
+@external
+def roll_over_pol_to(_fee_to: address) -> uint256:
+    """
+    @dev Same as roll_over_pol, for the factory harvesting many pairs, which passes
+        fee_to down so the pair does not have to call back for it
+    @param _fee_to The factory's fee_to
+    @return The fee fraction rolled over, in shares
+    """
+    assert (msg.sender == factory)
+    return self._roll_over_pol(_fee_to)
+
+
+@internal
+def _roll_over_pol(_fee_to: address) -> uint256:
+    _accrue_info: AccrueInfo = self._unpack_accrue_info(self.packed_accrue_info)
 
     # Withdraw protocol fees
     fees_earned_fraction: uint256 = convert(
         _accrue_info.fees_earned_fraction, uint256
     )
     self.balanceOf[_fee_to] = self.balanceOf[_fee_to] + fees_earned_fraction
-    self.accrue_info.fees_earned_fraction = 0
+    _accrue_info.fees_earned_fraction = 0
+    self.packed_accrue_info = self._pack_accrue_info(_accrue_info)
 
     log Transfer(convert(0, address), _fee_to, fees_earned_fraction)
+    return fees_earned_fraction
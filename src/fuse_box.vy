@@ -110,41 +110,93 @@ struct DataSource:
         oracle_address: address
 
 
-fuse_box: public(DataSource[4])
+MAX_SOURCES: constant(uint256) = 8
+DEVIATION_PRECISION: constant(uint256) = 10000  # 1e4, basis points
+ADDRESS_MASK: constant(uint256) = 1461501637330902918203684832716283019655932542975  # 2**160 - 1
+ACTIVE_FLAG: constant(uint256) = 1461501637330902918203684832716283019655932542976  # 1 << 160
+
+# Each source is packed into a single slot: oracle_address [0, 160), active [160, 168)
+packed_sources: DynArray[uint256, MAX_SOURCES]
+
+# 0 averages every active source. Otherwise the median of the fresh prices is used, and reading
+# stops as soon as `quorum` fresh prices lie within `max_deviation` of each other. Without such
+# a quorum the median isn't reported as updated
+quorum: public(uint256)
+max_deviation: public(uint256)  # In DEVIATION_PRECISION
 
 
 @external
-def __init__(sources: DataSource[4]):
+def __init__(sources: DynArray[DataSource, MAX_SOURCES]):
     """
     @notice Fuse Box Constructor
     @param sources An array of data sources to be used by the Fuse Box
     """
-    assert (
-        sources[0].active
-        or sources[1].active
-        or sources[2].active
-        or sources[3].active
-    ), "FuseBox: All data sources are inactive"
-
     self._transfer_ownership(msg.sender)
-    self.fuse_box = sources
-    
+    for source in sources:
+        self.packed_sources.append(self._pack_source(source))
+    self._check_active()
+
+
+@pure
+@internal
+def _pack_source(source: DataSource) -> uint256:
+    return convert(source.oracle_address, uint256) | (convert(source.active, uint256) << 160)
+
+
+@pure
+@internal
+def _unpack_source(packed: uint256) -> DataSource:
+    return DataSource(
+        {
+            active: convert(packed >> 160, bool),
+            oracle_address: convert(convert(packed & ADDRESS_MASK, uint160), address),
+        }
+    )
+
+
+@view
+@internal
+def _check_active():
+    # A quorum above the active sources could never be met, and every price would be reported stale
+    active: uint256 = 0
+    for packed in self.packed_sources:
+        if packed >= ACTIVE_FLAG:
+            active += 1
+    assert active != 0, "FuseBox: All data sources are inactive"
+    assert self.quorum <= active, "FuseBox: Quorum above active sources"
+
+
+@view
+@external
+def fuse_box(source_index: uint256) -> DataSource:
+    """
+    @param source_index The index of the data source
+    @return The data source at `source_index`
+    """
+    return self._unpack_source(self.packed_sources[source_index])
+
+
+@external
+def add_source(oracle_address: address):
+    """
+    @notice Adds a new, active data source
+    @param oracle_address The oracle to read from
+    """
+    self._check_owner()
+    self.packed_sources.append(
+        self._pack_source(DataSource({active: True, oracle_address: oracle_address}))
+    )
 
 
 @external
 def defuse_source(source_index: uint256):
     """
-    @notice Deactivates a data source
+    @notice Deactivates a data source, as long as enough stay active for the quorum
     @param source_index The index of the data source to deactivate
     """
     self._check_owner()
-    self.fuse_box[source_index].active = False
-    assert (
-        self.fuse_box[0].active
-        or self.fuse_box[1].active
-        or self.fuse_box[2].active
-        or self.fuse_box[3].active
-    ), "FuseBox: All data sources are inactive"
+    self.packed_sources[source_index] &= ADDRESS_MASK
+    self._check_active()
 
 
 @external
@@ -154,18 +206,58 @@ def activate_source(source_index: uint256):
     @param source_index The index of the data source to activate
     """
     self._check_owner()
-    self.fuse_box[source_index].active = True
+    self.packed_sources[source_index] |= ACTIVE_FLAG
     # No need to check if all data sources are active, as this is a redundant check
 
 
 @external
-def get() -> (bool, uint256):
+def set_quorum(quorum: uint256, max_deviation: uint256):
     """
-    @return bool Whether or not the oracle updated
-    @return uint256 the price of the asset
+    @notice Switches between averaging and median aggregation
+    @param quorum Fresh, agreeing prices needed to stop reading sources, 0 to average every source,
+        at most the number of active sources
+    @param max_deviation How far apart, in basis points of the lowest, prices may be and still agree,
+        at most 100%
     """
-    fuses: DataSource[4] = self.fuse_box
+    self._check_owner()
+    assert quorum <= MAX_SOURCES, "FuseBox: Quorum too large"
+    assert max_deviation <= DEVIATION_PRECISION, "FuseBox: Deviation too large"
+    self.quorum = quorum
+    self.max_deviation = max_deviation
+    self._check_active()
 
+
+@pure
+@internal
+def _insert_sorted(
+    prices: DynArray[uint256, MAX_SOURCES], price: uint256
+) -> DynArray[uint256, MAX_SOURCES]:
+    sorted_prices: DynArray[uint256, MAX_SOURCES] = prices
+    sorted_prices.append(price)
+    for i in range(MAX_SOURCES):
+        j: uint256 = len(sorted_prices) - 1 - i
+        if j == 0 or sorted_prices[j - 1] <= price:
+            break
+        sorted_prices[j] = sorted_prices[j - 1]
+        sorted_prices[j - 1] = price
+    return sorted_prices
+
+
+@pure
+@internal
+def _median(sorted_prices: DynArray[uint256, MAX_SOURCES]) -> uint256:
+    count: uint256 = len(sorted_prices)
+    if count == 0:
+        return 0
+    if count % 2 == 1:
+        return sorted_prices[count / 2]
+    low: uint256 = sorted_prices[count / 2 - 1]
+    high: uint256 = sorted_prices[count / 2]
+    return low + (high - low) / 2
+
+
+@internal
+def _get_average(sources: DynArray[uint256, MAX_SOURCES]) -> (bool, uint256):
     avg_price: uint256 = 0
     active_oracles: uint256 = 0
 
@@ -173,42 +265,76 @@ def get() -> (bool, uint256):
 
     updated: bool = False
 
-    for i in range(4):
-        if fuses[i].active:
+    for packed in sources:
+        if packed >= ACTIVE_FLAG:
             active_oracles += 1
 
-    if fuses[0].active:
-        updated_0: bool = False
-        price: uint256 = 0
-        (updated_0, price) = IOracle(fuses[0].oracle_address).get()
-        updated = updated or updated_0
-        avg_price += (price / active_oracles)
-        remainder_sum += (price % active_oracles)
+    for packed in sources:
+        if packed >= ACTIVE_FLAG:
+            source_updated: bool = False
+            price: uint256 = 0
+            (source_updated, price) = IOracle(
+                self._unpack_source(packed).oracle_address
+            ).get()
+            updated = updated or source_updated
+            avg_price += (price / active_oracles)
+            remainder_sum += (price % active_oracles)
 
-    if fuses[1].active:
-        updated_1: bool = False
-        price: uint256 = 0
-        (updated_1, price) = IOracle(fuses[1].oracle_address).get()
-        updated = updated or updated_1
-        avg_price += (price / active_oracles)
-        remainder_sum += (price % active_oracles)
+    avg_price += (remainder_sum / active_oracles)
+
+    return (updated, avg_price)
 
-    if fuses[2].active:
-        updated_2: bool = False
-        price: uint256 = 0
-        (updated_2, price) = IOracle(fuses[2].oracle_address).get()
-        updated = updated or updated_2
-        avg_price += (price / active_oracles)
-        remainder_sum += (price % active_oracles)
 
-    if fuses[3].active:
-        updated_3: bool = False
+@internal
+def _get_median(sources: DynArray[uint256, MAX_SOURCES]) -> (bool, uint256):
+    _quorum: uint256 = self.quorum
+    _max_deviation: uint256 = self.max_deviation
+
+    fresh: DynArray[uint256, MAX_SOURCES] = []
+    stale: DynArray[uint256, MAX_SOURCES] = []
+    agreed: bool = False
+
+    for packed in sources:
+        if packed < ACTIVE_FLAG:
+            continue
+        source_updated: bool = False
         price: uint256 = 0
-        (updated_3, price) = IOracle(fuses[3].oracle_address).get()
-        updated = updated or updated_3
-        avg_price += (price / active_oracles)
-        remainder_sum += (price % active_oracles)
+        (source_updated, price) = IOracle(
+            self._unpack_source(packed).oracle_address
+        ).get()
+        if not source_updated:
+            stale = self._insert_sorted(stale, price)
+            continue
+
+        fresh = self._insert_sorted(fresh, price)
+        # The prices being sorted, only runs of `quorum` neighbours have to be checked
+        for i in range(MAX_SOURCES):
+            if i + _quorum > len(fresh):
+                break
+            if (
+                (fresh[i + _quorum - 1] - fresh[i]) * DEVIATION_PRECISION
+                <= _max_deviation * fresh[i]
+            ):
+                agreed = True
+                break
+        if agreed:
+            # Enough sources agree, the rest don't need to be called
+            break
+
+    if len(fresh) == 0:
+        return (False, self._median(stale))
+    # Fresh prices no quorum backs are still the best guess, but aren't reported as an update,
+    # so the pair keeps its cached rate
+    return (agreed, self._median(fresh))
 
-    avg_price += (remainder_sum / active_oracles)
 
-    return (updated, avg_price)
+@external
+def get() -> (bool, uint256):
+    """
+    @return bool Whether or not the oracle updated
+    @return uint256 the price of the asset
+    """
+    sources: DynArray[uint256, MAX_SOURCES] = self.packed_sources
+    if self.quorum == 0:
+        return self._get_average(sources)
+    return self._get_median(sources)
@@ -4,7 +4,8 @@
 @title Loan Router
 @author cog.finance
 @license AGPL-3.0
-@notice A very smol helper contract for routing multiple borrows
+@notice A very smol helper contract for routing multiple borrows, and for looping
+    a single pair up to a target leverage
 """
 
 from vyper.interfaces import ERC20
@@ -17,8 +18,26 @@ interface CogPair:
 
     def add_collateral(to: address, amount: uint256): nonpayable
 
+    def get_exchange_rate() -> (bool, uint256): nonpayable
+
     def collateral() -> address: view
     def asset() -> address: view
+    def BORROW_OPENING_FEE() -> uint256: view
+
+
+interface CogFactory:
+    def pair_tier(pair: address) -> uint256: view
+
+
+# Swaps `amount_in` of `token_in`, already sent to the adapter, and sends the output to `receiver`
+interface SwapAdapter:
+    def swap(
+        token_in: address,
+        token_out: address,
+        amount_in: uint256,
+        min_out: uint256,
+        receiver: address,
+    ) -> uint256: nonpayable
 
 
 struct Hop:
@@ -27,31 +46,218 @@ struct Hop:
         assets_to_borrow: uint256
 
 
+MAX_HOPS: constant(uint256) = 16
+MAX_LOOPS: constant(uint256) = 32
+
+LEVERAGE_PRECISION: constant(uint256) = 1000000000000000000  # 1e18
+EXCHANGE_RATE_PRECISION: constant(uint256) = 1000000000000000000  # 1e18
+BORROW_OPENING_FEE_PRECISION: constant(uint256) = 100000  # 1e5, as in CogPair
+# Cog pairs lend up to 75% of the collateral value
+MAX_LTV: constant(uint256) = 750000000000000000  # 75%
+
+# Only pairs this factory deployed are given an approval
+factory: public(immutable(CogFactory))
+
+
 @external
-def loan_tokens(path: Hop[5], deadline: uint256):
+def __init__(_factory: address):
+    factory = CogFactory(_factory)
+
+
+@internal
+def _ensure_approval(pair: address, token: address, amount: uint256):
+    """
+    @dev Only approves when the allowance can't cover the hop, and then for the max amount,
+        so a single approval per pair and token serves every later hop and call
+    """
+    if ERC20(token).allowance(self, pair) < amount:
+        assert factory.pair_tier(pair) != 0, "LoanRouter: Unknown pair"
+        ERC20(token).approve(pair, max_value(uint256))
+
+
+@external
+def loan_tokens(path: DynArray[Hop, MAX_HOPS], deadline: uint256):
+    """
+    @param path The hops to take, each pair's asset being the next pair's collateral
+    @param deadline The timestamp after which the route is no longer valid
+    """
     assert (block.timestamp < deadline)
+    assert len(path) != 0, "LoanRouter: Empty path"
+
+    # Each borrowed asset is the collateral of the next hop, so only the first collateral is
+    # read. A hop that takes another collateral reverts when its pair pulls the token it expects,
+    # the router only holding the one just borrowed
+    collateral: address = CogPair(path[0].pair).collateral()
     # Prefund initial hop
-    first_route: Hop = path[0]
-    ERC20(CogPair(first_route.pair).collateral()).transferFrom(
-        msg.sender, self, first_route.collateral_added
+    ERC20(collateral).transferFrom(
+        msg.sender, self, path[0].collateral_added
+    )
+
+    for route in path:
+        self._ensure_approval(route.pair, collateral, route.collateral_added)
+        CogPair(route.pair).add_collateral(msg.sender, route.collateral_added)
+        CogPair(route.pair).borrow(route.assets_to_borrow, msg.sender, self)
+        collateral = CogPair(route.pair).asset()
+
+    ERC20(collateral).transfer(msg.sender, ERC20(collateral).balanceOf(self))
+
+
+@pure
+@internal
+def _log2(x: uint256) -> uint256:
+    """
+    @param x A value of at least 1, scaled by LEVERAGE_PRECISION
+    @return log2(x), scaled by LEVERAGE_PRECISION
+    """
+    result: uint256 = 0
+    y: uint256 = x
+    for i in range(128):
+        if y < 2 * LEVERAGE_PRECISION:
+            break
+        y /= 2
+        result += LEVERAGE_PRECISION
+    # One bit of the fraction per squaring
+    bit: uint256 = LEVERAGE_PRECISION / 2
+    for i in range(60):
+        y = y * y / LEVERAGE_PRECISION
+        if y >= 2 * LEVERAGE_PRECISION:
+            y /= 2
+            result += bit
+        bit /= 2
+    return result
+
+
+@pure
+@internal
+def _pow(x: uint256, n: uint256) -> uint256:
+    """
+    @param x The base, scaled by LEVERAGE_PRECISION
+    @param n The exponent
+    @return x ** n, scaled by LEVERAGE_PRECISION
+    """
+    result: uint256 = LEVERAGE_PRECISION
+    base: uint256 = x
+    exponent: uint256 = n
+    for i in range(256):
+        if exponent == 0:
+            break
+        if exponent % 2 == 1:
+            result = result * base / LEVERAGE_PRECISION
+        base = base * base / LEVERAGE_PRECISION
+        exponent /= 2
+    return result
+
+
+@pure
+@internal
+def _loops(leverage: uint256, ltv: uint256) -> uint256:
+    """
+    @dev Borrowing `ltv` of the collateral added each loop, n loops give a leverage of
+        (1 - ltv^(n+1)) / (1 - ltv), so the smallest n reaching the target is the smallest
+        k = n + 1 with ltv^k <= 1 - leverage * (1 - ltv), which is ceil(log(t) / log(ltv)).
+        The log ratio is only used as an estimate, and checked against ltv^k in one step.
+    @param leverage The target leverage, scaled by LEVERAGE_PRECISION
+    @param ltv The share of each loop's collateral value to borrow, scaled by LEVERAGE_PRECISION
+    @return The number of borrow and swap loops needed
+    """
+    assert ltv != 0 and ltv < MAX_LTV, "LoanRouter: Invalid LTV"
+    assert leverage >= LEVERAGE_PRECISION, "LoanRouter: Leverage below 1x"
+    if leverage == LEVERAGE_PRECISION:
+        return 0
+
+    reached: uint256 = leverage * (LEVERAGE_PRECISION - ltv) / LEVERAGE_PRECISION
+    assert reached < LEVERAGE_PRECISION, "LoanRouter: Leverage unreachable"
+    target: uint256 = LEVERAGE_PRECISION - reached
+
+    # log(t) / log(ltv) == log2(1 / t) / log2(1 / ltv), both positive
+    numerator: uint256 = self._log2(LEVERAGE_PRECISION * LEVERAGE_PRECISION / target)
+    denominator: uint256 = self._log2(LEVERAGE_PRECISION * LEVERAGE_PRECISION / ltv)
+    k: uint256 = max((numerator + denominator - 1) / denominator, 1)
+    if self._pow(ltv, k) > target:
+        k += 1
+    elif k > 1 and self._pow(ltv, k - 1) <= target:
+        k -= 1
+    return k - 1
+
+
+@pure
+@external
+def loops(leverage: uint256, ltv: uint256) -> uint256:
+    """
+    @param leverage The target leverage, scaled by 1e18
+    @param ltv The share of each loop's collateral value to borrow, scaled by 1e18
+    @return The number of borrow and swap loops `leverage_up` would run
+    """
+    return self._loops(leverage, ltv)
+
+
+@external
+def leverage_up(
+    pair: address,
+    adapter: address,
+    collateral_amount: uint256,
+    leverage: uint256,
+    ltv: uint256,
+    min_collateral_out: uint256,
+    deadline: uint256,
+) -> uint256:
+    """
+    @notice Adds `collateral_amount` for the caller, then repeatedly borrows the pair's asset against
+        the collateral just added, swaps it back to collateral and adds that too, until the collateral
+        reaches `leverage` times the initial amount. Requires approve_borrow for this router on the pair.
+    @param pair The pair to loop
+    @param adapter The swap adapter used to turn the borrowed asset back into collateral
+    @param collateral_amount The collateral to start from, pulled from the caller
+    @param leverage The target leverage, scaled by 1e18, which the opening fee taken off each
+        borrow leaves the loop just short of
+    @param ltv The share of each loop's collateral value to owe, opening fee included, scaled by
+        1e18, below 75%
+    @param min_collateral_out The least total collateral the loop may end up adding
+    @param deadline The timestamp after which the loop is no longer valid
+    @return The total collateral added for the caller
+    """
+    assert (block.timestamp < deadline)
+    loop_count: uint256 = self._loops(leverage, ltv)
+    assert loop_count <= MAX_LOOPS, "LoanRouter: Too many loops"
+
+    collateral: address = CogPair(pair).collateral()
+    asset: address = CogPair(pair).asset()
+    updated: bool = False  # Never used
+    exchange_rate: uint256 = 0
+    updated, exchange_rate = CogPair(pair).get_exchange_rate()
+    assert exchange_rate != 0, "LoanRouter: Zero exchange rate"
+    # The pair adds its opening fee to each borrow, so each borrow is sized for the debt to be
+    # `ltv` of the collateral it's backed by, which keeps every loop under the pair's limit
+    fee: uint256 = CogPair(pair).BORROW_OPENING_FEE()
+
+    ERC20(collateral).transferFrom(msg.sender, self, collateral_amount)
+
+    # Collateral value still to be borrowed to reach the target
+    remaining: uint256 = (
+        collateral_amount * (leverage - LEVERAGE_PRECISION) / LEVERAGE_PRECISION
     )
+    # Each swap has to return the same share of the value it swaps as the whole loop does
+    expected: uint256 = max(collateral_amount * leverage / LEVERAGE_PRECISION, 1)
+    added: uint256 = collateral_amount
+    total: uint256 = 0
+    for i in range(MAX_LOOPS + 1):
+        self._ensure_approval(pair, collateral, added)
+        CogPair(pair).add_collateral(msg.sender, added)
+        total += added
+        if i == loop_count:
+            break
+
+        borrow_value: uint256 = min(added * ltv / LEVERAGE_PRECISION, remaining)
+        remaining -= borrow_value
+        swap_value: uint256 = (
+            borrow_value * BORROW_OPENING_FEE_PRECISION / (BORROW_OPENING_FEE_PRECISION + fee)
+        )
+        borrowed: uint256 = swap_value * EXCHANGE_RATE_PRECISION / exchange_rate
+        # The borrow goes straight to the adapter, which sends the collateral back here
+        CogPair(pair).borrow(borrowed, msg.sender, adapter)
+        added = SwapAdapter(adapter).swap(
+            asset, collateral, borrowed, swap_value * min_collateral_out / expected, self
+        )
 
-    for index in range(5):
-        route: Hop = path[index]
-        if route.pair != empty(address):
-            collateral: address = CogPair(route.pair).collateral()
-            asset: address = CogPair(route.pair).asset()
-
-            ERC20(collateral).approve(route.pair, route.collateral_added)
-            CogPair(route.pair).add_collateral(
-                msg.sender, route.collateral_added
-            )
-            CogPair(route.pair).borrow(route.assets_to_borrow, msg.sender, self)
-        else:
-            final_asset: address = CogPair(path[index - 1].pair).asset()
-            ERC20(final_asset).transfer(
-                msg.sender, ERC20(final_asset).balanceOf(self)
-            )
-            return
-    final_asset: address = CogPair(path[4].pair).asset()
-    ERC20(final_asset).transfer(msg.sender, ERC20(final_asset).balanceOf(self))
+    assert total >= min_collateral_out, "LoanRouter: Slippage"
+    return total
@@ -0,0 +1,42 @@
+# @version 0.3.10
+
+# Stands in for a Bunni token, its Uniswap V3 pool and the Bunni lens at once
+
+struct BunniKey:
+    pool: address
+    tickLower: int24
+    tickUpper: int24
+
+token0: public(address)
+token1: public(address)
+tickLower: public(int24)
+tickUpper: public(int24)
+
+amount_0: public(uint256)
+amount_1: public(uint256)
+
+
+@external
+def __init__(_token0: address, _token1: address):
+    self.token0 = _token0
+    self.token1 = _token1
+    self.tickLower = -887220
+    self.tickUpper = 887220
+
+
+@view
+@external
+def pool() -> address:
+    return self
+
+
+@external
+def setAmounts(_amount_0: uint256, _amount_1: uint256):
+    self.amount_0 = _amount_0
+    self.amount_1 = _amount_1
+
+
+@view
+@external
+def pricePerFullShare(key: BunniKey) -> (uint128, uint256, uint256):
+    return (0, self.amount_0, self.amount_1)
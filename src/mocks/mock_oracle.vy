@@ -24,3 +24,9 @@ def setUpdated(_updated: bool):
 @external
 def get() -> (bool, uint256):
     return (self.updated, self.price)
+
+
+@view
+@external
+def peekSpot() -> uint256:
+    return self.price
@@ -0,0 +1,30 @@
+# @version 0.3.10
+
+from vyper.interfaces import ERC20
+
+# token_out paid per token_in, scaled by 1e18, out of the adapter's own balance
+price: public(uint256)
+
+
+@external
+def __init__():
+    self.price = 10**18
+
+
+@external
+def setPrice(_price: uint256):
+    self.price = _price
+
+
+@external
+def swap(
+    token_in: address,
+    token_out: address,
+    amount_in: uint256,
+    min_out: uint256,
+    receiver: address,
+) -> uint256:
+    amount_out: uint256 = amount_in * self.price / 10**18
+    assert amount_out >= min_out, "MockSwapAdapter: Slippage"
+    ERC20(token_out).transfer(receiver, amount_out)
+    return amount_out
@@ -33,13 +33,21 @@ struct BunniKey:
     tickLower: int24
     tickUpper: int24
 
-bunni_lens: public(IBunniLens)
-bunni_token: public(address)
-bunni_key: public(BunniKey)
-asset_0_oracle: public(IOracle)
-asset_1_oracle: public(IOracle)
-decimals_asset_0: public(uint256)
-decimals_asset_1: public(uint256)
+bunni_lens: public(immutable(IBunniLens))
+bunni_token: public(immutable(address))
+bunni_key: public(immutable(BunniKey))
+asset_0_oracle: public(immutable(IOracle))
+asset_1_oracle: public(immutable(IOracle))
+decimals_asset_0: public(immutable(uint256))
+decimals_asset_1: public(immutable(uint256))
+
+# 10 ** decimals of each asset, so a rate is scaled without an exponentiation
+SCALE_0: immutable(uint256)
+SCALE_1: immutable(uint256)
+
+# Last rate returned by get(), reused for the rest of its block
+last_rate: public(uint256)
+last_block: public(uint256)
 
 
 @external
@@ -48,13 +56,15 @@ def __init__(_bunni_lens: address, _bunni_token: address, _asset_0_oracle: addre
     tickLower: int24 = IBunniToken(_bunni_token).tickLower()
     tickUpper: int24 = IBunniToken(_bunni_token).tickUpper()
 
-    self.bunni_key = BunniKey({pool: pool, tickLower: tickLower, tickUpper: tickUpper})
-    self.bunni_lens = IBunniLens(_bunni_lens)
-    self.bunni_token = _bunni_token
-    self.asset_0_oracle = IOracle(_asset_0_oracle)
-    self.asset_1_oracle = IOracle(_asset_1_oracle)
-    self.decimals_asset_0 = convert(ERC20Detailed(pool.token0()).decimals(), uint256)
-    self.decimals_asset_1 = convert(ERC20Detailed(pool.token1()).decimals(), uint256)
+    bunni_key = BunniKey({pool: pool, tickLower: tickLower, tickUpper: tickUpper})
+    bunni_lens = IBunniLens(_bunni_lens)
+    bunni_token = _bunni_token
+    asset_0_oracle = IOracle(_asset_0_oracle)
+    asset_1_oracle = IOracle(_asset_1_oracle)
+    decimals_asset_0 = convert(ERC20Detailed(pool.token0()).decimals(), uint256)
+    decimals_asset_1 = convert(ERC20Detailed(pool.token1()).decimals(), uint256)
+    SCALE_0 = 10 ** decimals_asset_0
+    SCALE_1 = 10 ** decimals_asset_1
 
 @view
 @internal
@@ -63,22 +73,30 @@ def _get_final_rate(rate_0: uint256, rate_1: uint256) -> uint256:
     amount_0: uint256 = 0
     amount_1: uint256 = 0
 
-    (_, amount_0, amount_1) = self.bunni_lens.pricePerFullShare(self.bunni_key)
+    (_, amount_0, amount_1) = bunni_lens.pricePerFullShare(bunni_key)
 
-    return  (amount_0 * rate_0) / 10 ** self.decimals_asset_0 + (amount_1 * rate_1) / 10 ** self.decimals_asset_1
+    return  (amount_0 * rate_0) / SCALE_0 + (amount_1 * rate_1) / SCALE_1
 
 
 @external
 def get() -> (bool, uint256):
+    # A successful rate is kept for the rest of the block, so every pair reading it
+    # after the first one skips both asset oracles and the lens
+    if self.last_block == block.number:
+        return (True, self.last_rate)
+
     success_0: bool = False
     success_1: bool = False
     rate_0: uint256 = 0
     rate_1: uint256 = 0
 
-    (success_0, rate_0) = self.asset_0_oracle.get()
-    (success_1, rate_1) = self.asset_1_oracle.get()
+    (success_0, rate_0) = asset_0_oracle.get()
+    (success_1, rate_1) = asset_1_oracle.get()
 
     final_rate: uint256 = self._get_final_rate(rate_0, rate_1)
+    if success_0 and success_1:
+        self.last_rate = final_rate
+        self.last_block = block.number
     return (success_0 and success_1, final_rate)
 
 
@@ -90,8 +108,8 @@ def peek() -> (bool, uint256):
     rate_0: uint256 = 0
     rate_1: uint256 = 0
 
-    (success_0, rate_0) = self.asset_0_oracle.peek()
-    (success_1, rate_1) = self.asset_1_oracle.peek()
+    (success_0, rate_0) = asset_0_oracle.peek()
+    (success_1, rate_1) = asset_1_oracle.peek()
 
     final_rate: uint256 = self._get_final_rate(rate_0, rate_1)
     return (success_0 and success_1, final_rate)
@@ -103,8 +121,8 @@ def peekSpot() -> uint256:
     rate_0: uint256 = 0
     rate_1: uint256 = 0
 
-    rate_0 = self.asset_0_oracle.peekSpot()
-    rate_1 = self.asset_1_oracle.peekSpot()
+    rate_0 = asset_0_oracle.peekSpot()
+    rate_1 = asset_1_oracle.peekSpot()
 
     final_rate: uint256 = self._get_final_rate(rate_0, rate_1)
     return final_rate
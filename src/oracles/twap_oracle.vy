@@ -0,0 +1,135 @@
+# @version 0.3.10
+
+# Oracle Interface
+interface IOracle:
+    def get() -> (bool, uint256): nonpayable
+    def peek() -> (bool, uint256): view
+    def peekSpot() -> uint256: view
+    def symbol() -> String[1]: view
+    def name() -> String[1]: view
+
+implements: IOracle
+
+# Time weights an existing spot oracle, such as the PoolSharks or Ambient adapters, from a
+# fixed ring of its own observations. The first get() in a block returns the average of the
+# earlier blocks' readings, and only then takes a spot reading, so a price pushed within a
+# block can't move what that block is handed. Each reading is weighed by the time elapsed
+# since the previous one, capped at one period, and an observation is kept at most once per
+# period, so the average spans between CARDINALITY - 1 and CARDINALITY periods of history,
+# read from two observations whatever the pool's own sample count. A reading is never carried
+# forward, so a spot price pushed and unwound around a get() weighs in for at most one period
+# of that history, however long the oracle then idles.
+
+CARDINALITY: constant(uint256) = 16
+
+struct Observation:
+    timestamp: uint256
+    price_cumulative: uint256
+    # Sum of the readings' weights, which is the time elapsed unless a reading was capped
+    weight_cumulative: uint256
+
+source: public(immutable(IOracle))
+period: public(immutable(uint256))
+
+observations: public(Observation[CARDINALITY])
+# Slot of the newest kept observation, and how many slots have been written
+index: public(uint256)
+cardinality: public(uint256)
+
+# Cumulatives up to the last reading, and that reading, which stands in for the average until
+# one has any weight
+latest: public(Observation)
+price: public(uint256)
+# Average handed out for the block of the last reading, which doesn't include that reading
+block_twap: public(uint256)
+
+
+@external
+def __init__(_source: address, _period: uint256):
+    assert _period > 0, "TwapOracle: Zero period"
+    source = IOracle(_source)
+    period = _period
+
+    observation: Observation = Observation(
+        {timestamp: block.timestamp, price_cumulative: 0, weight_cumulative: 0}
+    )
+    self.observations[0] = observation
+    self.latest = observation
+    self.cardinality = 1
+    self.price = source.peekSpot()
+    self.block_twap = self.price
+
+
+@view
+@internal
+def _twap(latest: Observation, price: uint256, index: uint256, cardinality: uint256) -> uint256:
+    # Oldest kept observation, which is the next slot to be written once the ring is full
+    oldest: Observation = self.observations[0]
+    if cardinality == CARDINALITY:
+        oldest = self.observations[(index + 1) % CARDINALITY]
+
+    if latest.weight_cumulative == oldest.weight_cumulative:
+        return price
+
+    return (latest.price_cumulative - oldest.price_cumulative) / (
+        latest.weight_cumulative - oldest.weight_cumulative
+    )
+
+
+@external
+def get() -> (bool, uint256):
+    latest: Observation = self.latest
+
+    # Later calls in the block get the average taken before its reading
+    if block.timestamp == latest.timestamp:
+        return (True, self.block_twap)
+
+    index: uint256 = self.index
+    cardinality: uint256 = self.cardinality
+    twap: uint256 = self._twap(latest, self.price, index, cardinality)
+    self.block_twap = twap
+
+    price: uint256 = source.peekSpot()
+    weight: uint256 = min(block.timestamp - latest.timestamp, period)
+    latest.price_cumulative += price * weight
+    latest.weight_cumulative += weight
+    latest.timestamp = block.timestamp
+    self.latest = latest
+    self.price = price
+
+    if block.timestamp >= self.observations[index].timestamp + period:
+        index = (index + 1) % CARDINALITY
+        self.observations[index] = latest
+        self.index = index
+        if cardinality < CARDINALITY:
+            self.cardinality = cardinality + 1
+
+    return (True, twap)
+
+
+@view
+@external
+def peek() -> (bool, uint256):
+    # What get() would return, only get() takes a new reading
+    latest: Observation = self.latest
+    if block.timestamp == latest.timestamp:
+        return (True, self.block_twap)
+    return (True, self._twap(latest, self.price, self.index, self.cardinality))
+
+
+@view
+@external
+def peekSpot() -> uint256:
+    return source.peekSpot()
+
+
+@view
+@external
+def symbol() -> String[4]:
+    return "TWAP"
+
+
+@view
+@external
+def name() -> String[8]:
+    return "Cog TWAP"
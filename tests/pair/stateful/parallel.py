@@ -0,0 +1,122 @@
+"""
+Runs a hypothesis state machine across forked worker processes.
+
+The caller seeds the pool once, then every worker is forked from that process, so it starts from
+the same boa env without redeploying or re-seeding anything. Each worker runs its own slice of
+examples under its own hypothesis seed, and failures are merged back in the parent.
+"""
+import math
+import multiprocessing
+import os
+import queue
+import traceback
+
+from hypothesis import HealthCheck, seed as hypothesis_seed, settings as Settings
+from hypothesis.stateful import get_state_machine_test
+
+# How often the parent checks for workers that died without reporting, in seconds
+POLL_INTERVAL = 1
+
+
+def _run_slice(machine, settings, worker_seed):
+    test = hypothesis_seed(worker_seed)(
+        get_state_machine_test(machine, settings=settings)
+    )
+    try:
+        test()
+    except Exception as err:
+        message = str(err).strip()
+        return {
+            "seeds": [worker_seed],
+            "error": type(err).__name__,
+            "summary": message.splitlines()[0] if message else "",
+            "report": "".join(traceback.format_exception(err)),
+        }
+    return None
+
+
+def _worker(results, machine, settings, worker_seed):
+    failure = None
+    try:
+        failure = _run_slice(machine, settings, worker_seed)
+    finally:
+        results.put((worker_seed, failure))
+
+
+def _merge(failures):
+    """
+    @dev Collapses failures with the same error and message, keeping the first report
+    """
+    merged = {}
+    for failure in failures:
+        key = (failure["error"], failure["summary"])
+        if key in merged:
+            merged[key]["seeds"] += failure["seeds"]
+        else:
+            merged[key] = failure
+    return list(merged.values())
+
+
+def run_parallel(machine, *, workers=None, max_examples=25, stateful_step_count=30, seed=0):
+    """
+    @param machine The RuleBasedStateMachine to run, its fixtures must already be set up
+    @param workers Number of forked workers, defaults to one per core
+    @param max_examples Examples across all workers
+    @param stateful_step_count Steps per example
+    @param seed Base hypothesis seed, worker i runs with seed + i
+    @return A list of failures, each a dict of seeds, error, summary and the full report
+    """
+    workers = workers or os.cpu_count() or 1
+    settings = Settings(
+        max_examples=math.ceil(max_examples / workers),
+        stateful_step_count=stateful_step_count,
+        deadline=None,
+        # Workers would race on the example database, and replaying it would make them overlap
+        database=None,
+        suppress_health_check=list(HealthCheck),
+    )
+
+    if workers == 1 or "fork" not in multiprocessing.get_all_start_methods():
+        failure = _run_slice(machine, settings, seed)
+        return [] if failure is None else [failure]
+
+    ctx = multiprocessing.get_context("fork")
+    results = ctx.Queue()
+    processes = {
+        seed + i: ctx.Process(target=_worker, args=(results, machine, settings, seed + i))
+        for i in range(workers)
+    }
+    for process in processes.values():
+        process.start()
+
+    failures = []
+    pending = set(processes)
+    while pending:
+        try:
+            worker_seed, failure = results.get(timeout=POLL_INTERVAL)
+        except queue.Empty:
+            # Workers always report before exiting cleanly, so a non zero exit code is a crash
+            for worker_seed in [s for s in pending if processes[s].exitcode not in (None, 0)]:
+                pending.discard(worker_seed)
+                failures.append(
+                    {
+                        "seeds": [worker_seed],
+                        "error": "WorkerCrashed",
+                        "summary": f"exit code {processes[worker_seed].exitcode}",
+                        "report": "",
+                    }
+                )
+            continue
+        pending.discard(worker_seed)
+        if failure is not None:
+            failures.append(failure)
+
+    for process in processes.values():
+        process.join()
+    return _merge(failures)
+
+
+def format_failures(failures):
+    return "\n\n".join(
+        f"{f['error']}: {f['summary']} (seeds {f['seeds']})\n{f['report']}" for f in failures
+    )
@@ -8,8 +8,12 @@ from hypothesis.stateful import (
 )
 from hypothesis import settings
 import boa
+import os
+import pytest
 from enum import Enum
 
+from tests.pair.stateful.parallel import format_failures, run_parallel
+
 MINT_AMOUNT = 100*10**18
 BORROW = 1
 REPAY = 2
@@ -17,6 +21,12 @@ COLLATERALIZATION_RATE_PCT = 75  # 75%
 NUM_STEPS = 100_000
 COLLATERIZATION_RATE = 75000
 
+# Parallel fuzz, COG_FUZZ_WORKERS=0 uses one worker per core
+FUZZ_WORKERS = os.environ.get("COG_FUZZ_WORKERS")
+FUZZ_EXAMPLES = int(os.environ.get("COG_FUZZ_EXAMPLES", "25"))
+FUZZ_STEPS = int(os.environ.get("COG_FUZZ_STEPS", "30"))
+FUZZ_SEED = int(os.environ.get("COG_FUZZ_SEED", "0"))
+
 class Action(Enum):
     BORROW = 0
     REPAY = 1
@@ -220,24 +230,12 @@ class BigFuzz(RuleBasedStateMachine):
         if total_borrow_base == 0:
             return
 
-        (_, exchange_rate) = self.oracle.get()
+        # Health factors come straight from the pair, so the fuzz can't drift from its rounding
+        health_factors = self.cog_pair.health_factors(self.accounts[:10])
 
-        for i in range(10):
+        for i, health_factor in enumerate(health_factors):
             user = self.accounts[i]
-            share = self.cog_pair.user_collateral_share(user)
-            if share == 0:
-                continue
-            # Exchange Rate precision = 1e18, and collateralization_Rate_precision = 1e5
-            collateral_amt = share * (1000000000000000000 / 100000) * 75000
-
-            (total_borrow_elastic, total_borrow_base) = self.cog_pair.total_borrow()
-
-            borrow_part = 0
-            if total_borrow_elastic > 0: 
-                borrow_part = self.cog_pair.user_borrow_part(user)
-                borrow_part = ((borrow_part * total_borrow_elastic) * exchange_rate) / total_borrow_base
-            
-            if collateral_amt < borrow_part:
+            if health_factor < 10 ** 18:
                 liquidator = self.accounts[10]
                 with boa.env.prank(liquidator):
                     self.asset.mint(liquidator, 100 * 10 ** 18)
@@ -273,10 +271,7 @@ class BigFuzz(RuleBasedStateMachine):
         assert self.cog_pair.convertToShares(1 * 10 ** 18) <= 1 * 10 ** 18
 
 
-def test_state_machine_isolation(accounts, collateral, asset, oracle, cog_pair):
-    for k, v in locals().items():
-        setattr(BigFuzz, k, v)
-
+def seed_pool(accounts, collateral, asset, oracle, cog_pair):
     with boa.env.prank(accounts[0]):
         oracle.setPrice(10**18)
         oracle.setUpdated(True)
@@ -294,9 +289,33 @@ def test_state_machine_isolation(accounts, collateral, asset, oracle, cog_pair):
             cog_pair.add_collateral(account, MINT_AMOUNT)
 
 
+def test_state_machine_isolation(accounts, collateral, asset, oracle, cog_pair):
+    for k, v in locals().items():
+        setattr(BigFuzz, k, v)
+
+    seed_pool(accounts, collateral, asset, oracle, cog_pair)
+
     BigFuzz.TestCase.settings = settings(max_examples=25, stateful_step_count=30, deadline=None)
     run_state_machine_as_test(BigFuzz)
 
+
+@pytest.mark.skipif(FUZZ_WORKERS is None, reason="set COG_FUZZ_WORKERS to run the parallel fuzz")
+def test_state_machine_parallel(accounts, collateral, asset, oracle, cog_pair):
+    for k, v in locals().items():
+        setattr(BigFuzz, k, v)
+
+    # Seeded once here, every worker forks from this state
+    seed_pool(accounts, collateral, asset, oracle, cog_pair)
+
+    failures = run_parallel(
+        BigFuzz,
+        workers=int(FUZZ_WORKERS) or None,
+        max_examples=FUZZ_EXAMPLES,
+        stateful_step_count=FUZZ_STEPS,
+        seed=FUZZ_SEED,
+    )
+    assert not failures, format_failures(failures)
+
 def test_happy_path_works(accounts, collateral, asset, oracle, cog_pair):
     for k, v in locals().items():
         setattr(BigFuzz, k, v)
@@ -42,3 +42,37 @@ def test_fee_setting(cog_pair, asset, cog_factory, account):
 
     with boa.reverts():
         cog_factory.update_borrow_fee(cog_pair, 50001, sender=account)
+
+def test_batch_admin(cog_pair_blueprint, asset, collateral, oracle, account, accounts):
+    with boa.env.prank(account):
+        factory = boa.load('src/cog_factory.vy', cog_pair_blueprint, account)
+    pair = boa.load_partial('src/cog_pair.vy')
+    low = [pair.at(factory.deploy_low_risk_pair(asset, collateral, oracle, sender=account)) for _ in range(2)]
+    high = [pair.at(factory.deploy_high_risk_pair(asset, collateral, oracle, sender=account)) for _ in range(3)]
+    pairs = low + high
+    addresses = [p.address for p in pairs]
+
+    with boa.reverts():
+        factory.pause_many(addresses, sender=account)
+    factory.set_priv_user_status(account, True, sender=account)
+
+    factory.pause_many(addresses, sender=account)
+    assert all(p.paused() for p in pairs)
+    factory.unpause_many(addresses[1:], sender=account)
+    assert [p.paused() for p in pairs] == [True, False, False, False, False]
+
+    with boa.reverts("Ownable2Step: caller is not the owner"):
+        factory.update_borrow_fee_many(addresses, 100, sender=accounts[1])
+    factory.update_borrow_fee_many(addresses, 100, sender=account)
+    factory.update_default_protocol_fee_many(addresses[:2], 200000, sender=account)
+    assert [p.BORROW_OPENING_FEE() for p in pairs] == [100] * 5
+    assert [p.DEFAULT_PROTOCOL_FEE() for p in pairs] == [200000, 200000, 100000, 100000, 100000]
+
+    # By tier, over the whole registry or a window of it
+    assert factory.update_borrow_fee_by_tier(4, 300, sender=account) == 3
+    assert factory.update_default_protocol_fee_by_tier(4, 300000, 3, 2, sender=account) == 2
+    assert [p.BORROW_OPENING_FEE() for p in pairs] == [100, 100, 300, 300, 300]
+    assert [p.DEFAULT_PROTOCOL_FEE() for p in pairs] == [200000, 200000, 100000, 300000, 300000]
+
+    with boa.reverts("CogFactory: Batch too large"):
+        factory.update_borrow_fee_by_tier(4, 300, 0, 65, sender=account)
@@ -127,3 +127,35 @@ def test_cannot_borrow_more_than_allowed(cog_pair, collateral, accounts, asset,
     with boa.reverts():
         cog_pair.borrow(amount+1, accounts[0], account, sender=account)
 
+
+def test_exchange_rate_read_once_per_block(cog_pair, collateral, accounts, asset, oracle):
+    account = accounts[0]
+    oracle.setPrice(10**18, sender=account)
+    oracle.setUpdated(True, sender=account)
+
+    asset.mint(account, 1000 * 10**18, sender=account)
+    asset.approve(cog_pair, 1000 * 10**18, sender=account)
+    cog_pair.deposit(1000 * 10**18, account, sender=account)
+
+    borrower = accounts[1]
+    collateral.mint(borrower, 1000 * 10**18, sender=borrower)
+    collateral.approve(cog_pair, 1000 * 10**18, sender=borrower)
+    cog_pair.add_collateral(borrower, 1000 * 10**18, sender=borrower)
+
+    cog_pair.borrow(10**18, sender=borrower)
+    assert cog_pair.exchange_rate() == 10**18
+
+    # Later borrows in the same block reuse the rate read by the first one
+    oracle.setPrice(2 * 10**18, sender=account)
+    cog_pair.borrow(10**18, sender=borrower)
+    assert cog_pair.exchange_rate() == 10**18
+
+    # Next block, the oracle is read again
+    boa.env.time_travel(seconds=12)
+    cog_pair.borrow(10**18, sender=borrower)
+    assert cog_pair.exchange_rate() == 2 * 10**18
+
+    # get_exchange_rate always reads the oracle
+    oracle.setPrice(3 * 10**18, sender=account)
+    assert cog_pair.get_exchange_rate() == (True, 3 * 10**18)
+    assert cog_pair.exchange_rate() == 3 * 10**18
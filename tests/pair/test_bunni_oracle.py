@@ -0,0 +1,36 @@
+import boa
+
+from boa_compat import evm_state
+
+
+def test_bunni_oracle_caches_get_per_block(account):
+    with boa.env.prank(account):
+        usdc = boa.load('src/mocks/mock_erc20.vy', "USD Coin", "USDC", 6)
+        weth = boa.load('src/mocks/mock_erc20.vy', "Wrapped Ether", "WETH", 18)
+        bunni = boa.load('src/mocks/mock_bunni.vy', usdc, weth)
+        usdc_oracle = boa.load('src/mocks/mock_oracle.vy')
+        weth_oracle = boa.load('src/mocks/mock_oracle.vy')
+        oracle = boa.load('src/oracles/bunni_oracle.vy', bunni, bunni, usdc_oracle, weth_oracle)
+
+    assert oracle.bunni_key() == (bunni.address, -887220, 887220)
+    assert (oracle.decimals_asset_0(), oracle.decimals_asset_1()) == (6, 18)
+
+    # One share is worth 2000 USDC and 1 WETH, priced at 1 and 2000
+    bunni.setAmounts(2000 * 10**6, 10**18, sender=account)
+    usdc_oracle.setPrice(10**18, sender=account)
+    weth_oracle.setPrice(2000 * 10**18, sender=account)
+    boa.env.time_travel(seconds=12)
+
+    # A failed read is not cached
+    assert oracle.get() == (False, 4000 * 10**18)
+    usdc_oracle.setUpdated(True, sender=account)
+    weth_oracle.setUpdated(True, sender=account)
+    assert oracle.get() == (True, 4000 * 10**18)
+
+    # The rest of the block gets the same rate, even if the pool moves
+    bunni.setAmounts(1000 * 10**6, 2 * 10**18, sender=account)
+    assert oracle.get() == (True, 4000 * 10**18)
+
+    boa.env.time_travel(seconds=12)
+    assert oracle.get() == (True, 5000 * 10**18)
+    assert oracle.last_block() == evm_state().block_number
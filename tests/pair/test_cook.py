@@ -0,0 +1,94 @@
+import boa
+
+ADD_COLLATERAL = 1
+REMOVE_COLLATERAL = 2
+BORROW = 3
+REPAY = 4
+
+
+# A helper rather than a fixture, since boa only isolates state changes made in the test itself
+def fund(cog_pair, accounts, oracle, asset, collateral):
+    oracle.setPrice(10**18, sender=accounts[0])
+    oracle.setUpdated(True, sender=accounts[0])
+    cog_pair.get_exchange_rate()
+
+    lender = accounts[1]
+    asset.mint(lender, 1000 * 10**18, sender=lender)
+    asset.approve(cog_pair, 1000 * 10**18, sender=lender)
+    cog_pair.deposit(1000 * 10**18, lender, sender=lender)
+
+    user = accounts[2]
+    collateral.mint(user, 1000 * 10**18, sender=user)
+    collateral.approve(cog_pair, 2**256 - 1, sender=user)
+    asset.approve(cog_pair, 2**256 - 1, sender=user)
+    return user
+
+
+def test_cook_matches_separate_calls(cog_pair, cog_high_pair, accounts, oracle, asset, collateral):
+    user = fund(cog_pair, accounts, oracle, asset, collateral)
+    # The same session through single calls on a second pair
+    lender = accounts[1]
+    asset.mint(lender, 1000 * 10**18, sender=lender)
+    asset.approve(cog_high_pair, 1000 * 10**18, sender=lender)
+    cog_high_pair.deposit(1000 * 10**18, lender, sender=lender)
+    cog_high_pair.get_exchange_rate()
+    other = accounts[3]
+    collateral.mint(other, 1000 * 10**18, sender=other)
+    collateral.approve(cog_high_pair, 2**256 - 1, sender=other)
+
+    cog_pair.cook([(ADD_COLLATERAL, 200 * 10**18), (BORROW, 100 * 10**18), (REMOVE_COLLATERAL, 50 * 10**18)], sender=user)
+    cog_high_pair.add_collateral(other, 200 * 10**18, sender=other)
+    cog_high_pair.borrow(100 * 10**18, sender=other)
+    cog_high_pair.remove_collateral(other, 50 * 10**18, sender=other)
+
+    assert cog_pair.user_collateral_share(user) == cog_high_pair.user_collateral_share(other) == 150 * 10**18
+    assert cog_pair.user_borrow_part(user) == cog_high_pair.user_borrow_part(other)
+    assert cog_pair.total_borrow() == cog_high_pair.total_borrow()
+    assert collateral.balanceOf(user) == collateral.balanceOf(other) == 850 * 10**18
+    assert asset.balanceOf(user) == 100 * 10**18
+
+
+def test_cook_nets_transfers(cog_pair, accounts, oracle, asset, collateral):
+    user = fund(cog_pair, accounts, oracle, asset, collateral)
+    cog_pair.cook([(ADD_COLLATERAL, 300 * 10**18), (BORROW, 100 * 10**18)], sender=user)
+
+    # Collateral in and out, and a new borrow alongside repaying the old one, settle only the net
+    part = cog_pair.user_borrow_part(user)
+    collateral_before = collateral.balanceOf(user)
+    asset_before = asset.balanceOf(user)
+    cog_pair.cook(
+        [(ADD_COLLATERAL, 40 * 10**18), (REMOVE_COLLATERAL, 100 * 10**18), (BORROW, 10 * 10**18), (REPAY, part)],
+        sender=user,
+    )
+
+    logs = cog_pair.get_logs()
+    (repaid,) = [log.args[0] for log in logs if log.event_type.name == "Repay"]
+    token_transfers = [log.address for log in logs if log.event_type.name == "Transfer"]
+    assert sorted(token_transfers) == sorted([asset.address, collateral.address])
+
+    assert collateral.balanceOf(user) == collateral_before + 60 * 10**18
+    assert asset.balanceOf(user) == asset_before - (repaid - 10 * 10**18)
+    assert cog_pair.user_collateral_share(user) == 240 * 10**18
+    assert 0 < cog_pair.user_borrow_part(user) < part
+
+
+def test_cook_checks_solvency_once(cog_pair, accounts, oracle, asset, collateral):
+    user = fund(cog_pair, accounts, oracle, asset, collateral)
+
+    # Borrowing first is fine as long as the collateral is there by the end of the batch
+    cog_pair.cook([(BORROW, 100 * 10**18), (ADD_COLLATERAL, 200 * 10**18)], sender=user)
+
+    with boa.reverts("Insufficient Collateral"):
+        cog_pair.cook([(REMOVE_COLLATERAL, 100 * 10**18)], sender=user)
+
+    # An underwater position can still be topped up and repaid without a solvency check
+    oracle.setPrice(2 * 10**18, sender=accounts[0])
+    cog_pair.get_exchange_rate()
+    assert not cog_pair.is_solvent(user)
+    cog_pair.cook([(ADD_COLLATERAL, 10 * 10**18), (REPAY, 10**18)], sender=user)
+
+
+def test_cook_rejects_unknown_action(cog_pair, accounts, oracle, asset, collateral):
+    user = fund(cog_pair, accounts, oracle, asset, collateral)
+    with boa.reverts("CogPair: Unknown action"):
+        cog_pair.cook([(ADD_COLLATERAL, 10**18), (5, 10**18)], sender=user)
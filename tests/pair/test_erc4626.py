@@ -76,6 +76,42 @@ def test_totalAssets(cog_pair, oracle, accounts, collateral, asset):
     assert cog_pair.totalAssets() > 500000000000000000
 
 
+def test_views_include_pending_interest(cog_pair, oracle, accounts, collateral, asset):
+    """
+    Invariants Tested
+    -----------------
+    totalAssets, convertToAssets and convertToShares match their values after an accrue, without one
+    previewDeposit and previewMint keep the stored share price, which deposit and mint use
+    """
+    account = accounts[0]
+    oracle.setPrice(10 ** 18, sender=account)
+    oracle.setUpdated(True, sender=account)
+    cog_pair.get_exchange_rate(sender=account)
+
+    AMOUNT = 10 ** 24
+    asset.mint(account, AMOUNT, sender=account)
+    asset.approve(cog_pair, AMOUNT, sender=account)
+    cog_pair.deposit(AMOUNT, account, sender=account)
+
+    borrower = accounts[1]
+    collateral.mint(borrower, AMOUNT * 100, sender=borrower)
+    collateral.approve(cog_pair, AMOUNT * 100, sender=borrower)
+    cog_pair.add_collateral(borrower, AMOUNT * 100, sender=borrower)
+    cog_pair.borrow(AMOUNT // 2, sender=borrower)
+
+    boa.env.time_travel(86400 * 30)
+    stored_total_assets = cog_pair.total_asset()[0] + cog_pair.total_borrow()[0]
+    stored_shares = cog_pair.previewDeposit(AMOUNT)
+
+    pending = (cog_pair.totalAssets(), cog_pair.convertToAssets(AMOUNT), cog_pair.convertToShares(AMOUNT))
+    assert pending[0] > stored_total_assets
+    assert pending[2] < stored_shares
+
+    cog_pair.accrue()
+    assert pending == (cog_pair.totalAssets(), cog_pair.convertToAssets(AMOUNT), cog_pair.convertToShares(AMOUNT))
+    assert cog_pair.previewDeposit(AMOUNT) == cog_pair.convertToShares(AMOUNT)
+
+
 @given(
     amount=st.integers(min_value=100000, max_value=2**124-1),
 )
@@ -591,8 +627,55 @@ def test_previewRedeem(cog_pair, accounts, asset, collateral, oracle, amount):
 
     account = accounts[0]
 
-    assert cog_pair.previewRedeem(AMOUNT) == cog_pair.convertToShares(asset.balanceOf(cog_pair))
+    # Capped at the idle assets left in the pool, which are all the pool holds
+    assert cog_pair.previewRedeem(AMOUNT) == asset.balanceOf(cog_pair)
+
+
+def test_previews_project_interest(cog_pair, accounts, asset, collateral, oracle):
+    """
+    Invariants Tested
+    -----------------
+    previewWithdraw, previewRedeem, maxWithdraw and maxRedeem include interest pending since the last accrual
+    previewWithdraw and previewRedeem match withdraw and redeem in the same block
+    """
+    account = accounts[0]
+    oracle.setPrice(10 ** 18, sender=account)
+    oracle.setUpdated(True, sender=account)
+    cog_pair.get_exchange_rate(sender=account)
+
+    AMOUNT = 10 ** 24
+    asset.mint(account, AMOUNT, sender=account)
+    asset.approve(cog_pair, AMOUNT, sender=account)
+    cog_pair.deposit(AMOUNT, account, sender=account)
 
+    borrower = accounts[1]
+    collateral.mint(borrower, AMOUNT * 100, sender=borrower)
+    collateral.approve(cog_pair, AMOUNT * 100, sender=borrower)
+    cog_pair.add_collateral(borrower, AMOUNT * 100, sender=borrower)
+    cog_pair.borrow(AMOUNT // 2, sender=borrower)
+
+    boa.env.time_travel(86400 * 30)
+    shares = cog_pair.balanceOf(account) // 4
+
+    # Stored state still prices shares as of the last accrual
+    total_asset, total_borrow = cog_pair.total_asset(), cog_pair.total_borrow()
+    assert cog_pair.previewRedeem(shares) > shares * (total_asset[0] + total_borrow[0]) // total_asset[1]
+    assert cog_pair.maxWithdraw(account) == asset.balanceOf(cog_pair)
+
+    preview_redeem = cog_pair.previewRedeem(shares)
+    assert cog_pair.redeem(shares, sender=account) == preview_redeem
+
+    boa.env.time_travel(86400 * 30)
+    assets = asset.balanceOf(cog_pair) // 4
+    preview_withdraw = cog_pair.previewWithdraw(assets)
+    total_asset, total_borrow = cog_pair.total_asset(), cog_pair.total_borrow()
+    assert preview_withdraw < assets * total_asset[1] // (total_asset[0] + total_borrow[0])
+    assert cog_pair.withdraw(assets, sender=account) == preview_withdraw
+
+    # Capped at the idle assets, so a withdrawal above them previews the same shares as all of them
+    idle = asset.balanceOf(cog_pair)
+    assert cog_pair.previewWithdraw(idle * 2) == cog_pair.previewWithdraw(idle)
+    assert cog_pair.maxRedeem(account) == cog_pair.previewWithdraw(idle)
 
 
 @given(
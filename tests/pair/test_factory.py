@@ -1,11 +1,14 @@
 import boa
 import pytest
+from eth_utils import to_canonical_address
 from hypothesis import (
     given,
     settings,
     strategies as st,
 )
 
+from boa_compat import evm_state
+
 def test_admin_controls(cog_factory, accounts, account):
     assert cog_factory.owner() == account
 
@@ -45,3 +48,167 @@ def test_deploy_pairs(cog_factory, cog_pair_blueprint, account, asset, collatera
     cog_factory.deploy_custom_risk_pair(
         asset, collateral, oracle, cog_pair_blueprint, 3, 600000000000000000, 800000000000000000, 1585489600, 634195840, 317097920000, 28800000000000000000000000000000000000000, sender=account
     )
+
+def test_pair_fits_the_code_size_limit(cog_pair):
+    # EIP-170 rejects deployments with more than 24576 bytes of runtime code, which would make the
+    # blueprint unusable
+    code = evm_state().get_code(to_canonical_address(cog_pair.address))
+    assert 0 < len(code) <= 24576
+
+def test_pair_registry(cog_pair_blueprint, account, accounts, asset, collateral, oracle):
+    # A fresh factory, so the registry only holds the pairs deployed here
+    with boa.env.prank(account):
+        factory = boa.load('src/cog_factory.vy', cog_pair_blueprint, account)
+
+    stable = factory.deploy_stable_risk_pair(asset, collateral, oracle, sender=account)
+    medium = factory.deploy_medium_risk_pair(asset, collateral, oracle, sender=account)
+    flipped = factory.deploy_medium_risk_pair(collateral, asset, oracle, sender=account)
+    custom = factory.deploy_custom_risk_pair(
+        asset, collateral, oracle, cog_pair_blueprint, 3, 600000000000000000, 800000000000000000, 1585489600, 634195840, 317097920000, 28800000000000000000000000000000000000000, sender=account
+    )
+    pairs = [stable, medium, flipped, custom]
+
+    assert factory.pair_count() == 4
+    assert [factory.all_pairs(i) for i in range(4)] == pairs
+    assert factory.get_pair(asset, collateral, 1) == stable
+    assert factory.get_pair(asset, collateral, 3) == medium
+    assert factory.get_pair(collateral, asset, 3) == flipped
+    assert factory.get_pair(asset, collateral, 5) == custom
+    assert factory.get_pair(asset, collateral, 4) == "0x0000000000000000000000000000000000000000"
+    assert [factory.pair_tier(p) for p in pairs] == [1, 3, 3, 5]
+    assert factory.pair_tier(accounts[3]) == 0
+
+    # Give one pair some state to read back
+    oracle.setPrice(2 * 10**18, sender=account)
+    oracle.setUpdated(True, sender=account)
+    pair = boa.load_partial('src/cog_pair.vy').at(medium)
+    pair.get_exchange_rate()
+    asset.mint(account, 10**20, sender=account)
+    asset.approve(pair, 10**20, sender=account)
+    pair.deposit(10**20, sender=account)
+
+    # Pages stop at the end of the registry
+    first = factory.get_pairs(0, 3)
+    rest = factory.get_pairs(3, 3)
+    assert [s[0] for s in first + rest] == pairs
+    assert factory.get_pairs(4, 3) == []
+    assert first[1] == (medium, 3, pair.total_asset(), pair.total_borrow(), pair.accrue_info(), 2 * 10**18)
+
+
+def test_registry_is_not_squatted(cog_pair_blueprint, account, accounts, asset, collateral, oracle):
+    with boa.env.prank(account):
+        factory = boa.load('src/cog_factory.vy', cog_pair_blueprint, account)
+        other_blueprint = boa.load_partial('src/cog_pair.vy').deploy_as_blueprint()
+    params = (600000000000000000, 800000000000000000, 1585489600, 634195840, 317097920000, 28800000000000000000000000000000000000000)
+
+    canonical = factory.deploy_stable_risk_pair(asset, collateral, oracle, sender=account)
+
+    # Anyone can deploy, with any oracle, but only into the listing
+    squatter = factory.deploy_stable_risk_pair(asset, collateral, accounts[3], sender=accounts[3])
+    custom = factory.deploy_custom_risk_pair(asset, collateral, oracle, cog_pair_blueprint, 3, *params, sender=accounts[3])
+    assert factory.get_pair(asset, collateral, 1) == canonical
+    assert factory.get_pair(asset, collateral, 5) == "0x0000000000000000000000000000000000000000"
+    assert [factory.pair_tier(p) for p in [squatter, custom]] == [1, 5]
+
+    # A registered custom pair has to pass the same rate curve checks as a tier, a zero elasticity
+    # would make its accrual divide by zero
+    broken = params[:5] + (0,)
+    with boa.reverts("CogFactory: Invalid tier"):
+        factory.deploy_custom_risk_pair(asset, collateral, oracle, cog_pair_blueprint, 3, *broken, sender=accounts[3])
+
+    # Pairs from any other blueprint are deployed but never registered
+    foreign = factory.deploy_custom_risk_pair(asset, collateral, oracle, other_blueprint, 3, *params, sender=accounts[3])
+    assert factory.pair_tier(foreign) == 0
+    unchecked = factory.deploy_custom_risk_pair(asset, collateral, oracle, other_blueprint, 3, *broken, sender=accounts[3])
+    assert factory.pair_tier(unchecked) == 0
+    assert factory.pair_count() == 3
+
+    # The owner picks the canonical pair among the registered ones
+    with boa.reverts("Ownable2Step: caller is not the owner"):
+        factory.set_pair(asset, collateral, 5, custom, sender=accounts[3])
+    with boa.reverts("CogFactory: Unknown pair"):
+        factory.set_pair(asset, collateral, 5, foreign, sender=account)
+    with boa.reverts("CogFactory: Wrong market"):
+        factory.set_pair(collateral, asset, 5, custom, sender=account)
+    factory.set_pair(asset, collateral, 5, custom, sender=account)
+    assert factory.get_pair(asset, collateral, 5) == custom
+
+
+def runtime_code(contract):
+    return evm_state().get_code(bytes.fromhex(contract.address[2:]))
+
+
+def test_deploy_pair_by_tier(cog_pair_blueprint, account, asset, collateral, oracle):
+    with boa.env.prank(account):
+        factory = boa.load('src/cog_factory.vy', cog_pair_blueprint, account)
+
+    one_percent = 317097920
+    assert factory.tiers(1) == (15 * 10**16, 35 * 10**16, 5 * one_percent, 2 * one_percent, 25 * one_percent, 288 * 10**38)
+    assert factory.tiers(4) == (30 * 10**16, 50 * 10**16, 12 * one_percent, 5 * one_percent, 1000 * one_percent, 2 * 10**40)
+    assert factory.tiers(5) == (0, 0, 0, 0, 0, 0)
+
+    events = ["StablePairCreated", "LowPairCreated", "MediumPairCreated", "HighPairCreated"]
+
+    # The generic entry point and the named one deploy the same pair
+    for tier, deploy in enumerate([
+        factory.deploy_stable_risk_pair,
+        factory.deploy_low_risk_pair,
+        factory.deploy_medium_risk_pair,
+        factory.deploy_high_risk_pair,
+    ], start=1):
+        named = boa.load_partial('src/cog_pair.vy').at(deploy(asset, collateral, oracle, sender=account))
+        generic = boa.load_partial('src/cog_pair.vy').at(factory.deploy_pair(asset, collateral, oracle, tier, sender=account))
+        assert factory.get_logs()[-1].event_type.name == events[tier - 1]
+        assert factory.pair_tier(generic) == tier
+        # The owner's deployments are canonical, so the latest one takes the entry
+        assert factory.get_pair(asset, collateral, tier) == generic.address
+        # Immutables live in the runtime code, so equal code means equal tokens, oracle and rate curve
+        assert runtime_code(generic) == runtime_code(named)
+
+    for tier in [0, 5]:
+        with boa.reverts("CogFactory: Unknown tier"):
+            factory.deploy_pair(asset, collateral, oracle, tier, sender=account)
+
+
+
+def test_set_tier(cog_pair_blueprint, account, accounts, asset, collateral, oracle):
+    with boa.env.prank(account):
+        factory = boa.load('src/cog_factory.vy', cog_pair_blueprint, account)
+
+    one_percent = 317097920
+    params = (10 * 10**16, 20 * 10**16, 3 * one_percent, one_percent, 50 * one_percent, 288 * 10**38)
+
+    with boa.reverts("Ownable2Step: caller is not the owner"):
+        factory.set_tier(6, *params, sender=accounts[3])
+    for tier in [0, 5]:
+        with boa.reverts("CogFactory: Unknown tier"):
+            factory.set_tier(tier, *params, sender=account)
+    for invalid in [
+        (30 * 10**16, 20 * 10**16) + params[2:],
+        (0, 0) + params[2:],
+        (0, 10**18 + 1) + params[2:],
+        params[:2] + (60 * one_percent,) + params[3:],
+        params[:4] + (0, 0),
+    ]:
+        with boa.reverts("CogFactory: Invalid tier"):
+            factory.set_tier(6, *invalid, sender=account)
+
+    # A tier is only deployable once configured
+    with boa.reverts("CogFactory: Unknown tier"):
+        factory.deploy_pair(asset, collateral, oracle, 6, sender=account)
+
+    factory.set_tier(6, *params, sender=account)
+    assert factory.tiers(6) == params
+    pair = factory.deploy_pair(asset, collateral, oracle, 6, sender=account)
+    log = factory.get_logs()[-1]
+    assert log.event_type.name == "TierPairCreated"
+    assert log.topics == [6, pair]
+    assert factory.pair_tier(pair) == 6
+    assert factory.get_pair(asset, collateral, 6) == pair
+
+    # Pairs keep the curve they were deployed with when the standard tiers are retuned
+    stable = boa.load_partial('src/cog_pair.vy').at(factory.deploy_stable_risk_pair(asset, collateral, oracle, sender=account))
+    factory.set_tier(1, *params, sender=account)
+    retuned = boa.load_partial('src/cog_pair.vy').at(factory.deploy_pair(asset, collateral, oracle, 1, sender=account))
+    assert factory.get_logs()[-1].event_type.name == "StablePairCreated"
+    assert runtime_code(retuned) != runtime_code(stable)
@@ -6,6 +6,8 @@ from hypothesis import (
     strategies as st,
 )
 
+from boa_compat import evm_state
+
 def test_borrow_fee_accumulates(accounts, collateral, asset, oracle, cog_pair):
     account = accounts[0]
     oracle.setPrice(10 ** 18, sender=account)
@@ -44,7 +46,7 @@ def test_borrow_fee_accumulates(accounts, collateral, asset, oracle, cog_pair):
     interest_accrued = (
         elastic
         * interest_per_second
-        * (boa.env.vm.state.timestamp - last_accrued)
+        * (evm_state().timestamp - last_accrued)
         / 1000000000000000000
     )
 
@@ -148,7 +150,7 @@ def test_roll_over_pol(accounts, collateral, asset, oracle, cog_pair):
     interest_accrued = (
         elastic
         * interest_per_second
-        * (boa.env.vm.state.timestamp - last_accrued)
+        * (evm_state().timestamp - last_accrued)
         / 1000000000000000000
     )
 
@@ -167,3 +169,180 @@ def test_roll_over_pol(accounts, collateral, asset, oracle, cog_pair):
     (_, _, fees_earned_fraction) = cog_pair.accrue_info()
 
     assert fees_earned_fraction == 0
+
+def test_harvest_pol(accounts, account, collateral, asset, oracle, cog_pair_blueprint):
+    with boa.env.prank(account):
+        factory = boa.load('src/cog_factory.vy', cog_pair_blueprint, accounts[4])
+    pair = boa.load_partial('src/cog_pair.vy')
+    pairs = [
+        pair.at(factory.deploy_medium_risk_pair(asset, collateral, oracle, sender=account)),
+        pair.at(factory.deploy_high_risk_pair(asset, collateral, oracle, sender=account)),
+    ]
+    oracle.setPrice(10 ** 18, sender=account)
+    oracle.setUpdated(True, sender=account)
+
+    AMOUNT = 10 * 10 ** 18
+    lender, borrower = accounts[1], accounts[2]
+    for p in pairs:
+        p.get_exchange_rate()
+        asset.mint(lender, AMOUNT, sender=lender)
+        asset.approve(p, AMOUNT, sender=lender)
+        p.deposit(AMOUNT, sender=lender)
+        collateral.mint(borrower, AMOUNT, sender=borrower)
+        collateral.approve(p, AMOUNT, sender=borrower)
+        p.add_collateral(borrower, AMOUNT, sender=borrower)
+        p.borrow(AMOUNT // 2, sender=borrower)
+
+    boa.env.time_travel(86400 * 7)
+    for p in pairs:
+        p.accrue()
+    fees = [p.accrue_info()[2] for p in pairs]
+    assert all(fees)
+
+    with boa.reverts():
+        pairs[0].roll_over_pol_to(accounts[5], sender=accounts[5])
+    with boa.reverts("CogFactory: Unknown pair"):
+        factory.harvest_pol([pairs[0].address, accounts[5]])
+
+    # Anyone can harvest, and fees always go to fee_to
+    assert factory.harvest_all_pol(sender=accounts[5]) == sum(fees)
+    assert [p.balanceOf(accounts[4]) for p in pairs] == fees
+    assert [p.accrue_info()[2] for p in pairs] == [0, 0]
+    assert factory.harvest_pol([p.address for p in pairs]) == 0
+
+
+def test_accrue_many(accounts, account, collateral, asset, oracle, cog_pair_blueprint):
+    with boa.env.prank(account):
+        factory = boa.load('src/cog_factory.vy', cog_pair_blueprint, account)
+    pair = boa.load_partial('src/cog_pair.vy')
+    busy, idle = [pair.at(factory.deploy_medium_risk_pair(asset, collateral, oracle, sender=account)) for _ in range(2)]
+    oracle.setPrice(5 * 10 ** 18, sender=account)
+    oracle.setUpdated(True, sender=account)
+
+    # Only one pair is borrowed from, and below its target utilization
+    AMOUNT = 10 * 10 ** 18
+    lender, borrower = accounts[1], accounts[2]
+    busy.get_exchange_rate()
+    asset.mint(lender, AMOUNT, sender=lender)
+    asset.approve(busy, AMOUNT, sender=lender)
+    busy.deposit(AMOUNT, sender=lender)
+    collateral.mint(borrower, AMOUNT * 100, sender=borrower)
+    collateral.approve(busy, AMOUNT * 100, sender=borrower)
+    busy.add_collateral(borrower, AMOUNT * 100, sender=borrower)
+    busy.borrow(AMOUNT // 10, sender=borrower)
+    # A fresh pair's first borrow trips the breaker, since its last rate is still zero
+    assert busy.protocol_fee() == 1000000
+
+    with boa.reverts("CogFactory: Unknown pair"):
+        factory.accrue_many([busy.address, accounts[5]], 0)
+
+    boa.env.time_travel(86400 * 25)
+    # The falling rate ends the surge, the idle pair has no borrows to accrue
+    assert factory.accrue_all(3600, sender=accounts[5]) == [busy.address]
+    assert busy.protocol_fee() == 100000
+    assert idle.protocol_fee() == 100000
+    accrued = [busy.accrue_info()[1], idle.accrue_info()[1]]
+    assert accrued == [evm_state().timestamp] * 2
+
+    # Recently accrued pairs are skipped
+    boa.env.time_travel(1800)
+    assert factory.accrue_many([busy.address, idle.address], 3600) == []
+    assert [busy.accrue_info()[1], idle.accrue_info()[1]] == accrued
+
+    # A new default fee is picked up on the next accrual, which changes the fee
+    factory.update_default_protocol_fee(busy, 50000, sender=account)
+    boa.env.time_travel(3600)
+    assert factory.accrue_many([busy.address, idle.address], 3600) == [busy.address]
+    assert busy.protocol_fee() == 50000
+
+    # With a 100% default the fee never moves, surges are still reported as they trip
+    factory.update_default_protocol_fee(busy, 1000000, sender=account)
+    busy.borrow(AMOUNT * 8 // 10, sender=borrower)
+    boa.env.time_travel(86400 * 5)
+    assert factory.accrue_many([busy.address], 3600) == [busy.address]
+    assert busy.surge_info()[1] == evm_state().timestamp
+
+    asset.approve(busy, AMOUNT, sender=borrower)
+    busy.repay(borrower, busy.user_borrow_part(borrower) * 8 // 10, sender=borrower)
+    boa.env.time_travel(86400)
+    assert factory.accrue_many([busy.address], 3600) == []
+    boa.env.time_travel(86400 * 3)
+    assert factory.accrue_many([busy.address], 3600) == []
+    assert busy.protocol_fee() == 1000000
+
+
+def test_accrue_many_follows_the_surge_reset(accounts, account, collateral, asset, oracle, cog_pair_blueprint):
+    with boa.env.prank(account):
+        factory = boa.load('src/cog_factory.vy', cog_pair_blueprint, account)
+    pair = boa.load_partial('src/cog_pair.vy')
+    busy = pair.at(factory.deploy_medium_risk_pair(asset, collateral, oracle, sender=account))
+    oracle.setPrice(5 * 10 ** 18, sender=account)
+    oracle.setUpdated(True, sender=account)
+
+    AMOUNT = 10 * 10 ** 18
+    lender, borrower = accounts[1], accounts[2]
+    busy.get_exchange_rate()
+    asset.mint(lender, AMOUNT, sender=lender)
+    asset.approve(busy, AMOUNT, sender=lender)
+    busy.deposit(AMOUNT, sender=lender)
+    collateral.mint(borrower, AMOUNT * 100, sender=borrower)
+    collateral.approve(busy, AMOUNT * 100, sender=borrower)
+    busy.add_collateral(borrower, AMOUNT * 100, sender=borrower)
+    # Just over the 60% target, so the rate rises, but by less than the surge threshold
+    busy.borrow(AMOUNT * 65 // 100, sender=borrower)
+    assert busy.protocol_fee() == 1000000
+    last_rate = busy.surge_info()[0]
+
+    # Past the surge window a rising rate keeps the fee at 100%, so the surge isn't over yet
+    boa.env.time_travel(86400 * 3 + 1)
+    assert factory.accrue_many([busy.address], 3600) == []
+    assert busy.protocol_fee() == 1000000
+    assert last_rate < busy.accrue_info()[0] < last_rate + 1635979200
+
+    # Once the rate falls back the fee resets, and that accrual reports it
+    asset.approve(busy, AMOUNT, sender=borrower)
+    busy.repay(borrower, busy.user_borrow_part(borrower) // 2, sender=borrower)
+    boa.env.time_travel(86400 * 2)
+    assert factory.accrue_many([busy.address], 3600) == [busy.address]
+    assert busy.protocol_fee() == 100000
+    boa.env.time_travel(86400)
+    assert factory.accrue_many([busy.address], 3600) == []
+
+
+def test_accrue_all_skips_a_pair_that_reverts(accounts, account, collateral, asset, oracle, cog_pair_blueprint):
+    with boa.env.prank(account):
+        factory = boa.load('src/cog_factory.vy', cog_pair_blueprint, account)
+    pair = boa.load_partial('src/cog_pair.vy')
+    oracle.setPrice(10 ** 18, sender=account)
+    oracle.setUpdated(True, sender=account)
+
+    # Anyone can register a custom pair, this one charges the highest rate a pair can hold, so
+    # its interest overflows and its accrual reverts within a day
+    rate = 2 ** 64 - 1
+    broken = pair.at(factory.deploy_custom_risk_pair(
+        asset, collateral, oracle, cog_pair_blueprint, 3, 5 * 10 ** 17, 6 * 10 ** 17, rate, rate, rate, 288 * 10 ** 38, sender=accounts[3]
+    ))
+    healthy = pair.at(factory.deploy_medium_risk_pair(asset, collateral, oracle, sender=account))
+
+    AMOUNT = 10 ** 18
+    lender, borrower = accounts[1], accounts[2]
+    for p in [broken, healthy]:
+        p.get_exchange_rate()
+        asset.mint(lender, AMOUNT, sender=lender)
+        asset.approve(p, AMOUNT, sender=lender)
+        p.deposit(AMOUNT, sender=lender)
+        collateral.mint(borrower, AMOUNT * 100, sender=borrower)
+        collateral.approve(p, AMOUNT * 100, sender=borrower)
+        p.add_collateral(borrower, AMOUNT * 100, sender=borrower)
+        p.borrow(AMOUNT // 2, sender=borrower)
+
+    boa.env.time_travel(86400)
+    with boa.reverts():
+        broken.accrue()
+
+    # The broken pair comes first in the registry, and doesn't keep the other from accruing
+    last_accrued = broken.accrue_info()[1]
+    factory.accrue_all(0, sender=accounts[5])
+    assert healthy.accrue_info()[1] == evm_state().timestamp
+    assert broken.accrue_info()[1] == last_accrued
+    assert factory.accrue_many([broken.address, healthy.address], 0) == []
@@ -89,3 +89,97 @@ def test_admin_controls(fuse_box, accounts, account):
 
     assert fuse_box.owner() == "0x0000000000000000000000000000000000000000"
 
+
+def set_prices(fuses, prices):
+    for fuse, price in zip(fuses, prices):
+        fuse.setPrice(price)
+        fuse.setUpdated(True)
+
+def test_median_stops_at_quorum(account, fuse_one, fuse_two, fuse_three, fuse_four, fuse_box):
+    fuses = [fuse_one, fuse_two, fuse_three, fuse_four]
+    set_prices(fuses, [10**18, 1004 * 10**15, 5 * 10**18, 1002 * 10**15])
+
+    fuse_box.set_quorum(2, 100, sender=account)
+
+    # The first two agree within 1%, so the outlier is never read
+    assert fuse_box.get() == (True, 1002 * 10**15)
+
+    # Without a quorum every source is read, and the median ignores the outlier, but isn't an update
+    fuse_box.set_quorum(4, 100, sender=account)
+    assert fuse_box.get() == (False, 1003 * 10**15)
+
+    # An outlier read early doesn't keep the quorum from being reached by the next prices
+    set_prices(fuses, [10**18, 5 * 10**18, 1002 * 10**15, 3 * 10**18])
+    fuse_box.set_quorum(2, 100, sender=account)
+    assert fuse_box.get() == (True, 1002 * 10**15)
+
+def test_median_resists_outliers(account, fuse_one, fuse_two, fuse_three, fuse_four, fuse_box):
+    fuses = [fuse_one, fuse_two, fuse_three, fuse_four]
+    set_prices(fuses, [10**18, 5 * 10**18, 1001 * 10**15, 1002 * 10**15])
+
+    fuse_box.set_quorum(3, 100, sender=account)
+    assert fuse_box.get() == (True, 10015 * 10**14)
+
+    # Stale prices are left out while there is any fresh one, the two fresh prices left that agree
+    # are short of the quorum
+    fuse_three.setUpdated(False)
+    assert fuse_box.get() == (False, 1002 * 10**15)
+
+    for fuse in fuses:
+        fuse.setUpdated(False)
+    assert fuse_box.get() == (False, 10015 * 10**14)
+
+def test_median_needs_a_quorum(account, fuse_one, fuse_two, fuse_three, fuse_four, fuse_box):
+    fuses = [fuse_one, fuse_two, fuse_three, fuse_four]
+    set_prices(fuses, [10**18, 2 * 10**18, 3 * 10**18, 4 * 10**18])
+
+    fuse_box.set_quorum(2, 100, sender=account)
+    assert fuse_box.get() == (False, 25 * 10**17)
+
+    # A single fresh source is no quorum either
+    for fuse in fuses[1:]:
+        fuse.setUpdated(False)
+    assert fuse_box.get() == (False, 10**18)
+
+    # Once two sources agree the price is an update again
+    fuse_two.setPrice(1005 * 10**15)
+    fuse_two.setUpdated(True)
+    assert fuse_box.get() == (True, 10025 * 10**14)
+
+def test_quorum_stays_within_active_sources(account, fuse_box):
+    # All four sources are active
+    with boa.reverts("FuseBox: Quorum above active sources"):
+        fuse_box.set_quorum(5, 100, sender=account)
+    fuse_box.set_quorum(3, 100, sender=account)
+
+    # Dropping to two active sources would leave the quorum of three unreachable
+    fuse_box.defuse_source(0, sender=account)
+    with boa.reverts("FuseBox: Quorum above active sources"):
+        fuse_box.defuse_source(1, sender=account)
+
+    # Once the quorum is lowered the source can go
+    fuse_box.set_quorum(2, 100, sender=account)
+    fuse_box.defuse_source(1, sender=account)
+    assert fuse_box.fuse_box(1)[0] is False
+
+def test_source_management(account, accounts, oracle, fuse_box):
+    with boa.reverts("Ownable2Step: caller is not the owner"):
+        fuse_box.set_quorum(2, 100, sender=accounts[3])
+
+    with boa.reverts("FuseBox: Quorum too large"):
+        fuse_box.set_quorum(9, 100, sender=account)
+
+    with boa.reverts("FuseBox: Deviation too large"):
+        fuse_box.set_quorum(2, 10001, sender=account)
+
+    with boa.reverts("Ownable2Step: caller is not the owner"):
+        fuse_box.add_source(oracle, sender=accounts[3])
+
+    fuse_box.add_source(oracle, sender=account)
+    assert fuse_box.fuse_box(4) == (True, oracle.address)
+
+    for i in range(4):
+        fuse_box.defuse_source(i, sender=account)
+
+    with boa.reverts("FuseBox: All data sources are inactive"):
+        fuse_box.defuse_source(4, sender=account)
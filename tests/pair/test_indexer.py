@@ -0,0 +1,130 @@
+import boa
+
+from boa_compat import evm_state
+from indexer.cog_indexer import BoaSource, CogIndexer
+
+
+def assert_positions_match(indexer, pair, users):
+    for user in users:
+        assert indexer.position(pair, user) == (
+            pair.user_collateral_share(user),
+            pair.user_borrow_part(user),
+            pair.balanceOf(user),
+        )
+
+
+def test_indexer_rebuilds_positions(account, accounts, liquidator, cog_pair_blueprint, oracle, asset, collateral):
+    lender, borrower, other = accounts[1:4]
+    users = [lender, borrower, other, liquidator, account]
+
+    with BoaSource() as source:
+        factory = boa.load('src/cog_factory.vy', cog_pair_blueprint, account)
+        start_block = evm_state().block_number
+        pair = boa.load_partial('src/cog_pair.vy').at(
+            factory.deploy_medium_risk_pair(asset, collateral, oracle, sender=account)
+        )
+
+        oracle.setPrice(10**18, sender=account)
+        oracle.setUpdated(True, sender=account)
+        for user in users:
+            asset.mint(user, 10**24, sender=user)
+            collateral.mint(user, 10**24, sender=user)
+            asset.approve(pair, 2**256 - 1, sender=user)
+            collateral.approve(pair, 2**256 - 1, sender=user)
+
+        pair.deposit(1000 * 10**18, sender=lender)
+        pair.mint(50 * 10**18, other, sender=lender)
+        pair.transfer(other, 100 * 10**18, sender=lender)
+        boa.env.time_travel(seconds=60)
+
+        pair.add_collateral(borrower, 300 * 10**18, sender=other)
+        pair.add_collateral(other, 100 * 10**18, sender=other)
+        pair.remove_collateral(lender, 10 * 10**18, sender=other)
+        pair.borrow(150 * 10**18, sender=borrower)
+        pair.approve_borrow(other, 20 * 10**18, sender=borrower)
+        pair.borrow(20 * 10**18, borrower, other, sender=other)
+        pair.borrow(30 * 10**18, sender=other)
+        boa.env.time_travel(seconds=86400)
+
+        pair.repay(borrower, 10 * 10**18, sender=other)
+        pair.withdraw(50 * 10**18, sender=other)
+        pair.redeem(100 * 10**18, lender, lender, sender=lender)
+
+        # A failed call leaves no logs behind
+        with boa.reverts():
+            pair.liquidate(borrower, 10**18, liquidator, sender=liquidator)
+
+        oracle.setPrice(3 * 10**18, sender=account)
+        pair.get_exchange_rate()
+        pair.liquidate(borrower, 20 * 10**18, liquidator, sender=liquidator)
+        pair.liquidate_many([borrower, other], [10**18, 2 * 10**18], liquidator, sender=liquidator)
+        boa.env.time_travel(seconds=60)
+
+        # A pair of a tier added after deployment
+        one_percent = 317097920
+        factory.set_tier(
+            6, 50 * 10**16, 60 * 10**16, 7 * one_percent, 4 * one_percent, 150 * one_percent, 288 * 10**38,
+            sender=factory.owner(),
+        )
+        tier_pair = boa.load_partial('src/cog_pair.vy').at(
+            factory.deploy_pair(asset, collateral, oracle, 6, sender=factory.owner())
+        )
+        tier_pair.get_exchange_rate()
+        for user in users:
+            asset.approve(tier_pair, 2**256 - 1, sender=user)
+            collateral.approve(tier_pair, 2**256 - 1, sender=user)
+        tier_pair.deposit(100 * 10**18, sender=lender)
+        tier_pair.add_collateral(other, 100 * 10**18, sender=other)
+        tier_pair.borrow(10 * 10**18, sender=other)
+
+    # Small batches so pair logs land in several ranges, and the pair is created mid range
+    indexer = CogIndexer()
+    indexer.track_factory(factory, start_block)
+    assert indexer.sync(source, batch_size=3) > 0
+
+    indexed, indexed_tier = indexer.pairs()
+    assert indexed.pair == pair.address
+    assert indexed.tier == "medium"
+    assert indexed.asset == asset.address
+    assert indexed.collateral == collateral.address
+    assert (indexed_tier.pair, indexed_tier.tier) == (tier_pair.address, "6")
+
+    assert_positions_match(indexer, pair, users)
+    assert_positions_match(indexer, tier_pair, users)
+    assert set(indexer.borrowers(pair)) == {u for u in users if pair.user_borrow_part(u) > 0}
+    liquidations = [e for e in indexer.events(pair) if e[2] == "Liquidate"]
+    assert [e[3]["user"] for e in liquidations] == [borrower, borrower, other]
+
+    # Syncing again picks up nothing, and nothing is applied twice
+    assert indexer.sync(source) == 0
+    assert_positions_match(indexer, pair, users)
+    assert_positions_match(indexer, tier_pair, users)
+
+
+def test_indexer_resumes_from_cursor(tmp_path, account, accounts, cog_pair_blueprint, oracle, asset, collateral):
+    user = accounts[1]
+    path = tmp_path / "cog.sqlite"
+
+    with BoaSource() as source:
+        factory = boa.load('src/cog_factory.vy', cog_pair_blueprint, account)
+        pair = boa.load_partial('src/cog_pair.vy').at(
+            factory.deploy_high_risk_pair(asset, collateral, oracle, sender=account)
+        )
+        asset.mint(user, 10**21, sender=user)
+        asset.approve(pair, 2**256 - 1, sender=user)
+        pair.deposit(10**20, sender=user)
+
+        indexer = CogIndexer(path)
+        indexer.track_factory(factory)
+        indexer.sync(source)
+        indexer.close()
+
+        boa.env.time_travel(seconds=12)
+        pair.deposit(10**20, sender=user)
+        pair.transfer(accounts[2], 10**19, sender=user)
+
+    # A reopened database only indexes the blocks after its cursor
+    indexer = CogIndexer(path)
+    assert indexer.sync(source) == 2
+    assert indexer.position(pair, user).balance == pair.balanceOf(user)
+    assert indexer.position(pair, accounts[2]).balance == 10**19
@@ -132,3 +132,120 @@ def test_high_interest_rate_maximum(cog_high_pair, collateral, asset, accounts,
     (interest_per_second, last_accrued, fees_earned_fraction) = cog_pair.accrue_info()
     
     assert interest_per_second == ONE_PERCENT * 1000
+
+
+
+def test_borrow_clamps_starting_rate_outside_bounds(cog_factory, cog_pair_blueprint, collateral, asset, oracle, accounts, account):
+    # A starting rate outside the bounds is pulled in by the rate update after the first borrow
+    pair = boa.load_partial('src/cog_pair.vy')
+    low, high = [
+        pair.at(cog_factory.deploy_custom_risk_pair(
+            asset, collateral, oracle, cog_pair_blueprint, 3, 5 * 10 ** 17, 6 * 10 ** 17, starting, ONE_PERCENT * 2, ONE_PERCENT * 10, 28800000000000000000000000000000000000000, sender=account
+        ))
+        for starting in [ONE_PERCENT, ONE_PERCENT * 20]
+    ]
+
+    open_position(low, collateral, asset, account, accounts[1], 10 * 10 ** 18)
+    open_position(high, collateral, asset, account, accounts[2], 70 * 10 ** 18)
+    assert low.accrue_info()[0] == ONE_PERCENT * 2
+    assert high.accrue_info()[0] == ONE_PERCENT * 10
+
+
+
+def test_target_utilization_bounds(collateral, asset, oracle, account):
+    # The rate controller's reciprocals are exact only for targets within UTILIZATION_PRECISION
+    for min_utilization, max_utilization in [(0, 0), (5 * 10 ** 17, 10 ** 18 + 1), (10 ** 18 + 1, 10 ** 18)]:
+        with pytest.raises(Exception, match="Invalid Target Utilization"):
+            boa.load('src/cog_pair.vy', asset, collateral, oracle, min_utilization, max_utilization, ONE_PERCENT * 5, ONE_PERCENT, ONE_PERCENT * 10, 28800000000000000000000000000000000000000, False)
+    boa.load('src/cog_pair.vy', asset, collateral, oracle, 0, 10 ** 18, ONE_PERCENT * 5, ONE_PERCENT, ONE_PERCENT * 10, 28800000000000000000000000000000000000000, False)
+
+
+def deploy_compounding_pair(cog_factory, cog_pair_blueprint, asset, collateral, oracle, account, min_utilization, max_utilization):
+    with boa.env.prank(account):
+        pair = boa.load_partial('src/cog_pair.vy')
+        return pair.at(cog_factory.deploy_custom_risk_pair(
+            asset, collateral, oracle, cog_pair_blueprint, 3, min_utilization, max_utilization, ONE_PERCENT * 5, ONE_PERCENT, ONE_PERCENT * 1000, 28800000000000000000000000000000000000000, True
+        ))
+
+
+def open_position(cog_pair, collateral, asset, lender, borrower, amount):
+    asset.mint(lender, 100 * 10 ** 18, sender=lender)
+    asset.approve(cog_pair, 100 * 10 ** 18, sender=lender)
+    cog_pair.deposit(100 * 10 ** 18, lender, sender=lender)
+
+    collateral.mint(borrower, 1000 * 10 ** 18, sender=borrower)
+    collateral.approve(cog_pair, 1000 * 10 ** 18, sender=borrower)
+    cog_pair.add_collateral(borrower, 1000 * 10 ** 18, sender=borrower)
+    cog_pair.borrow(amount, sender=borrower)
+
+
+def test_compounding_independent_of_accrual_frequency(cog_factory, cog_pair_blueprint, collateral, asset, oracle, accounts, account):
+    # Wide target band, so the interest rate stays put and only compounding is exercised
+    once = deploy_compounding_pair(cog_factory, cog_pair_blueprint, asset, collateral, oracle, account, 10 ** 17, 95 * 10 ** 16)
+    daily = deploy_compounding_pair(cog_factory, cog_pair_blueprint, asset, collateral, oracle, account, 10 ** 17, 95 * 10 ** 16)
+    assert once.compounding() and daily.compounding()
+
+    open_position(once, collateral, asset, account, accounts[1], 50 * 10 ** 18)
+    open_position(daily, collateral, asset, account, accounts[2], 50 * 10 ** 18)
+    principal = once.total_borrow()[0]
+
+    for _ in range(365):
+        boa.env.time_travel(86400)
+        daily.accrue(sender=account)
+    once.accrue(sender=account)
+
+    assert once.accrue_info()[0] == daily.accrue_info()[0] == ONE_PERCENT * 5
+    # 5% compounded per second over a year is e ** 0.05 - 1, slightly above simple interest
+    assert once.total_borrow()[0] == pytest.approx(principal * 1.0512710963760241, rel=1e-9)
+    assert once.total_borrow()[0] == pytest.approx(daily.total_borrow()[0], abs=365)
+
+
+def test_compounding_off_target_independent_of_accrual_frequency(cog_factory, cog_pair_blueprint, collateral, asset, oracle, accounts, account):
+    # Above the target band the rate climbs the whole time, and catches its maximum part way
+    once = deploy_compounding_pair(cog_factory, cog_pair_blueprint, asset, collateral, oracle, account, 5 * 10 ** 17, 6 * 10 ** 17)
+    steps = deploy_compounding_pair(cog_factory, cog_pair_blueprint, asset, collateral, oracle, account, 5 * 10 ** 17, 6 * 10 ** 17)
+
+    open_position(once, collateral, asset, account, accounts[1], 70 * 10 ** 18)
+    open_position(steps, collateral, asset, account, accounts[2], 70 * 10 ** 18)
+    principal = once.total_borrow()[0]
+
+    for _ in range(30):
+        boa.env.time_travel(86400)
+        steps.accrue(sender=account)
+    once.accrue(sender=account)
+
+    # Interest accrued at a rate that followed the same path, as opposed to the starting rate for
+    # all 30 days, so both end within the drift the interest itself adds to utilization
+    assert once.total_borrow()[0] > principal * 1.015
+    assert once.total_borrow()[0] == pytest.approx(steps.total_borrow()[0], rel=1e-3)
+    assert once.accrue_info()[0] == pytest.approx(steps.accrue_info()[0], rel=0.1)
+
+
+def test_compounding_rate_saturates_at_maximum(cog_factory, cog_pair_blueprint, collateral, asset, oracle, accounts, account):
+    cog_pair = deploy_compounding_pair(cog_factory, cog_pair_blueprint, asset, collateral, oracle, account, 5 * 10 ** 17, 6 * 10 ** 17)
+    open_position(cog_pair, collateral, asset, account, accounts[1], 70 * 10 ** 18)
+
+    boa.env.time_travel(86400 * 365 * 2)
+    cog_pair.accrue(sender=account)
+    assert cog_pair.accrue_info()[0] == ONE_PERCENT * 1000
+
+
+def test_compounding_debt_saturates_after_a_long_idle_period(cog_factory, cog_pair_blueprint, collateral, asset, oracle, accounts, account):
+    cog_pair = deploy_compounding_pair(cog_factory, cog_pair_blueprint, asset, collateral, oracle, account, 5 * 10 ** 17, 6 * 10 ** 17)
+    open_position(cog_pair, collateral, asset, account, accounts[1], 70 * 10 ** 18)
+
+    # Each idle decade at the maximum rate saturates the growth, the second one on top of the
+    # first overflows a uint128 total
+    for _ in range(2):
+        boa.env.time_travel(86400 * 365 * 10)
+        cog_pair.accrue(sender=account)
+    assert cog_pair.total_borrow()[0] == 2 ** 128 - 1
+    assert cog_pair.accrue_info()[0] == ONE_PERCENT * 1000
+
+    # The pair keeps accruing and taking deposits once the debt is capped
+    boa.env.time_travel(86400)
+    cog_pair.accrue(sender=account)
+    assert cog_pair.total_borrow()[0] == 2 ** 128 - 1
+    asset.mint(accounts[2], 10 ** 18, sender=accounts[2])
+    asset.approve(cog_pair, 10 ** 18, sender=accounts[2])
+    cog_pair.deposit(10 ** 18, accounts[2], sender=accounts[2])
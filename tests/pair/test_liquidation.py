@@ -88,3 +88,158 @@ def test_can_liquidate(cog_pair, accounts, collateral, asset, oracle):
     )
 
     assert asset.balanceOf(account) == 0
+
+def test_can_liquidate_many(cog_pair, accounts, collateral, asset, oracle):
+    account = accounts[0]
+    oracle.setPrice(5000000000000000000, sender=account)
+    oracle.setUpdated(True, sender=account)
+    cog_pair.get_exchange_rate(sender=account)
+
+    account = accounts[1]
+
+    asset.mint(account, 90000000000000000000000000000, sender=account)
+    asset.approve(cog_pair, 90000000000000000000000000000, sender=account)
+    cog_pair.deposit(90000000000000000000000000000, account, sender=account)
+
+    # Two borrowers near the limit, and one with plenty of buffer
+    for account, borrowed in [(accounts[2], 1340000000000000000000000000), (accounts[3], 1340000000000000000000000000), (accounts[4], 10000000000000000000000000)]:
+        collateral.mint(account, 90000000000000000000000000000, sender=account)
+        collateral.approve(cog_pair, 90000000000000000000000000000, sender=account)
+        cog_pair.add_collateral(account, 90000000000000000000000000000, sender=account)
+        cog_pair.borrow(borrowed, sender=account)
+
+    oracle.setPrice(510000000000000000000, sender=account)
+    # The borrows above already read the oracle this block, so pick up the new price explicitly
+    cog_pair.get_exchange_rate(sender=account)
+    cog_pair.accrue(sender=account)
+
+    liquidator = accounts[1]
+    amount_to_liq = 157563024000000000000000000
+    asset.mint(liquidator, amount_to_liq * 2, sender=liquidator)
+    asset.approve(cog_pair, amount_to_liq * 2, sender=liquidator)
+
+    old_borrow_parts = [cog_pair.user_borrow_part(accounts[i]) for i in range(2, 5)]
+    old_collateral = collateral.balanceOf(liquidator)
+
+    with boa.reverts("CogPair: Length mismatch"):
+        cog_pair.liquidate_many([accounts[2], accounts[3]], [amount_to_liq], liquidator, sender=liquidator)
+
+    paid = cog_pair.liquidate_many(
+        [accounts[2], accounts[3], accounts[4]],
+        [amount_to_liq, amount_to_liq, amount_to_liq],
+        liquidator,
+        sender=liquidator
+    )
+
+    # Insolvent users are liquidated, the solvent one is skipped
+    assert cog_pair.user_borrow_part(accounts[2]) == old_borrow_parts[0] - amount_to_liq
+    assert cog_pair.user_borrow_part(accounts[3]) == old_borrow_parts[1] - amount_to_liq
+    assert cog_pair.user_borrow_part(accounts[4]) == old_borrow_parts[2]
+
+    # A single aggregated settlement for both liquidations
+    assert asset.balanceOf(liquidator) == amount_to_liq * 2 - paid
+    assert collateral.balanceOf(liquidator) > old_collateral
+
+    # Nothing left to liquidate is a no-op rather than a revert
+    assert cog_pair.liquidate_many([accounts[4]], [amount_to_liq], liquidator, sender=liquidator) == 0
+
+def test_liquidate_many_skips_what_liquidate_rejects(cog_pair, accounts, collateral, asset, oracle):
+    account = accounts[0]
+    oracle.setPrice(5000000000000000000, sender=account)
+    oracle.setUpdated(True, sender=account)
+    cog_pair.get_exchange_rate(sender=account)
+
+    account = accounts[1]
+    asset.mint(account, 90000000000000000000000000000, sender=account)
+    asset.approve(cog_pair, 90000000000000000000000000000, sender=account)
+    cog_pair.deposit(90000000000000000000000000000, account, sender=account)
+
+    for account in accounts[2:5]:
+        collateral.mint(account, 90000000000000000000000000000, sender=account)
+        collateral.approve(cog_pair, 90000000000000000000000000000, sender=account)
+        cog_pair.add_collateral(account, 90000000000000000000000000000, sender=account)
+        cog_pair.borrow(1340000000000000000000000000, sender=account)
+
+    # Every borrower is insolvent, and their collateral covers only part of their debt
+    oracle.setPrice(510000000000000000000, sender=account)
+    cog_pair.get_exchange_rate(sender=account)
+    cog_pair.accrue(sender=account)
+
+    liquidator = accounts[1]
+    amount_to_liq = 157563024000000000000000000
+    asset.mint(liquidator, 10**30, sender=liquidator)
+    asset.approve(cog_pair, 10**30, sender=liquidator)
+
+    # Partial liquidations the collateral can't cover, and no parts at all, are rejected by liquidate
+    with boa.reverts("CogPair: Nothing to liquidate"):
+        cog_pair.liquidate(accounts[2], amount_to_liq * 2, liquidator, sender=liquidator)
+    with boa.reverts("CogPair: Nothing to liquidate"):
+        cog_pair.liquidate(accounts[3], 0, liquidator, sender=liquidator)
+
+    # and skipped by liquidate_many, which still liquidates the rest of the batch
+    old_borrow_parts = [cog_pair.user_borrow_part(accounts[i]) for i in range(2, 5)]
+    old_collateral_shares = [cog_pair.user_collateral_share(accounts[i]) for i in range(2, 5)]
+    paid = cog_pair.liquidate_many(
+        [accounts[2], accounts[3], accounts[4]],
+        [amount_to_liq * 2, 0, amount_to_liq],
+        liquidator,
+        sender=liquidator
+    )
+    assert paid > 0
+    logs = [log for log in cog_pair.get_logs() if log.event_type.name == "Liquidate"]
+    assert len(logs) == 1
+    assert [cog_pair.user_borrow_part(accounts[i]) for i in range(2, 5)] == [
+        old_borrow_parts[0], old_borrow_parts[1], old_borrow_parts[2] - amount_to_liq
+    ]
+    assert [cog_pair.user_collateral_share(accounts[i]) for i in range(2, 4)] == old_collateral_shares[:2]
+
+    # The whole bad debt position can still be liquidated for the collateral that is left
+    cog_pair.liquidate(accounts[2], old_borrow_parts[0], liquidator, sender=liquidator)
+    assert cog_pair.user_borrow_part(accounts[2]) == 0
+    assert cog_pair.user_collateral_share(accounts[2]) == 0
+
+def test_solvency_views(cog_pair, accounts, collateral, asset, oracle):
+    account = accounts[0]
+    oracle.setPrice(5000000000000000000, sender=account)
+    oracle.setUpdated(True, sender=account)
+    cog_pair.get_exchange_rate(sender=account)
+
+    account = accounts[1]
+    asset.mint(account, 90000000000000000000000000000, sender=account)
+    asset.approve(cog_pair, 90000000000000000000000000000, sender=account)
+    cog_pair.deposit(90000000000000000000000000000, account, sender=account)
+
+    for account, borrowed in [(accounts[2], 1340000000000000000000000000), (accounts[3], 10000000000000000000000000)]:
+        collateral.mint(account, 90000000000000000000000000000, sender=account)
+        collateral.approve(cog_pair, 90000000000000000000000000000, sender=account)
+        cog_pair.add_collateral(account, 90000000000000000000000000000, sender=account)
+        cog_pair.borrow(borrowed, sender=account)
+
+    assert cog_pair.is_solvent(accounts[2])
+    assert cog_pair.is_solvent(accounts[3])
+
+    oracle.setPrice(510000000000000000000, sender=account)
+    cog_pair.get_exchange_rate(sender=account)
+
+    # Interest is projected without anyone poking the pair
+    boa.env.time_travel(seconds=86400)
+    projected = cog_pair.borrow_amount_of(accounts[2])
+    assert projected > cog_pair.user_borrow_part(accounts[2])
+
+    (healthy_before, _, _) = cog_pair.health_factors([accounts[3], accounts[2], accounts[4]])
+    cog_pair.accrue(sender=account)
+    assert cog_pair.borrow_amount_of(accounts[2]) == projected
+
+    (healthy, unhealthy, no_debt) = cog_pair.health_factors([accounts[3], accounts[2], accounts[4]])
+    assert healthy == healthy_before
+    assert healthy >= 10 ** 18
+    assert unhealthy < 10 ** 18
+    assert no_debt == 2 ** 256 - 1
+
+    assert cog_pair.is_solvent(accounts[3])
+    assert not cog_pair.is_solvent(accounts[2])
+    assert cog_pair.is_solvent(accounts[4])
+
+    # The view agrees with what liquidate does
+    with boa.reverts("CogPair: User is solvent"):
+        cog_pair.liquidate(accounts[3], 10 ** 18, accounts[1], sender=accounts[1])
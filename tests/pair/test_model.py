@@ -0,0 +1,157 @@
+import random
+
+import boa
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from boa_compat import evm_state
+from sim.calibrate import calibrate
+from sim.cog_pair_model import CogPairModel, TIERS
+
+USERS = 3
+
+
+def try_call(fn, *args, **kwargs):
+    try:
+        fn(*args, **kwargs)
+    except boa.BoaError:
+        return False
+    return True
+
+
+def assert_matches(model, pairs, users):
+    for i, pair in enumerate(pairs):
+        assert pair.total_asset() == (model.asset_elastic[i], model.asset_base[i])
+        assert pair.total_borrow() == (model.borrow_elastic[i], model.borrow_base[i])
+        assert pair.accrue_info() == (
+            model.interest_per_second[i],
+            model.last_accrued[i],
+            model.fees_earned_fraction[i],
+        )
+        assert pair.surge_info() == (model.last_interest_per_second[i], model.last_elapsed_time[i])
+        assert pair.protocol_fee() == model.protocol_fee[i]
+        assert pair.total_collateral_share() == model.total_collateral_share[i]
+        for u, user in enumerate(users):
+            assert pair.balanceOf(user) == model.balance[i, u]
+            assert pair.user_borrow_part(user) == model.borrow_part[i, u]
+            assert pair.user_collateral_share(user) == model.collateral_share[i, u]
+
+
+def test_model_matches_contract(cog_pair, cog_high_pair, cog_factory, cog_pair_blueprint, oracle, asset, collateral, accounts, account, liquidator):
+    # One model, three pools with different rate curves, checked step by step against every pair
+    medium = TIERS["medium"]
+    compounding_pair = boa.load_partial('src/cog_pair.vy').at(cog_factory.deploy_custom_risk_pair(
+        asset, collateral, oracle, cog_pair_blueprint, 3, medium["min_target_utilization"], medium["max_target_utilization"],
+        medium["starting_interest_per_second"], medium["min_interest"], medium["max_interest"], medium["elasticity"], True, sender=account
+    ))
+    pairs = [cog_pair, cog_high_pair, compounding_pair]
+    users = accounts[1:1 + USERS]
+    params = {k: [medium[k], TIERS["high"][k], medium[k]] for k in medium}
+    model = CogPairModel(len(pairs), USERS, **params, compounding=[False, False, True], timestamp=evm_state().timestamp)
+
+    oracle.setPrice(10**18, sender=account)
+    oracle.setUpdated(True, sender=account)
+    for pair in pairs:
+        pair.get_exchange_rate()
+        for user in users + [liquidator]:
+            asset.mint(user, 10**24, sender=user)
+            collateral.mint(user, 10**24, sender=user)
+            asset.approve(pair, 2**256 - 1, sender=user)
+            collateral.approve(pair, 2**256 - 1, sender=user)
+
+    rng = random.Random(1234)
+    rate = 10**18
+    for _ in range(80):
+        action = rng.choice(["deposit", "add_collateral", "borrow", "repay", "redeem", "time_travel", "liquidate"])
+        u = rng.randrange(USERS)
+        user = users[u]
+
+        if action == "deposit":
+            amount = rng.randint(1, 500) * 10**18
+            for pair in pairs:
+                pair.deposit(amount, sender=user)
+            model.deposit(u, amount)
+        elif action == "add_collateral":
+            amount = rng.randint(1, 200) * 10**18
+            for pair in pairs:
+                pair.add_collateral(user, amount, sender=user)
+            model.add_collateral(u, amount)
+        elif action == "borrow":
+            amount = rng.randint(1, 60) * 10**18
+            ok = [try_call(pair.borrow, amount, sender=user) for pair in pairs]
+            assert ok == list(model.borrow(u, amount, rate))
+        elif action == "repay":
+            parts = [model.borrow_part[i, u] * rng.randint(0, 100) // 100 for i in range(len(pairs))]
+            ok = [try_call(pair.repay, user, parts[i], sender=user) for i, pair in enumerate(pairs)]
+            assert ok == list(model.repay(u, parts)[0])
+        elif action == "redeem":
+            shares = [model.balance[i, u] * rng.randint(0, 100) // 100 for i in range(len(pairs))]
+            ok = [try_call(pair.redeem, shares[i], sender=user) for i, pair in enumerate(pairs)]
+            assert ok == list(model.redeem(u, shares)[0])
+        elif action == "time_travel":
+            seconds = rng.randint(1, 30 * 86400)
+            boa.env.time_travel(seconds=seconds)
+            model.advance(seconds)
+            if rng.random() < 0.5:
+                for pair in pairs:
+                    pair.accrue()
+                model.accrue()
+        else:
+            # Collateral loses value for long enough to liquidate the largest borrower
+            u = max(range(USERS), key=lambda u: model.borrow_part[0, u])
+            user = users[u]
+            rate = 4 * 10**18
+            oracle.setPrice(rate, sender=account)
+            for pair in pairs:
+                pair.get_exchange_rate()
+            max_parts = rng.randint(1, 50) * 10**18
+            ok = [try_call(pair.liquidate, user, max_parts, liquidator, sender=liquidator) for pair in pairs]
+            assert ok == list(model.liquidate(u, max_parts, rate)[0])
+            rate = 10**18
+            oracle.setPrice(rate, sender=account)
+            for pair in pairs:
+                pair.get_exchange_rate()
+
+        assert_matches(model, pairs, users)
+
+
+def test_model_sweep_runs_without_contract():
+    # Elasticity sweep across 1000 pools in one vectorized model, which is what it is for
+    elasticities = np.linspace(2e40, 4e40, 1000)
+    params = dict(TIERS["medium"], elasticity=elasticities)
+    model = CogPairModel(1000, 2, **params, exact=False)
+
+    model.deposit(0, 100e18)
+    model.add_collateral(1, 1000e18)
+    assert model.borrow(1, 80e18, 1e18).all()
+
+    for _ in range(30):
+        model.advance(86400)
+        model.accrue()
+
+    # Utilization stays above the band, so every rate rises, faster for the lower elasticities
+    ips = model.interest_per_second
+    assert (ips > TIERS["medium"]["starting_interest_per_second"]).all()
+    assert (np.diff(ips) <= 0).all()
+
+
+def test_calibration_sweep():
+    medium = TIERS["medium"]
+    elasticities = np.linspace(1e40, 5e40, 200)
+    path = np.concatenate([np.full(24 * 10, 0.9), np.full(24 * 20, 0.55), np.full(24 * 30, 0.1)])
+    result = calibrate(path, 3600, **dict(medium, elasticity=elasticities))
+    assert result.interest_per_second.shape == (len(path), len(elasticities))
+
+    # Stiffer curves take longer to reach either bound, and the rate never moves inside the band
+    assert (result.time_to_max > 0).all() and (np.diff(result.time_to_max) >= 0).all()
+    assert (result.time_to_min > 0).all() and (np.diff(result.time_to_min) >= 0).all()
+    band = result.interest_per_second[24 * 10:24 * 30]
+    assert (band == band[0]).all()
+    assert (result.first_surge > 0).all() and (result.first_surge < 86400 * 10).all()
+
+    # The float sweep agrees with the exact replay of the contract's integer math
+    exact = calibrate(path, 3600, exact=True, **dict(medium, elasticity=int(elasticities[0])))
+    assert exact.time_to_max[0] == result.time_to_max[0]
+    assert exact.surges[0] == result.surges[0]
+    assert float(exact.interest_per_second[-1][0]) == pytest.approx(result.interest_per_second[-1][0], rel=1e-6)
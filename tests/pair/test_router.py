@@ -9,7 +9,7 @@ from hypothesis import (
     strategies as st,
 )
 
-# Since the router can use up to 5 pairs, we need 5 fixtures for potential pools
+# Pools for a route of up to 4 hops, each pair's asset being the next pair's collateral
 
 @pytest.fixture(scope="session")
 def collateral_0(account):
@@ -87,15 +87,201 @@ def test_router_works(accounts, loan_router, collateral_0, collateral_1, collate
     hop_two = (cog_pair_1.address, 50 * 10 ** 18, 25 * 10 ** 18)
     hop_three = (cog_pair_2.address, 25 * 10 ** 18, 12 * 10 ** 18)
     hop_four = (cog_pair_3.address, 12 * 10 ** 18, 6 * 10 ** 18)
-    hop_five = ("0x0000000000000000000000000000000000000000", 0, 0)
 
     cog_pair_0.approve_borrow(loan_router.address, 2**256 -1, sender=account)
     cog_pair_1.approve_borrow(loan_router.address, 2**256 -1, sender=account)
     cog_pair_2.approve_borrow(loan_router.address, 2**256 -1, sender=account)
     cog_pair_3.approve_borrow(loan_router.address, 2**256 -1, sender=account)
 
-    loan_router.loan_tokens([hop_one, hop_two, hop_three, hop_four, hop_five], 2 ** 256 -1, sender=account)
+    loan_router.loan_tokens([hop_one, hop_two, hop_three, hop_four], 2 ** 256 -1, sender=account)
 
     assert collateral_4.balanceOf(account) > 0
     assert cog_pair_3.user_borrow_part(account) > 0
+
+def test_router_reuses_approvals(accounts, loan_router, collateral_0, collateral_1, collateral_2, cog_pair_0, cog_pair_1):
+    lender = accounts[1]
+    for token, pair in [(collateral_1, cog_pair_0), (collateral_2, cog_pair_1)]:
+        token.mint(lender, 100 * 10 ** 18, sender=lender)
+        token.approve(pair, 100 * 10 ** 18, sender=lender)
+        pair.deposit(100 * 10 ** 18, lender, sender=lender)
+
+    account = accounts[2]
+    collateral_0.mint(account, 100 * 10 ** 18, sender=account)
+    collateral_0.approve(loan_router.address, 100 * 10 ** 18, sender=account)
+    cog_pair_0.approve_borrow(loan_router.address, 2**256 -1, sender=account)
+    cog_pair_1.approve_borrow(loan_router.address, 2**256 -1, sender=account)
+
+    path = [(cog_pair_0.address, 40 * 10 ** 18, 20 * 10 ** 18), (cog_pair_1.address, 20 * 10 ** 18, 10 * 10 ** 18)]
+    loan_router.loan_tokens(path, 2 ** 256 -1, sender=account)
+
+    assert collateral_0.allowance(loan_router, cog_pair_0) == 2**256 - 1 - 40 * 10 ** 18
+    assert collateral_1.allowance(loan_router, cog_pair_1) == 2**256 - 1 - 20 * 10 ** 18
+
+    # The second route runs on the approvals left from the first. Each hop then makes four calls,
+    # allowance(), add_collateral(), borrow() and asset(), on top of the first collateral(), the
+    # pull of it, and the final balanceOf() and transfer()
+    loan_router.loan_tokens(path, 2 ** 256 -1, sender=account)
+    assert len(loan_router._computation.children) == 4 * len(path) + 4
+
+    assert collateral_2.balanceOf(account) == 20 * 10 ** 18
+    assert cog_pair_1.user_collateral_share(account) == 40 * 10 ** 18
+    assert collateral_0.balanceOf(loan_router) == 0
+    assert collateral_1.balanceOf(loan_router) == 0
+
+def test_router_rejects_empty_path(accounts, loan_router):
+    with boa.reverts("LoanRouter: Empty path"):
+        loan_router.loan_tokens([], 2 ** 256 -1, sender=accounts[2])
+
+def test_router_rejects_broken_and_unknown_pairs(account, accounts, loan_router, cog_pair_blueprint, oracle, collateral_0, collateral_1, cog_pair_0, cog_pair_2):
+    lender = accounts[1]
+    collateral_1.mint(lender, 100 * 10 ** 18, sender=lender)
+    collateral_1.approve(cog_pair_0, 100 * 10 ** 18, sender=lender)
+    cog_pair_0.deposit(100 * 10 ** 18, lender, sender=lender)
+
+    user = accounts[2]
+    collateral_0.mint(user, 100 * 10 ** 18, sender=user)
+    collateral_0.approve(loan_router.address, 100 * 10 ** 18, sender=user)
+    cog_pair_0.approve_borrow(loan_router.address, 2**256 -1, sender=user)
+
+    # cog_pair_2 takes collateral_2, not the collateral_1 borrowed from cog_pair_0, which the router
+    # doesn't hold, so the pair's pull of it reverts
+    path = [(cog_pair_0.address, 40 * 10 ** 18, 20 * 10 ** 18), (cog_pair_2.address, 20 * 10 ** 18, 10 * 10 ** 18)]
+    with boa.reverts():
+        loan_router.loan_tokens(path, 2 ** 256 -1, sender=user)
+    assert cog_pair_2.user_collateral_share(user) == 0
+
+    # A pair from another factory is never approved
+    with boa.env.prank(account):
+        factory = boa.load('src/cog_factory.vy', cog_pair_blueprint, account)
+        unknown = factory.deploy_medium_risk_pair(collateral_1, collateral_0, oracle)
+    with boa.reverts("LoanRouter: Unknown pair"):
+        loan_router.loan_tokens([(unknown, 40 * 10 ** 18, 0)], 2 ** 256 -1, sender=user)
+    assert collateral_0.allowance(loan_router, unknown) == 0
     
+
+@pytest.fixture(scope="session")
+def swap_adapter(account):
+    with boa.env.prank(account):
+        return boa.load('src/mocks/mock_swap_adapter.vy')
+
+def expected_loops(leverage, ltv):
+    # Smallest n with (1 - ltv^(n+1)) / (1 - ltv) >= leverage, in the router's fixed point
+    n = 0
+    while True:
+        power = 10**18
+        for _ in range(n + 1):
+            power = power * ltv // 10**18
+        if power <= 10**18 - leverage * (10**18 - ltv) // 10**18:
+            return n
+        n += 1
+
+@given(
+    leverage=st.integers(min_value=10**18, max_value=39 * 10**17),
+    ltv=st.integers(min_value=10**17, max_value=74 * 10**16),
+)
+@settings(max_examples=200, deadline=None)
+def test_loops_closed_form(loan_router, leverage, ltv):
+    if leverage * (10**18 - ltv) // 10**18 >= 10**18:
+        with boa.reverts("LoanRouter: Leverage unreachable"):
+            loan_router.loops(leverage, ltv)
+        return
+    assert loan_router.loops(leverage, ltv) == expected_loops(leverage, ltv)
+
+def test_leverage_up(accounts, loan_router, swap_adapter, cog_pair, oracle, asset, collateral):
+    account = accounts[0]
+    oracle.setPrice(10**18, sender=account)
+    oracle.setUpdated(True, sender=account)
+
+    lender = accounts[1]
+    asset.mint(lender, 1000 * 10 ** 18, sender=lender)
+    asset.approve(cog_pair, 1000 * 10 ** 18, sender=lender)
+    cog_pair.deposit(1000 * 10 ** 18, lender, sender=lender)
+    collateral.mint(swap_adapter, 1000 * 10 ** 18, sender=lender)
+
+    user = accounts[2]
+    collateral.mint(user, 100 * 10 ** 18, sender=user)
+    collateral.approve(loan_router, 100 * 10 ** 18, sender=user)
+    cog_pair.approve_borrow(loan_router, 2**256 - 1, sender=user)
+
+    leverage, ltv = 3 * 10 ** 18, 7 * 10 ** 17
+    assert loan_router.loops(leverage, ltv) == expected_loops(leverage, ltv) == 6
+
+    total = loan_router.leverage_up(cog_pair, swap_adapter, 100 * 10 ** 18, leverage, ltv, 299 * 10 ** 18, 2**256 - 1, sender=user)
+
+    # At a 1:1 swap every borrowed unit comes back as collateral, less the opening fee
+    assert total == cog_pair.user_collateral_share(user)
+    assert 299 * 10 ** 18 < total < 300 * 10 ** 18
+    assert asset.balanceOf(user) == 0
+    assert 200 * 10 ** 18 - 10 ** 9 <= cog_pair.borrow_amount_of(user) <= 200 * 10 ** 18
+    assert cog_pair.is_solvent(user)
+    assert collateral.balanceOf(loan_router) == 0
+    assert asset.balanceOf(loan_router) == 0
+
+def test_leverage_up_slippage(accounts, loan_router, swap_adapter, cog_pair, oracle, asset, collateral):
+    account = accounts[0]
+    oracle.setPrice(10**18, sender=account)
+    oracle.setUpdated(True, sender=account)
+    swap_adapter.setPrice(9 * 10 ** 17, sender=account)
+
+    lender = accounts[1]
+    asset.mint(lender, 1000 * 10 ** 18, sender=lender)
+    asset.approve(cog_pair, 1000 * 10 ** 18, sender=lender)
+    cog_pair.deposit(1000 * 10 ** 18, lender, sender=lender)
+    collateral.mint(swap_adapter, 1000 * 10 ** 18, sender=lender)
+
+    user = accounts[2]
+    collateral.mint(user, 100 * 10 ** 18, sender=user)
+    collateral.approve(loan_router, 100 * 10 ** 18, sender=user)
+    cog_pair.approve_borrow(loan_router, 2**256 - 1, sender=user)
+
+    # Every swap is held to the loop's minimum, so the first one short of it reverts
+    with boa.reverts("MockSwapAdapter: Slippage"):
+        loan_router.leverage_up(cog_pair, swap_adapter, 100 * 10 ** 18, 2 * 10 ** 18, 6 * 10 ** 17, 200 * 10 ** 18, 2**256 - 1, sender=user)
+
+    # while a minimum the swaps can meet lets the loop through
+    total = loan_router.leverage_up(cog_pair, swap_adapter, 100 * 10 ** 18, 2 * 10 ** 18, 6 * 10 ** 17, 180 * 10 ** 18, 2**256 - 1, sender=user)
+    assert 180 * 10 ** 18 <= total < 200 * 10 ** 18
+
+def test_leverage_up_near_the_collateral_limit(accounts, loan_router, swap_adapter, cog_pair, oracle, asset, collateral):
+    account = accounts[0]
+    oracle.setPrice(10**18, sender=account)
+    oracle.setUpdated(True, sender=account)
+
+    lender = accounts[1]
+    asset.mint(lender, 1000 * 10 ** 18, sender=lender)
+    asset.approve(cog_pair, 1000 * 10 ** 18, sender=lender)
+    cog_pair.deposit(1000 * 10 ** 18, lender, sender=lender)
+    collateral.mint(swap_adapter, 1000 * 10 ** 18, sender=lender)
+
+    user = accounts[2]
+    collateral.mint(user, 100 * 10 ** 18, sender=user)
+    collateral.approve(loan_router, 100 * 10 ** 18, sender=user)
+    cog_pair.approve_borrow(loan_router, 2**256 - 1, sender=user)
+
+    # Borrowing 74.99% plus the opening fee on top would owe more than the pair's 75%
+    ltv = 7499 * 10 ** 14
+    assert ltv * (100000 + cog_pair.BORROW_OPENING_FEE()) // 100000 > 75 * 10 ** 16
+
+    total = loan_router.leverage_up(cog_pair, swap_adapter, 100 * 10 ** 18, 3 * 10 ** 18, ltv, 299 * 10 ** 18, 2**256 - 1, sender=user)
+    assert total == cog_pair.user_collateral_share(user)
+    assert cog_pair.borrow_amount_of(user) * 10 ** 18 <= total * ltv
+    assert cog_pair.is_solvent(user)
+
+def test_leverage_up_rejects_a_zero_exchange_rate(accounts, loan_router, swap_adapter, cog_pair, oracle, collateral):
+    account = accounts[0]
+    oracle.setPrice(0, sender=account)
+    oracle.setUpdated(True, sender=account)
+
+    user = accounts[2]
+    collateral.mint(user, 100 * 10 ** 18, sender=user)
+    collateral.approve(loan_router, 100 * 10 ** 18, sender=user)
+    cog_pair.approve_borrow(loan_router, 2**256 - 1, sender=user)
+
+    with boa.reverts("LoanRouter: Zero exchange rate"):
+        loan_router.leverage_up(cog_pair, swap_adapter, 100 * 10 ** 18, 2 * 10 ** 18, 6 * 10 ** 17, 0, 2**256 - 1, sender=user)
+
+def test_pow_covers_every_exponent_bit(loan_router):
+    assert loan_router.internal._pow(2 * 10 ** 18, 10) == 1024 * 10 ** 18
+    # 256 has none of its lowest 8 bits set
+    assert loan_router.internal._pow(5 * 10 ** 17, 256) == 0
+    assert loan_router.internal._pow(10 ** 18, 2 ** 255) == 10 ** 18
@@ -0,0 +1,111 @@
+import boa
+
+
+ATTACKER = """
+interface IPool:
+    def setPrice(_price: uint256): nonpayable
+
+interface ITwap:
+    def get() -> (bool, uint256): nonpayable
+
+@external
+def attack(pool: address, twap: address, price: uint256):
+    IPool(pool).setPrice(price * 100)
+    ITwap(twap).get()
+    IPool(pool).setPrice(price)
+"""
+
+
+def test_twap_oracle(account):
+    with boa.env.prank(account):
+        pool = boa.load('src/mocks/mock_oracle.vy')
+        pool.setPrice(10**18)
+        twap = boa.load('src/oracles/twap_oracle.vy', pool, 60)
+
+    boa.env.time_travel(seconds=60)
+    assert twap.get() == (True, 10**18)
+
+    # A reading weighs in for the time since the previous one, from the block after get() takes it
+    pool.setPrice(4 * 10**18, sender=account)
+    boa.env.time_travel(seconds=60)
+    assert twap.peek() == (True, 10**18)
+    assert twap.peekSpot() == 4 * 10**18
+    assert twap.get() == (True, 10**18)
+    assert (twap.index(), twap.cardinality()) == (2, 3)
+
+    # Calls within a period don't take a ring slot
+    pool.setPrice(10**18, sender=account)
+    boa.env.time_travel(seconds=30)
+    assert twap.get() == (True, (60 * 10**18 + 60 * 4 * 10**18) // 120)
+    assert (twap.index(), twap.cardinality()) == (2, 3)
+    boa.env.time_travel(seconds=30)
+    assert twap.peek() == (True, (90 * 10**18 + 60 * 4 * 10**18) // 150)
+
+    # Once the ring wraps, the old spike falls out of the window
+    pool.setPrice(3 * 10**18, sender=account)
+    for _ in range(20):
+        boa.env.time_travel(seconds=60)
+        twap.get()
+    assert (twap.index(), twap.cardinality()) == (22 % 16, 16)
+    assert twap.get() == (True, 3 * 10**18)
+
+
+def test_twap_oracle_ignores_spot_read_in_the_same_block(account):
+    with boa.env.prank(account):
+        pool = boa.load('src/mocks/mock_oracle.vy')
+        pool.setPrice(10**18)
+        twap = boa.load('src/oracles/twap_oracle.vy', pool, 60)
+
+    for _ in range(4):
+        boa.env.time_travel(seconds=60)
+        twap.get()
+
+    # The block's first get() comes after the spot price moved, and takes it as its reading
+    boa.env.time_travel(seconds=60)
+    pool.setPrice(100 * 10**18, sender=account)
+    assert twap.peek() == (True, 10**18)
+    assert twap.get() == (True, 10**18)
+    assert twap.price() == 100 * 10**18
+
+    # Neither a repeat get() nor peek() in the block picks the reading up
+    assert twap.get() == (True, 10**18)
+    assert twap.peek() == (True, 10**18)
+
+
+def test_twap_oracle_ignores_spot_moved_within_a_block(account):
+    with boa.env.prank(account):
+        pool = boa.load('src/mocks/mock_oracle.vy')
+        pool.setPrice(10**18)
+        twap = boa.load('src/oracles/twap_oracle.vy', pool, 60)
+        attacker = boa.loads(ATTACKER)
+
+    boa.env.time_travel(seconds=60)
+    assert twap.get() == (True, 10**18)
+
+    # Spot pushed, read and unwound in one transaction, after the block's reading was taken
+    attacker.attack(pool, twap, 10**18)
+    assert twap.price() == 10**18
+
+    boa.env.time_travel(seconds=60)
+    assert twap.peek() == (True, 10**18)
+    assert twap.get() == (True, 10**18)
+
+
+def test_twap_oracle_caps_a_reading_pushed_in_a_fresh_block(account):
+    with boa.env.prank(account):
+        pool = boa.load('src/mocks/mock_oracle.vy')
+        pool.setPrice(10**18)
+        twap = boa.load('src/oracles/twap_oracle.vy', pool, 60)
+        attacker = boa.loads(ATTACKER)
+
+    for _ in range(16):
+        boa.env.time_travel(seconds=60)
+        twap.get()
+
+    # The pushed reading is the block's first, then the oracle idles for ten periods
+    boa.env.time_travel(seconds=60)
+    attacker.attack(pool, twap, 10**18)
+    boa.env.time_travel(seconds=600)
+
+    # Neither reading weighs more than a period, so the push is one period of the 15 in the window
+    assert twap.get() == (True, (60 * 100 * 10**18 + 14 * 60 * 10**18) // (15 * 60))
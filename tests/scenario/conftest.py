@@ -71,9 +71,9 @@ def cog_high_pair(account, cog_factory, oracle, asset, collateral):
         return pair.at(cog_factory.deploy_high_risk_pair(asset, collateral, oracle))
 
 @pytest.fixture(scope="session")
-def loan_router(account):
+def loan_router(account, cog_factory):
     with boa.env.prank(account):
-        router = boa.load('src/loan_router.vy')
+        router = boa.load('src/loan_router.vy', cog_factory)
         return router
 
 @pytest.fixture(scope="session")